@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
+import atexit
 import threading
 import time
 import json
@@ -13,8 +14,11 @@ from dotenv import load_dotenv
 
 # Add parent directory to path to import strategy module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from strategymovingaverage import MovingAverageTradingBot, DeltaExchangeAPI
+from strategymovingaverage import DeltaExchangeAPI
 from news_service.crypto_news_trader import CryptoNewsTrader
+from news_service.scoring_pool import ScoringPool
+from backtest_service.job_manager import BacktestJobManager
+from trading_engine.engine_process import EngineProcess, InlineEngine
 
 # Configure logging
 logging.basicConfig(
@@ -46,12 +50,16 @@ CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # Global variables for bot state
-trading_bot = None
-bot_thread = None
-bot_running = False
 news_trader = None
 news_thread = None
 news_running = False
+backtest_jobs = None
+news_stop_event = threading.Event()
+
+# Handle to the trading host (bots, engine, risk, journal), normally in its own process
+engine_client = None
+
+# Last status reported by the trading host, served to the dashboard
 bot_status = {
     'running': False,
     'symbol': None,
@@ -68,6 +76,7 @@ latest_news = {
     'articles': [],
     'signals': {},
     'recommendation': {},
+    'sources': {},
     'last_update': None
 }
 
@@ -83,12 +92,21 @@ trading_config = {
     'sma_long_period': 21,
     'ema_short_period': 9,
     'ema_long_period': 21,
+    'rsi_period': 14,
+    
+    # Strategy votes: each strategy's weight, and the weighted score needed to trade
+    'sma_weight': 1.0,
+    'ema_weight': 1.0,
+    'rsi_weight': 0.0,
+    'signal_threshold': 0.8,
     
     # Risk Management
     'position_size': 1,
     'stop_loss_percent': 2,
     'take_profit_percent': 4,
     'max_daily_trades': 10,
+    'enable_order_book': True,
+    'max_slippage_bps': 20,
     
     # News Analysis Settings
     'news_confidence_threshold': 0.7,
@@ -101,6 +119,9 @@ trading_config = {
     'trading_end_time': '17:00',
     'enable_weekend_trading': False,
     'trading_interval': 10,
+    'min_trading_interval': 2,
+    'max_trading_interval': 60,
+    'enable_adaptive_cadence': True,
     
     # Advanced Settings
     'api_timeout': 30,
@@ -109,224 +130,59 @@ trading_config = {
     'enable_paper_trading': False
 }
 
-class WebTradingBot(MovingAverageTradingBot):
-    """Extended trading bot with web interface support"""
-    
-    def __init__(self, api_key: str, api_secret: str, symbol: str = 'BTCUSD'):
-        self.logger = logging.getLogger(__name__)
-        self.logger.info(f"WebTradingBot initialized with Symbol: {symbol}")
-        
-        super().__init__(api_key, api_secret, symbol)
-        self.last_status_update = 0
-        
-    def log_status(self, signals: Dict):
-        """Override to emit status updates via WebSocket"""
-        super().log_status(signals)
-        
-        # Update global status
-        current_position = self.get_current_position()
-        position_info = None
-        
-        if current_position:
-            size = float(current_position.get('size', 0))
-            side = 'long' if size > 0 else 'short'
-            abs_size = abs(size)
-            entry_price = float(current_position.get('entry_price', 0) or 0)
-            
-            # Use realized_pnl from official API response format
-            realized_pnl = current_position.get('realized_pnl')
-            realized_pnl_value = float(realized_pnl) if realized_pnl is not None else 0.0
-            
-            # Also try to get unrealized_pnl if available
-            api_unrealized = current_position.get('unrealized_pnl')
-            unrealized_from_api = float(api_unrealized) if api_unrealized is not None else None
-            
-            # Compute unrealized P&L if API doesn't provide it, using latest price
-            computed_unrealized = None
-            try:
-                latest_price = float(signals.get('current_price') or 0)
-                if entry_price and abs_size and latest_price:
-                    if side == 'long':
-                        computed_unrealized = (latest_price - entry_price) * abs_size
-                    else:
-                        computed_unrealized = (entry_price - latest_price) * abs_size
-            except Exception:
-                computed_unrealized = None
-            
-            final_unrealized = unrealized_from_api if (unrealized_from_api is not None and unrealized_from_api != 0) else (computed_unrealized or 0.0)
-            
-            # Total P&L = realized + unrealized
-            total_pnl = realized_pnl_value + final_unrealized
-            
-            position_info = {
-                'side': side,
-                'size': abs_size,
-                'entry_price': entry_price,
-                'realized_pnl': realized_pnl_value,
-                'unrealized_pnl': final_unrealized,
-                'total_pnl': total_pnl
-            }
-        
-        # Update global bot status
-        global bot_status
-        bot_status.update({
-            'running': True,
-            'symbol': self.symbol,
-            'current_price': signals['current_price'],
-            'position': position_info,
-            'signals': {
-                'sma_signal': signals['sma_signal'],
-                'ema_signal': signals['ema_signal'],
-                'sma_short': signals['sma_short'],
-                'sma_long': signals['sma_long'],
-                'ema_short': signals['ema_short'],
-                'ema_long': signals['ema_long']
-            },
-            'last_update': datetime.now().isoformat(),
-            'pnl': position_info['total_pnl'] if position_info else 0
-        })
-        
-        # Emit status update via WebSocket
-        socketio.emit('status_update', bot_status)
-    
-    def run(self):
-        """Override main loop to work with web interface"""
-        global bot_running, bot_status
-        
-        self.logger.info("Starting Web Trading Bot")
-        bot_status['running'] = True
-        
-        # Fetch initial historical data
-        if not self.fetch_historical_data():
-            self.logger.error("Failed to fetch historical data")
-            bot_status['running'] = False
-            return
-        
-        try:
-            while bot_running:
-                # Update current price
-                current_price = self.update_current_price()
-                if not current_price:
-                    self.logger.warning("Failed to get current price, retrying...")
-                    time.sleep(30)
-                    continue
-                
-                # Calculate signals
-                signals = self.calculate_signals()
-                
-                # Log current status (this will emit WebSocket update)
-                self.log_status(signals)
-                
-                # Check for trading signals
-                primary_signal = signals['sma_signal']
-                secondary_signal = signals['ema_signal']
-                
-                # Get news-based recommendation
-                news_recommendation = self.get_news_recommendation()
-                
-                # Combine technical and news signals
-                final_signal = self.combine_signals(primary_signal, secondary_signal, news_recommendation)
-                
-                if final_signal:
-                    self.logger.info(f"Trading signal detected: {final_signal.upper()}")
-                    self.logger.info(f"Technical: {primary_signal}, News: {news_recommendation}")
-                    
-                    # Execute trade
-                    if self.execute_trade(final_signal, current_price):
-                        self.logger.info(f"Trade executed successfully: {final_signal}")
-                        socketio.emit('trade_executed', {
-                            'signal': final_signal,
-                            'price': current_price,
-                            'timestamp': datetime.now().isoformat(),
-                            'news_sentiment': news_recommendation
-                        })
-                    else:
-                        self.logger.warning(f"Failed to execute trade: {final_signal}")
-                        
-                elif primary_signal or secondary_signal:
-                    self.logger.info(f"Technical signal detected but news sentiment is neutral: {primary_signal or secondary_signal}")
-                    self.logger.info(f"News recommendation: {news_recommendation}")
-                
-                # Wait before next iteration
-                time.sleep(10)
-                
-        except Exception as e:
-            self.logger.error(f"Error in trading bot: {e}")
-            socketio.emit('bot_error', {'error': str(e)})
-        finally:
-            bot_status['running'] = False
-            socketio.emit('bot_stopped', {})
-    
-    def get_news_recommendation(self):
-        """Get news-based trading recommendation"""
-        global latest_news, news_trader
-        
-        try:
-            if not news_trader or not latest_news.get('recommendation'):
-                return 'NEUTRAL'
-            
-            recommendation = latest_news['recommendation']
-            
-            # Only use high-confidence news signals
-            if recommendation.get('overall_confidence', 0) >= 0.7:
-                return recommendation.get('recommendation', 'NEUTRAL')
-            else:
-                return 'NEUTRAL'
-                
-        except Exception as e:
-            self.logger.error(f"Error getting news recommendation: {e}")
-            return 'NEUTRAL'
-    
-    def combine_signals(self, technical_signal, secondary_signal, news_signal):
-        """Combine technical analysis with news sentiment"""
-        
-        # If no technical signal, don't trade
-        if not technical_signal and not secondary_signal:
-            return None
-        
-        # Use primary technical signal if available
-        signal = technical_signal or secondary_signal
-        
-        # News signal weighting
-        if news_signal == 'NEUTRAL':
-            # Proceed with technical signal if news is neutral
-            return signal
-        elif news_signal == signal.upper():
-            # News confirms technical signal - proceed with confidence
-            return signal
-        elif news_signal != signal.upper():
-            # News contradicts technical signal - be more cautious
-            # Only trade if both signals are strong
-            if technical_signal and secondary_signal and technical_signal == secondary_signal:
-                self.logger.warning(f"News sentiment ({news_signal}) contradicts technical signal ({signal})")
-                return None  # Don't trade if conflicting signals
-            else:
-                return None  # Don't trade on conflicting signals
-        
-        return signal
+# Settings that only take effect when the bot is restarted
+RESTART_REQUIRED_KEYS = ('api_key', 'api_secret', 'trading_symbol', 'enable_paper_trading', 'enable_order_book')
+
+def relay_engine_event(event: str, data: Dict):
+    """Forward a trading host event to dashboard clients, caching the bot status"""
+    if event == 'status_update':
+        bot_status.update(data)
+    elif event == 'bot_stopped' and data.get('symbol') == bot_status.get('symbol'):
+        bot_status['running'] = False
+    socketio.emit(event, data)
+
+def get_engine_client():
+    """Start the trading host on first use (ENGINE_PROCESS=inline keeps it in this process)"""
+    global engine_client
+    if engine_client is None:
+        journal_dir = os.environ.get('STATE_JOURNAL_DIR') or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'state')
+        # Tick-to-order latency tracing (a few microseconds per span; set LATENCY_TRACING=false to disable)
+        tracing_enabled = os.environ.get('LATENCY_TRACING', 'true').lower() == 'true'
+        engine_class = InlineEngine if os.environ.get('ENGINE_PROCESS', 'separate') == 'inline' else EngineProcess
+        engine_client = engine_class(lambda: trading_config, emit=relay_engine_event,
+                                     journal_dir=journal_dir, tracing_enabled=tracing_enabled,
+                                     candle_dir=os.environ.get('CANDLE_STORE_DIR'))
+        engine_client.start()
+        atexit.register(engine_client.stop)
+    return engine_client
 
 def news_worker():
     """Background worker for fetching and analyzing crypto news"""
     global news_trader, news_running, latest_news
+    scoring_pool = None
     
     try:
         logger.info("Starting crypto news service")
         news_trader = CryptoNewsTrader()
+        # NEWS_SCORING_WORKERS > 0 scores articles on that many worker processes
+        scoring_workers = int(os.environ.get('NEWS_SCORING_WORKERS', '0'))
+        scoring_pool = ScoringPool(news_trader, max_workers=scoring_workers) if scoring_workers > 0 else None
         
         while news_running:
             try:
                 logger.info("Fetching latest crypto news...")
                 
-                # Get news from RSS feeds
-                all_news = news_trader.get_crypto_news_feeds()
+                # Get articles from RSS feeds that changed since the last cycle,
+                # minus the ones already analyzed (unchanged URLs)
+                all_news = news_trader.get_crypto_news_feeds(changed_only=True)
+                new_news = news_trader.filter_new_articles(all_news)
                 
-                if all_news:
-                    # Analyze each news item
-                    high_confidence_signals = []
-                    
-                    for news_item in all_news:
+                # Analyze each new news item
+                high_confidence_signals = []
+                if new_news:
+                    for news_item, signal_data in news_trader.score_articles(new_news, scoring_pool):
                         try:
-                            signal_data = news_trader.generate_trading_signal(news_item)
                             news_trader.save_news_signal(news_item, signal_data)
                             
                             # Collect high-confidence signals
@@ -340,34 +196,71 @@ def news_worker():
                             logger.error(f"Error processing news item: {e}")
                             continue
                     
-                    # Get overall trading recommendation
-                    recommendation = news_trader.get_trading_recommendation(min_confidence=0.65)
-                    
-                    # Update global news data
-                    latest_news.update({
-                        'articles': all_news[:10],  # Top 10 articles
-                        'signals': high_confidence_signals[:5],  # Top 5 signals
-                        'recommendation': recommendation,
-                        'last_update': datetime.now().isoformat()
-                    })
-                    
-                    # Emit news update via WebSocket
-                    socketio.emit('news_update', latest_news)
-                    
-                    logger.info(f"Updated news: {len(all_news)} articles, {len(high_confidence_signals)} signals")
+                    # Write this cycle's signals in one transaction
+                    news_trader.flush_signals()
+                else:
+                    logger.info(f"No new articles ({len(all_news)} fetched), skipping news analysis")
+                
+                # Feeds answer 304 next cycle only once their articles are stored
+                news_trader.commit_feeds()
+                
+                # Recompute the recommendation every cycle: older signals age out of its window
+                # even when nothing new arrived, and a stale BUY/SELL must not keep trading
+                recommendation = news_trader.get_trading_recommendation(min_confidence=0.65)
+                
+                # Update global news data
+                latest_news.update({
+                    'articles': news_trader.get_cached_articles()[:10],  # Top 10 articles
+                    'recommendation': recommendation,
+                    'sources': news_trader.fetcher.status(),
+                    'last_update': datetime.now().isoformat()
+                })
+                if new_news:
+                    latest_news['signals'] = high_confidence_signals[:5]  # Top 5 signals
+                
+                # Emit news update via WebSocket
+                socketio.emit('news_update', latest_news)
+                
+                # Hand the recommendation to the trading loops so they re-evaluate with it
+                if engine_client:
+                    engine_client.send('news', {'recommendation': recommendation})
+                
+                if new_news:
+                    logger.info(f"Updated news: {len(new_news)} new of {len(all_news)} articles, "
+                                f"{len(high_confidence_signals)} signals")
                 
             except Exception as e:
                 logger.error(f"Error in news worker: {e}")
                 
-            # Wait 60 seconds before next update
-            time.sleep(60)
+            # Wait 60 seconds before next update (returns early on stop)
+            if news_stop_event.wait(60):
+                break
             
     except Exception as e:
         logger.error(f"News worker failed: {e}")
         socketio.emit('news_error', {'error': str(e)})
     finally:
+        if scoring_pool is not None:
+            scoring_pool.close()
         news_running = False
 
+def load_backtest_candles(symbol, resolution, start, end):
+    """Fetch closes for a backtest job (runs on the job's coordinator thread)"""
+    api = DeltaExchangeAPI(trading_config.get('api_key', ''), trading_config.get('api_secret', ''), symbol=symbol)
+    candles = sorted(api.get_candles(symbol, resolution, start, end), key=lambda c: c['time'])
+    return [float(c['close']) for c in candles], [c['time'] for c in candles]
+
+def get_backtest_jobs():
+    """Create the backtest job manager on first use"""
+    global backtest_jobs
+    if backtest_jobs is None:
+        backtest_jobs = BacktestJobManager(
+            db_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backtest_jobs.db'),
+            candle_loader=load_backtest_candles,
+            progress_callback=socketio.emit
+        )
+    return backtest_jobs
+
 @app.route('/')
 def index():
     """Serve the main trading dashboard"""
@@ -402,6 +295,7 @@ def start_news():
     
     try:
         news_running = True
+        news_stop_event.clear()
         news_thread = threading.Thread(target=news_worker)
         news_thread.daemon = True
         news_thread.start()
@@ -422,6 +316,7 @@ def stop_news():
     
     try:
         news_running = False
+        news_stop_event.set()
         logger.info("Crypto news service stopped")
         return jsonify({'success': True, 'message': 'News service stopped successfully'})
         
@@ -441,6 +336,42 @@ def get_crypto_signals(crypto_symbol):
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error getting crypto signals: {str(e)}'})
 
+@app.route('/api/backtest', methods=['POST'])
+def submit_backtest():
+    """Queue a backtest or parameter sweep job"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'success': False, 'message': 'No backtest spec provided'}), 400
+        
+        job = get_backtest_jobs().submit(data, defaults=trading_config)
+        return jsonify({'success': True, **job})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid backtest spec: {str(e)}'}), 400
+    except Exception as e:
+        logger.error(f"Error submitting backtest: {e}")
+        return jsonify({'success': False, 'message': f'Error submitting backtest: {str(e)}'})
+
+@app.route('/api/backtest', methods=['GET'])
+def list_backtests():
+    """List recent backtest jobs"""
+    try:
+        return jsonify({'success': True, 'jobs': get_backtest_jobs().list_jobs()})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error listing backtests: {str(e)}'})
+
+@app.route('/api/backtest/<job_id>')
+def get_backtest(job_id):
+    """Get a backtest job's status and result"""
+    try:
+        job = get_backtest_jobs().get_job(job_id)
+        if not job:
+            return jsonify({'success': False, 'message': 'Backtest job not found'})
+        return jsonify({'success': True, 'job': job})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error getting backtest: {str(e)}'})
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Get current trading configuration"""
@@ -459,20 +390,22 @@ def save_config():
         if not data:
             return jsonify({'success': False, 'message': 'No configuration data provided'})
         
-        # Validate and update configuration
+        # Validate everything first so a running bot never sees a partial update
+        updates = {}
         for key, value in data.items():
             if key in trading_config:
                 # Type validation
                 if key in ['sma_short_period', 'sma_long_period', 'ema_short_period', 'ema_long_period', 
-                          'max_daily_trades', 'news_update_interval', 'trading_interval', 
-                          'api_timeout', 'max_retries']:
+                          'rsi_period', 'signal_threshold', 'max_daily_trades', 'max_slippage_bps', 'news_update_interval', 'trading_interval', 
+                          'min_trading_interval', 'max_trading_interval', 'api_timeout', 'max_retries']:
                     if not isinstance(value, (int, float)) or value <= 0:
                         return jsonify({'success': False, 'message': f'Invalid value for {key}: must be a positive number'})
                 elif key in ['position_size', 'stop_loss_percent', 'take_profit_percent', 
-                           'news_confidence_threshold', 'news_weight']:
+                           'news_confidence_threshold', 'news_weight', 'sma_weight', 'ema_weight', 'rsi_weight']:
                     if not isinstance(value, (int, float)) or value < 0:
                         return jsonify({'success': False, 'message': f'Invalid value for {key}: must be a non-negative number'})
-                elif key in ['enable_news_trading', 'enable_weekend_trading', 'enable_paper_trading']:
+                elif key in ['enable_news_trading', 'enable_weekend_trading', 'enable_paper_trading',
+                             'enable_adaptive_cadence', 'enable_order_book']:
                     if not isinstance(value, bool):
                         return jsonify({'success': False, 'message': f'Invalid value for {key}: must be true or false'})
                 elif key in ['trading_start_time', 'trading_end_time']:
@@ -492,18 +425,40 @@ def save_config():
                     if value not in ['DEBUG', 'INFO', 'WARNING', 'ERROR']:
                         return jsonify({'success': False, 'message': f'Invalid value for {key}: must be DEBUG, INFO, WARNING, or ERROR'})
                 
-                trading_config[key] = value
+                updates[key] = value
+        
+        intervals = {key: updates.get(key, trading_config[key])
+                     for key in ('min_trading_interval', 'trading_interval', 'max_trading_interval')}
+        if not intervals['min_trading_interval'] <= intervals['trading_interval'] <= intervals['max_trading_interval']:
+            return jsonify({'success': False, 'message': 'Invalid trading intervals: must satisfy min <= trading interval <= max'})
+        
+        restart_required = [key for key in RESTART_REQUIRED_KEYS
+                            if key in updates and updates[key] != trading_config[key]]
+        trading_config.update(updates)
         
         # Save configuration to file
         save_config_to_file()
         
-        logger.info("Trading configuration updated")
-        return jsonify({'success': True, 'message': 'Configuration saved successfully'})
+        # Running bots apply the new snapshot between ticks, reusing their price buffers
+        published = publish_config()
+        
+        logger.info(f"Trading configuration updated (version {published.get('version')})")
+        return jsonify({
+            'success': True,
+            'message': 'Configuration saved successfully',
+            'version': published.get('version'),
+            'restart_required': restart_required if published.get('running') else []
+        })
         
     except Exception as e:
         logger.error(f"Error saving configuration: {e}")
         return jsonify({'success': False, 'message': f'Error saving configuration: {str(e)}'})
 
+@app.route('/api/config/version')
+def get_config_version():
+    """Get the current config version and the version each running bot has applied"""
+    return jsonify(get_engine_client().request('config_version'))
+
 @app.route('/api/config/reset', methods=['POST'])
 def reset_config():
     """Reset configuration to default values"""
@@ -519,10 +474,17 @@ def reset_config():
             'sma_long_period': 21,
             'ema_short_period': 9,
             'ema_long_period': 21,
+            'rsi_period': 14,
+            'sma_weight': 1.0,
+            'ema_weight': 1.0,
+            'rsi_weight': 0.0,
+            'signal_threshold': 0.8,
             'position_size': 1,
             'stop_loss_percent': 2,
             'take_profit_percent': 4,
             'max_daily_trades': 10,
+            'enable_order_book': True,
+            'max_slippage_bps': 20,
             'news_confidence_threshold': 0.7,
             'news_update_interval': 5,
             'enable_news_trading': True,
@@ -531,6 +493,9 @@ def reset_config():
             'trading_end_time': '17:00',
             'enable_weekend_trading': False,
             'trading_interval': 10,
+            'min_trading_interval': 2,
+            'max_trading_interval': 60,
+            'enable_adaptive_cadence': True,
             'api_timeout': 30,
             'max_retries': 3,
             'log_level': 'INFO',
@@ -539,14 +504,22 @@ def reset_config():
         
         # Save to file
         save_config_to_file()
+        published = publish_config()
         
         logger.info("Trading configuration reset to defaults")
-        return jsonify({'success': True, 'message': 'Configuration reset to defaults', 'config': trading_config})
+        return jsonify({'success': True, 'message': 'Configuration reset to defaults', 'config': trading_config,
+                        'version': published.get('version')})
         
     except Exception as e:
         logger.error(f"Error resetting configuration: {e}")
         return jsonify({'success': False, 'message': f'Error resetting configuration: {str(e)}'})
 
+def publish_config() -> Dict:
+    """Send trading_config to the trading host as a new snapshot (it reads it on start otherwise)"""
+    if engine_client is None:
+        return {'success': True, 'version': None, 'running': False}
+    return engine_client.request('config', {'values': trading_config})
+
 def save_config_to_file():
     """Save configuration to JSON file"""
     try:
@@ -569,6 +542,7 @@ def load_config_from_file():
                 for key, value in saved_config.items():
                     if key in trading_config:
                         trading_config[key] = value
+            publish_config()
             logger.info(f"Configuration loaded from {config_file}")
         else:
             logger.info("No configuration file found, using defaults")
@@ -578,38 +552,13 @@ def load_config_from_file():
 @app.route('/api/start', methods=['POST'])
 def start_bot():
     """Start the trading bot"""
-    global trading_bot, bot_thread, bot_running, trading_config
-    
-    if bot_running:
-        return jsonify({'success': False, 'message': 'Bot is already running'})
-    
     try:
-        # Get API credentials from configuration
-        api_key = trading_config.get('api_key', '').strip()
-        api_secret = trading_config.get('api_secret', '').strip()
-        symbol = trading_config.get('trading_symbol', 'BTCUSD')
-        
-        if not api_key or not api_secret:
-            return jsonify({'success': False, 'message': 'API credentials not configured. Please set API key and secret in configuration.'})
-        
-        # Create and start bot
-        try:
-            logger.info(f"Starting bot with Symbol: {symbol}")
-            
-            trading_bot = WebTradingBot(api_key, api_secret, symbol)
-            bot_running = True
-            
-            # Start bot in separate thread
-            bot_thread = threading.Thread(target=trading_bot.run)
-            bot_thread.daemon = True
-            bot_thread.start()
-            
-            logger.info(f"Trading bot started successfully for {symbol}")
-        except Exception as e:
-            logger.error(f"Failed to create trading bot: {e}")
-            return jsonify({'success': False, 'message': f'Failed to create bot: {str(e)}'})
-        
-        return jsonify({'success': True, 'message': 'Bot started successfully'})
+        client = get_engine_client()
+        client.send('news', {'recommendation': latest_news.get('recommendation')})
+        result = client.request('start_bot')
+        if result.get('success'):
+            bot_status.update({'running': True, 'symbol': trading_config.get('trading_symbol', 'BTCUSD')})
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error starting bot: {str(e)}'})
@@ -617,30 +566,94 @@ def start_bot():
 @app.route('/api/stop', methods=['POST'])
 def stop_bot():
     """Stop the trading bot"""
-    global bot_running, trading_bot
-    
-    if not bot_running:
-        return jsonify({'success': False, 'message': 'Bot is not running'})
-    
     try:
-        bot_running = False
-        bot_status['running'] = False
-        
-        return jsonify({'success': True, 'message': 'Bot stopped successfully'})
+        result = get_engine_client().request('stop_bot')
+        if result.get('success'):
+            bot_status['running'] = False
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error stopping bot: {str(e)}'})
 
+@app.route('/api/engine/start', methods=['POST'])
+def start_engine():
+    """Start the multi-symbol trading engine"""
+    try:
+        data = request.get_json(silent=True) or {}
+        client = get_engine_client()
+        
+        # {"top": N} trades the scanner's N best-ranked products
+        top = data.get('top')
+        if top is not None:
+            if not isinstance(top, int) or isinstance(top, bool) or top <= 0:
+                return jsonify({'success': False, 'message': 'top must be a positive integer'})
+            client.send('news', {'recommendation': latest_news.get('recommendation')})
+            return jsonify(client.request('start_engine', {'top': top}))
+        
+        symbols = data.get('symbols') or [trading_config.get('trading_symbol', 'BTCUSD')]
+        if not isinstance(symbols, list) or not all(isinstance(s, str) and s.strip() for s in symbols):
+            return jsonify({'success': False, 'message': 'symbols must be a list of symbol strings'})
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+        
+        client.send('news', {'recommendation': latest_news.get('recommendation')})
+        return jsonify(client.request('start_engine', {'symbols': symbols}))
+        
+    except Exception as e:
+        logger.error(f"Error starting trading engine: {e}")
+        return jsonify({'success': False, 'message': f'Error starting engine: {str(e)}'})
+
+@app.route('/api/engine/stop', methods=['POST'])
+def stop_engine():
+    """Stop the multi-symbol trading engine"""
+    return jsonify(get_engine_client().request('stop_engine'))
+
+@app.route('/api/engine/status')
+def get_engine_status():
+    """Get per-symbol engine status"""
+    return jsonify(get_engine_client().request('engine_status'))
+
+@app.route('/api/scanner')
+def get_scanner():
+    """Get the universe scanner's latest product rankings"""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify(get_engine_client().request('scanner', {'limit': limit}))
+
+@app.route('/api/scanner/start', methods=['POST'])
+def start_scanner():
+    """Start ranking every product every few seconds"""
+    return jsonify(get_engine_client().request('start_scanner'))
+
+@app.route('/api/scanner/stop', methods=['POST'])
+def stop_scanner():
+    """Stop the universe scanner"""
+    return jsonify(get_engine_client().request('stop_scanner'))
+
+@app.route('/api/risk')
+def get_risk():
+    """Get portfolio exposure, daily PnL and limits across all symbols"""
+    return jsonify(get_engine_client().request('risk'))
+
+@app.route('/api/market-data')
+def get_market_data():
+    """Get the latest price snapshot per symbol and how many fetches were shared"""
+    return jsonify(get_engine_client().request('market_data'))
+
+@app.route('/api/orderbook')
+def get_order_book():
+    """Get top levels, spread and depth of a streamed L2 book (?symbol=..., ?levels=N)"""
+    payload = {'symbol': request.args.get('symbol'), 'levels': request.args.get('levels', 10, type=int)}
+    return jsonify(get_engine_client().request('order_book', payload))
+
+@app.route('/api/cadence')
+def get_cadence():
+    """Get each running symbol's adaptive polling interval and the inputs behind it"""
+    return jsonify(get_engine_client().request('cadence'))
+
 @app.route('/api/positions')
 def get_positions():
     """Get current positions"""
     try:
-        if not trading_bot:
-            return jsonify({'success': False, 'message': 'Bot not initialized'})
-        
-        positions = trading_bot.api.get_positions()
-        return jsonify({'success': True, 'positions': positions})
-        
+        return jsonify(get_engine_client().request('positions', timeout=60))
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error getting positions: {str(e)}'})
 
@@ -648,45 +661,47 @@ def get_positions():
 def get_orders():
     """Get current orders"""
     try:
-        if not trading_bot:
-            return jsonify({'success': False, 'message': 'Bot not initialized'})
-        
-        orders = trading_bot.api.get_orders()
-        return jsonify({'success': True, 'orders': orders})
-        
+        return jsonify(get_engine_client().request('orders', timeout=60))
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error getting orders: {str(e)}'})
 
+@app.route('/api/paper/summary')
+def get_paper_summary():
+    """Get simulated PnL, fees and order counts for paper trading"""
+    return jsonify(get_engine_client().request('paper_summary'))
+
+@app.route('/api/latency')
+def get_latency():
+    """Get tick-to-order latency percentiles per stage"""
+    return jsonify(get_engine_client().request('latency'))
+
+@app.route('/api/latency/export', methods=['POST'])
+def export_latency_trace():
+    """Write buffered spans to a trace file (open in chrome://tracing or Perfetto)"""
+    try:
+        path = os.environ.get('LATENCY_TRACE_FILE') or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'traces', f"latency_{int(time.time())}.json")
+        return jsonify(get_engine_client().request('latency_export', {'path': path}))
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error exporting latency trace: {str(e)}'})
+
+@app.route('/api/latency/reset', methods=['POST'])
+def reset_latency():
+    """Clear recorded latency spans"""
+    return jsonify(get_engine_client().request('latency_reset'))
+
 @app.route('/api/manual-trade', methods=['POST'])
 def manual_trade():
     """Execute manual trade"""
     try:
-        if not trading_bot:
-            return jsonify({'success': False, 'message': 'Bot not initialized'})
-        
         data = request.get_json()
         side = data.get('side')  # 'buy' or 'sell'
-        size = data.get('size', 1)
-        order_type = data.get('order_type', 'market_order')
         
         if not side:
             return jsonify({'success': False, 'message': 'Side (buy/sell) required'})
         
-        # Get current price
-        current_price = trading_bot.update_current_price()
-        if not current_price:
-            return jsonify({'success': False, 'message': 'Could not get current price'})
-        
-        # Execute trade
-        if side == 'buy':
-            success = trading_bot.open_long_position(current_price)
-        else:
-            success = trading_bot.open_short_position(current_price)
-        
-        if success:
-            return jsonify({'success': True, 'message': f'{side.capitalize()} order executed'})
-        else:
-            return jsonify({'success': False, 'message': 'Failed to execute order'})
+        # Orders are placed by the trading process; allow for exchange round trips
+        return jsonify(get_engine_client().request('manual_trade', {'side': side}, timeout=120))
             
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error executing trade: {str(e)}'})
@@ -695,20 +710,7 @@ def manual_trade():
 def close_position():
     """Close current position"""
     try:
-        if not trading_bot:
-            return jsonify({'success': False, 'message': 'Bot not initialized'})
-        
-        position = trading_bot.get_current_position()
-        if not position:
-            return jsonify({'success': False, 'message': 'No position to close'})
-        
-        success = trading_bot.close_position(position)
-        
-        if success:
-            return jsonify({'success': True, 'message': 'Position closed successfully'})
-        else:
-            return jsonify({'success': False, 'message': 'Failed to close position'})
-            
+        return jsonify(get_engine_client().request('close_position', timeout=120))
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error closing position: {str(e)}'})
 
@@ -732,7 +734,14 @@ if __name__ == '__main__':
     # Load configuration from file
     load_config_from_file()
     
-    # Run the Flask app with SocketIO
     port = int(os.environ.get('PORT', 5003))
     debug_mode = os.environ.get('FLASK_ENV', 'development') == 'development'
+    
+    # Start the trading process before serving requests. Under the debug reloader this
+    # module also runs in the watching parent, which serves nothing and must not trade;
+    # only the serving child (WERKZEUG_RUN_MAIN set) starts an engine.
+    if not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_engine_client()
+    
+    # Run the Flask app with SocketIO
     socketio.run(app, debug=debug_mode, host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
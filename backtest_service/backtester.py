@@ -0,0 +1,211 @@
+"""
+Vectorized backtester for the SMA/EMA crossover strategy implemented in
+strategymovingaverage.MovingAverageTradingBot.
+
+Prices are processed as a 2D batch (simulations x bars) so the same code path
+serves a single historical backtest and thousands of resampled price paths.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def rolling_sma(prices: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average along the last axis, NaN until `period` bars exist"""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(prices.shape, np.nan)
+    if prices.shape[-1] < period:
+        return out
+    csum = np.cumsum(prices, axis=-1)
+    out[..., period - 1] = csum[..., period - 1] / period
+    out[..., period:] = (csum[..., period:] - csum[..., :-period]) / period
+    return out
+
+
+def rolling_ema(prices: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the SMA of the first `period` bars
+
+    Matches TechnicalIndicators.ema, vectorized across the leading axis.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(prices.shape, np.nan)
+    if prices.shape[-1] < period:
+        return out
+    multiplier = 2 / (period + 1)
+    value = prices[..., :period].mean(axis=-1)
+    out[..., period - 1] = value
+    for t in range(period, prices.shape[-1]):
+        value = prices[..., t] * multiplier + value * (1 - multiplier)
+        out[..., t] = value
+    return out
+
+
+def crossover_signals(short_ma: np.ndarray, long_ma: np.ndarray) -> np.ndarray:
+    """Return +1 on golden cross, -1 on death cross and 0 otherwise for every bar"""
+    diff = short_ma - long_ma
+    prev = np.empty_like(diff)
+    prev[..., 0] = np.nan
+    prev[..., 1:] = diff[..., :-1]
+    with np.errstate(invalid='ignore'):
+        golden = (prev <= 0) & (diff > 0)
+        death = (prev >= 0) & (diff < 0)
+    return golden.astype(np.int8) - death.astype(np.int8)
+
+
+class MovingAverageBacktester:
+    """Backtest the moving average crossover strategy over one or many price paths"""
+
+    def __init__(self, short_ma_period: int = 9, long_ma_period: int = 10,
+                 ema_short_period: int = 9, ema_long_period: int = 10,
+                 stop_loss_pct: float = 0.02, take_profit_pct: float = 0.04,
+                 fee_pct: float = 0.0005, bars_per_day: int = 24):
+        self.short_ma_period = short_ma_period
+        self.long_ma_period = long_ma_period
+        self.ema_short_period = ema_short_period
+        self.ema_long_period = ema_long_period
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.fee_pct = fee_pct
+        self.bars_per_day = bars_per_day
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'MovingAverageBacktester':
+        """Build a backtester from a trading_config style dictionary (percent values)"""
+        return cls(
+            short_ma_period=int(config.get('sma_short_period', 9)),
+            long_ma_period=int(config.get('sma_long_period', 10)),
+            ema_short_period=int(config.get('ema_short_period', 9)),
+            ema_long_period=int(config.get('ema_long_period', 10)),
+            stop_loss_pct=float(config.get('stop_loss_percent', 2)) / 100,
+            take_profit_pct=float(config.get('take_profit_percent', 4)) / 100,
+            fee_pct=float(config.get('fee_percent', 0.05)) / 100,
+            bars_per_day=int(config.get('bars_per_day', 24)),
+        )
+
+    def generate_signals(self, prices: np.ndarray) -> np.ndarray:
+        """SMA crossover is the primary signal, EMA crossover fills in when SMA is silent"""
+        sma_signal = crossover_signals(rolling_sma(prices, self.short_ma_period),
+                                       rolling_sma(prices, self.long_ma_period))
+        ema_signal = crossover_signals(rolling_ema(prices, self.ema_short_period),
+                                       rolling_ema(prices, self.ema_long_period))
+        return np.where(sma_signal != 0, sma_signal, ema_signal)
+
+    def simulate(self, prices: np.ndarray, record_trades: bool = False) -> Dict:
+        """Run the strategy over a (simulations x bars) price array
+
+        Returns the mark-to-market equity curve of every path in fractional
+        returns per unit of position, plus trade counts and (optionally) the
+        list of closed trades.
+        """
+        prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        n_paths, n_bars = prices.shape
+        signals = self.generate_signals(prices)
+
+        position = np.zeros(n_paths, dtype=np.int8)
+        entry_price = np.ones(n_paths)
+        entry_index = np.zeros(n_paths, dtype=np.int64)
+        realized = np.zeros(n_paths)
+        trade_count = np.zeros(n_paths, dtype=np.int64)
+        equity = np.empty((n_paths, n_bars))
+        trades: List[Dict] = []
+
+        for t in range(n_bars):
+            price = prices[:, t]
+            open_ret = position * (price - entry_price) / entry_price
+
+            # Stop loss / take profit exits
+            hit = (position != 0) & ((open_ret <= -self.stop_loss_pct) | (open_ret >= self.take_profit_pct))
+            # Signal driven reversals (skip when already positioned on the same side)
+            signal = signals[:, t]
+            flip = (signal != 0) & (signal != position)
+            close = hit | (flip & (position != 0))
+
+            if close.any():
+                realized[close] += open_ret[close] - self.fee_pct
+                trade_count[close] += 1
+                if record_trades:
+                    self._record_closed(trades, close, position, entry_index, entry_price,
+                                        t, price, open_ret)
+                position[close] = 0
+
+            if flip.any():
+                position[flip] = signal[flip]
+                entry_price[flip] = price[flip]
+                entry_index[flip] = t
+                realized[flip] -= self.fee_pct
+
+            equity[:, t] = realized + position * (price - entry_price) / entry_price
+
+        result = {
+            'equity': equity,
+            'final_pnl': equity[:, -1] if n_bars else np.zeros(n_paths),
+            'trade_count': trade_count,
+        }
+        if record_trades:
+            result['trades'] = trades
+        return result
+
+    def _record_closed(self, trades: List[Dict], close: np.ndarray, position: np.ndarray,
+                       entry_index: np.ndarray, entry_price: np.ndarray, exit_index: int,
+                       price: np.ndarray, open_ret: np.ndarray):
+        """Append closed trades to `trades` (used for single-path runs)"""
+        for path in np.flatnonzero(close):
+            trades.append({
+                'path': int(path),
+                'side': 'long' if position[path] > 0 else 'short',
+                'entry_index': int(entry_index[path]),
+                'exit_index': int(exit_index),
+                'entry_price': float(entry_price[path]),
+                'exit_price': float(price[path]),
+                'return': float(open_ret[path] - 2 * self.fee_pct),
+            })
+
+    def run(self, prices: List[float], timestamps: Optional[List[int]] = None) -> Dict:
+        """Backtest a single historical price series"""
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.size < max(self.long_ma_period, self.ema_long_period) + 1:
+            logger.warning("Not enough price data for backtest")
+            return {'trades': [], 'trade_returns': np.array([]), 'trade_days': np.array([], dtype=np.int64),
+                    'equity': np.zeros(prices.size), 'final_pnl': 0.0, 'max_drawdown': 0.0,
+                    'daily_pnl': np.array([]), 'trade_count': 0}
+
+        result = self.simulate(prices, record_trades=True)
+        equity = result['equity'][0]
+        trades = result['trades']
+        for trade in trades:
+            trade.pop('path', None)
+            if timestamps is not None:
+                trade['entry_time'] = timestamps[trade['entry_index']]
+                trade['exit_time'] = timestamps[trade['exit_index']]
+
+        return {
+            'trades': trades,
+            'trade_returns': np.array([trade['return'] for trade in trades]),
+            'trade_days': np.array([trade['exit_index'] // self.bars_per_day for trade in trades], dtype=np.int64),
+            'equity': equity,
+            'final_pnl': float(equity[-1]),
+            'max_drawdown': float(max_drawdown(equity)[0]),
+            'daily_pnl': daily_pnl(equity, self.bars_per_day)[0],
+            'trade_count': int(result['trade_count'][0]),
+        }
+
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall of each equity curve (starting from zero)"""
+    equity = np.atleast_2d(equity)
+    peaks = np.maximum.accumulate(np.maximum(equity, 0), axis=-1)
+    return (peaks - equity).max(axis=-1)
+
+
+def daily_pnl(equity: np.ndarray, bars_per_day: int) -> np.ndarray:
+    """Per-day PnL of each equity curve, bucketing bars into days of `bars_per_day`"""
+    equity = np.atleast_2d(equity)
+    n_paths, n_bars = equity.shape
+    n_days = -(-n_bars // bars_per_day)
+    day_close_idx = np.minimum(np.arange(1, n_days + 1) * bars_per_day, n_bars) - 1
+    day_close = equity[:, day_close_idx]
+    return np.diff(day_close, axis=-1, prepend=0.0)
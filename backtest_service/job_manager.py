@@ -0,0 +1,419 @@
+"""
+Asynchronous backtest jobs for the web backend.
+
+Jobs are accepted from request threads, coordinated on a background thread
+and executed on a process pool so CPU-bound backtests never run on the
+Flask/Socket.IO threads. Every job is persisted to SQLite keyed by a hash of
+its normalized spec, so identical specs are served from the stored result
+instead of being recomputed.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backtest_service.backtester import MovingAverageBacktester
+from backtest_service.monte_carlo import MonteCarloAnalyzer
+from backtest_service.optimizer import DEFAULT_SEARCH_SPACE, ORDERED_PAIRS, ParameterOptimizer
+from strategymovingaverage import RESOLUTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_PARAMS = ['sma_short_period', 'sma_long_period', 'ema_short_period', 'ema_long_period',
+                   'stop_loss_percent', 'take_profit_percent', 'fee_percent']
+
+MAX_SWEEP_SIZE = 5000
+MAX_MONTE_CARLO_SIMULATIONS = 20000
+MAX_OPTIMIZER_EVALUATIONS = 5000
+SWEEP_CHUNK_SIZE = 25
+
+
+def is_number(value) -> bool:
+    """int or float, but not bool"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_param(key: str, value):
+    """A strategy parameter in normalized form: periods are integers >= 1, the rest non-negative numbers"""
+    if key.endswith('_period'):
+        if not is_number(value) or not float(value).is_integer() or value < 1:
+            raise ValueError(f"Invalid value for {key}: must be an integer of at least 1")
+        return int(value)
+    if not is_number(value) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"Invalid value for {key}: must be a non-negative number")
+    return value
+
+
+def check_ordered(params: Dict, skip: Tuple[str, ...] = ()):
+    """Short periods must be below their long counterparts"""
+    for short_key, long_key in ORDERED_PAIRS:
+        if short_key in skip or long_key in skip:
+            continue
+        if short_key in params and long_key in params and params[short_key] >= params[long_key]:
+            raise ValueError(f"{short_key} ({params[short_key]}) must be below {long_key} ({params[long_key]})")
+
+
+def summarize_backtest(result: Dict) -> Dict:
+    """JSON-serializable summary of MovingAverageBacktester.run output"""
+    return {
+        'final_pnl': result['final_pnl'],
+        'max_drawdown': result['max_drawdown'],
+        'trade_count': result['trade_count'],
+        'win_rate': float((result['trade_returns'] > 0).mean()) if result['trade_count'] else 0.0,
+        'equity': np.round(result['equity'], 6).tolist(),
+        'trades': result['trades'],
+    }
+
+
+def run_backtest_task(params: Dict, prices: List[float], timestamps: Optional[List[int]] = None,
+                      monte_carlo: Optional[Dict] = None) -> Dict:
+    """Process pool entry point: backtest one parameter set (optionally with Monte Carlo)"""
+    backtester = MovingAverageBacktester.from_config(params)
+    result = backtester.run(prices, timestamps)
+    summary = summarize_backtest(result)
+
+    if monte_carlo:
+        analyzer = MonteCarloAnalyzer(seed=monte_carlo.get('seed'))
+        simulations = int(monte_carlo.get('simulations', 1000))
+        if monte_carlo.get('method', 'trades') == 'bootstrap':
+            mc = analyzer.bootstrap_prices(prices, backtester, simulations,
+                                           block_size=int(monte_carlo.get('block_size', backtester.bars_per_day)))
+        else:
+            mc = analyzer.resample_trades(result['trade_returns'], result['trade_days'], simulations)
+        summary['monte_carlo'] = mc['summary']
+
+    return summary
+
+
+def run_sweep_chunk(param_sets: List[Dict], prices: List[float]) -> List[Dict]:
+    """Process pool entry point: backtest a chunk of parameter sets without trade detail"""
+    results = []
+    for params in param_sets:
+        result = MovingAverageBacktester.from_config(params).run(prices)
+        results.append({
+            'params': params,
+            'final_pnl': result['final_pnl'],
+            'max_drawdown': result['max_drawdown'],
+            'trade_count': result['trade_count'],
+        })
+    return results
+
+
+class BacktestJobManager:
+    """Run backtest and sweep jobs on a worker pool with a persistent result cache"""
+
+    def __init__(self, db_path: str = 'backtest_jobs.db', max_workers: Optional[int] = None,
+                 candle_loader: Optional[Callable[[str, str, int, int], Tuple[List[float], List[int]]]] = None,
+                 progress_callback: Optional[Callable[[str, Dict], None]] = None):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.candle_loader = candle_loader
+        self.progress_callback = progress_callback
+        self.executor = None
+        self.lock = threading.RLock()
+        self.active_jobs = {}
+        self.setup_database()
+
+    def setup_database(self):
+        """Setup SQLite table for job specs and results"""
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS backtest_jobs (
+                job_id TEXT PRIMARY KEY,
+                spec TEXT,
+                status TEXT,
+                progress REAL,
+                result TEXT,
+                error TEXT,
+                created_at REAL,
+                completed_at REAL
+            )
+        ''')
+        # Jobs interrupted by a restart cannot resume, mark them failed so they are resubmitted
+        self.conn.execute('''
+            UPDATE backtest_jobs SET status = 'failed', error = 'Interrupted by restart'
+            WHERE status IN ('queued', 'running')
+        ''')
+        self.conn.commit()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    def normalize_spec(self, spec: Dict, defaults: Optional[Dict] = None) -> Dict:
+        """Validate a job spec and resolve it to absolute, hashable form"""
+        defaults = defaults or {}
+        job_type = spec.get('type', 'backtest')
+        if job_type not in ('backtest', 'sweep', 'optimize'):
+            raise ValueError("type must be 'backtest', 'sweep' or 'optimize'")
+
+        resolution = spec.get('resolution', '1h')
+        if resolution not in RESOLUTION_SECONDS:
+            raise ValueError(f"Unsupported resolution: {resolution}")
+        step = RESOLUTION_SECONDS[resolution]
+
+        params = {key: defaults[key] for key in STRATEGY_PARAMS if key in defaults}
+        params.update({key: value for key, value in spec.get('params', {}).items() if key in STRATEGY_PARAMS})
+        params = {key: validate_param(key, value) for key, value in params.items()}
+        params['bars_per_day'] = max(1, 86400 // step)
+
+        normalized = {'type': job_type, 'resolution': resolution, 'params': params}
+
+        if spec.get('prices'):
+            prices = spec['prices']
+            if not isinstance(prices, list) or any(not is_number(p) or not math.isfinite(p) or p <= 0 for p in prices):
+                raise ValueError("prices must be a list of positive numbers")
+            normalized['prices'] = [float(p) for p in prices]
+        else:
+            normalized['symbol'] = spec.get('symbol') or defaults.get('trading_symbol', 'BTCUSD')
+            # Align relative windows to closed candles so repeated requests hash identically
+            end = int(spec.get('end') or time.time()) // step * step
+            start = int(spec.get('start') or end - int(spec.get('lookback_hours', 24 * 30)) * 3600)
+            if start >= end:
+                raise ValueError("start must be before end")
+            normalized['start'] = start // step * step
+            normalized['end'] = end
+
+        if job_type == 'sweep':
+            grid = spec.get('grid') or {}
+            if not grid or any(key not in STRATEGY_PARAMS or not isinstance(values, list) or not values
+                               for key, values in grid.items()):
+                raise ValueError(f"grid must map strategy parameters ({', '.join(STRATEGY_PARAMS)}) to value lists")
+            grid = {key: [validate_param(key, value) for value in values] for key, values in grid.items()}
+            size = int(np.prod([len(values) for values in grid.values()]))
+            if size > MAX_SWEEP_SIZE:
+                raise ValueError(f"Sweep has {size} combinations, maximum is {MAX_SWEEP_SIZE}")
+            keys = list(grid)
+            for values in itertools.product(*(grid[key] for key in keys)):
+                check_ordered({**params, **dict(zip(keys, values))})
+            normalized['grid'] = {key: grid[key] for key in sorted(grid)}
+        elif job_type == 'optimize':
+            space = spec.get('space') or {key: list(bounds) for key, bounds in DEFAULT_SEARCH_SPACE.items()}
+            if not isinstance(space, dict) or any(
+                    key not in STRATEGY_PARAMS or not isinstance(bounds, list) or len(bounds) != 3
+                    or not is_number(bounds[0]) or not is_number(bounds[1]) or bounds[0] >= bounds[1]
+                    or not isinstance(bounds[2], bool) for key, bounds in space.items()):
+                raise ValueError("space must map strategy parameters to [low, high, is_integer] with low < high")
+            if any(key.endswith('_period') and (bounds[0] < 1 or not bounds[2]) for key, bounds in space.items()):
+                raise ValueError("Period bounds in space must be integer ranges starting at 1 or above")
+            # The optimizer keeps searched pairs ordered itself; fixed pairs must already be
+            check_ordered(params, skip=tuple(space))
+            evaluations = int(spec.get('max_evaluations', 300))
+            if not 0 < evaluations <= MAX_OPTIMIZER_EVALUATIONS:
+                raise ValueError(f"max_evaluations must be between 1 and {MAX_OPTIMIZER_EVALUATIONS}")
+            population_size = spec.get('population_size')
+            # CMA-ES recombines the best half of each generation, so it needs at least two candidates
+            if population_size is not None and (not isinstance(population_size, int) or isinstance(population_size, bool)
+                                                or not 2 <= population_size <= evaluations):
+                raise ValueError(f"population_size must be an integer between 2 and max_evaluations ({evaluations})")
+            normalized['space'] = {key: space[key] for key in sorted(space)}
+            normalized['max_evaluations'] = evaluations
+            normalized['population_size'] = population_size
+            normalized['seed'] = spec.get('seed', 0)
+        else:
+            check_ordered(params)
+            if spec.get('monte_carlo'):
+                normalized['monte_carlo'] = self._normalize_monte_carlo(spec['monte_carlo'])
+
+        return normalized
+
+    @staticmethod
+    def _normalize_monte_carlo(monte_carlo) -> Dict:
+        """Validate Monte Carlo options and bound the number of simulations"""
+        if not isinstance(monte_carlo, dict):
+            raise ValueError("monte_carlo must be an object")
+        method = monte_carlo.get('method', 'trades')
+        if method not in ('trades', 'bootstrap'):
+            raise ValueError("monte_carlo.method must be 'trades' or 'bootstrap'")
+        simulations = monte_carlo.get('simulations', 1000)
+        if not isinstance(simulations, int) or isinstance(simulations, bool) \
+                or not 0 < simulations <= MAX_MONTE_CARLO_SIMULATIONS:
+            raise ValueError(f"monte_carlo.simulations must be an integer between 1 and {MAX_MONTE_CARLO_SIMULATIONS}")
+        normalized = {'method': method, 'simulations': simulations}
+        if monte_carlo.get('block_size') is not None:
+            block_size = monte_carlo['block_size']
+            if not isinstance(block_size, int) or isinstance(block_size, bool) or block_size < 1:
+                raise ValueError("monte_carlo.block_size must be a positive integer")
+            normalized['block_size'] = block_size
+        if monte_carlo.get('seed') is not None:
+            if not isinstance(monte_carlo['seed'], int) or isinstance(monte_carlo['seed'], bool):
+                raise ValueError("monte_carlo.seed must be an integer")
+            normalized['seed'] = monte_carlo['seed']
+        return normalized
+
+    @staticmethod
+    def spec_key(spec: Dict) -> str:
+        """Stable cache key for a normalized spec"""
+        payload = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+    def submit(self, spec: Dict, defaults: Optional[Dict] = None) -> Dict:
+        """Queue a job, or return the cached/in-flight job with the same spec"""
+        normalized = self.normalize_spec(spec, defaults)
+        job_id = self.spec_key(normalized)
+
+        with self.lock:
+            existing = self.get_job(job_id, include_result=False)
+            if existing and existing['status'] == 'completed':
+                logger.info(f"Backtest job {job_id} served from cache")
+                return {'job_id': job_id, 'status': 'completed', 'cached': True}
+            if job_id in self.active_jobs:
+                return {'job_id': job_id, 'status': existing['status'] if existing else 'queued', 'cached': False}
+
+            self.conn.execute('''
+                INSERT OR REPLACE INTO backtest_jobs (job_id, spec, status, progress, result, error, created_at)
+                VALUES (?, ?, 'queued', 0, NULL, NULL, ?)
+            ''', (job_id, json.dumps(normalized), time.time()))
+            self.conn.commit()
+
+            job_thread = threading.Thread(target=self._run_job, args=(job_id, normalized))
+            job_thread.daemon = True
+            self.active_jobs[job_id] = job_thread
+            job_thread.start()
+
+        logger.info(f"Backtest job {job_id} queued ({normalized['type']})")
+        return {'job_id': job_id, 'status': 'queued', 'cached': False}
+
+    def _update(self, job_id: str, **fields):
+        """Persist job fields and forward progress to the callback"""
+        columns = ', '.join(f"{key} = ?" for key in fields)
+        with self.lock:
+            self.conn.execute(f'UPDATE backtest_jobs SET {columns} WHERE job_id = ?',
+                              (*fields.values(), job_id))
+            self.conn.commit()
+
+        if self.progress_callback:
+            payload = {'job_id': job_id, 'status': fields.get('status'), 'progress': fields.get('progress')}
+            if fields.get('error'):
+                payload['error'] = fields['error']
+            try:
+                self.progress_callback('backtest_progress', payload)
+            except Exception as e:
+                logger.error(f"Error emitting backtest progress: {e}")
+
+    def _load_prices(self, spec: Dict) -> Tuple[List[float], Optional[List[int]]]:
+        """Prices supplied with the spec, or candles from the configured loader"""
+        if 'prices' in spec:
+            return spec['prices'], None
+        if not self.candle_loader:
+            raise RuntimeError("No candle loader configured and no prices supplied")
+        return self.candle_loader(spec['symbol'], spec['resolution'], spec['start'], spec['end'])
+
+    def _run_job(self, job_id: str, spec: Dict):
+        """Coordinate one job on the worker pool (runs on its own thread)"""
+        try:
+            self._update(job_id, status='running', progress=0.0)
+            prices, timestamps = self._load_prices(spec)
+            if not prices:
+                raise RuntimeError("No price data available for the requested window")
+
+            executor = self._get_executor()
+            if spec['type'] == 'backtest':
+                future = executor.submit(run_backtest_task, spec['params'], prices, timestamps,
+                                         spec.get('monte_carlo'))
+                result = future.result()
+            elif spec['type'] == 'sweep':
+                result = self._run_sweep(job_id, spec, prices, executor)
+            else:
+                result = self._run_optimizer(job_id, spec, prices, executor)
+
+            self._update(job_id, status='completed', progress=1.0, result=json.dumps(result),
+                         completed_at=time.time())
+            logger.info(f"Backtest job {job_id} completed")
+
+        except Exception as e:
+            logger.error(f"Backtest job {job_id} failed: {e}")
+            self._update(job_id, status='failed', error=str(e), completed_at=time.time())
+        finally:
+            with self.lock:
+                self.active_jobs.pop(job_id, None)
+
+    def _run_sweep(self, job_id: str, spec: Dict, prices: List[float], executor: ProcessPoolExecutor) -> Dict:
+        """Fan a parameter grid out over the pool in chunks, reporting progress per chunk"""
+        grid = spec['grid']
+        keys = list(grid)
+        param_sets = [{**spec['params'], **dict(zip(keys, values))}
+                      for values in itertools.product(*(grid[key] for key in keys))]
+
+        futures = [executor.submit(run_sweep_chunk, param_sets[i:i + SWEEP_CHUNK_SIZE], prices)
+                   for i in range(0, len(param_sets), SWEEP_CHUNK_SIZE)]
+        results = []
+        for done, future in enumerate(as_completed(futures), 1):
+            results.extend(future.result())
+            self._update(job_id, status='running', progress=round(done / len(futures), 4))
+
+        results.sort(key=lambda r: r['final_pnl'], reverse=True)
+        return {'combinations': len(results), 'best': results[0] if results else None, 'results': results}
+
+    def _run_optimizer(self, job_id: str, spec: Dict, prices: List[float], executor: ProcessPoolExecutor) -> Dict:
+        """Run a CMA-ES search, checkpointing per generation so a resubmitted job resumes"""
+        checkpoint_dir = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'optimizer_checkpoints')
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        optimizer = ParameterOptimizer(
+            prices,
+            base_params=spec['params'],
+            search_space={key: tuple(bounds) for key, bounds in spec['space'].items()},
+            population_size=spec.get('population_size'),
+            checkpoint_path=os.path.join(checkpoint_dir, f'{job_id}.json'),
+            executor=executor,
+            seed=spec.get('seed')
+        )
+        return optimizer.run(
+            max_evaluations=spec['max_evaluations'],
+            progress_callback=lambda status: self._update(job_id, status='running', progress=status['progress'])
+        )
+
+    def get_job(self, job_id: str, include_result: bool = True) -> Optional[Dict]:
+        """Fetch a job's status (and result once completed)"""
+        with self.lock:
+            row = self.conn.execute('''
+                SELECT job_id, spec, status, progress, result, error, created_at, completed_at
+                FROM backtest_jobs WHERE job_id = ?
+            ''', (job_id,)).fetchone()
+        if not row:
+            return None
+
+        job = {
+            'job_id': row[0],
+            'spec': json.loads(row[1]),
+            'status': row[2],
+            'progress': row[3],
+            'error': row[5],
+            'created_at': row[6],
+            'completed_at': row[7]
+        }
+        if include_result and row[4]:
+            job['result'] = json.loads(row[4])
+        return job
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """Most recent jobs without their result payloads"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT job_id, status, progress, error, created_at, completed_at
+                FROM backtest_jobs ORDER BY created_at DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        return [
+            {'job_id': r[0], 'status': r[1], 'progress': r[2], 'error': r[3],
+             'created_at': r[4], 'completed_at': r[5]}
+            for r in rows
+        ]
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,134 @@
+"""
+Monte Carlo and bootstrap robustness analysis of backtest results.
+
+Two resampling schemes are supported:
+
+* trade resampling - draw the backtest's closed-trade returns with replacement
+  to build alternative trade sequences for the same parameters;
+* block bootstrap of prices - stitch together random blocks of historical
+  log returns into synthetic price paths and re-run the strategy on all of
+  them at once with MovingAverageBacktester.simulate.
+
+All simulations are processed in chunks sized from `max_memory_mb`, so the
+peak working set stays bounded no matter how many simulations are requested.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from backtest_service.backtester import MovingAverageBacktester, daily_pnl, max_drawdown
+from strategymovingaverage import RiskManager
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+class MonteCarloAnalyzer:
+    """Batched Monte Carlo stress testing of strategy parameters"""
+
+    def __init__(self, risk_manager: Optional[RiskManager] = None, max_memory_mb: int = 256,
+                 seed: Optional[int] = None):
+        self.risk_manager = risk_manager or RiskManager()
+        self.max_memory_mb = max_memory_mb
+        self.rng = np.random.default_rng(seed)
+
+    def _chunk_rows(self, row_floats: int, arrays: int) -> int:
+        """Number of simulations per chunk that keeps `arrays` float64 work arrays in budget"""
+        budget = self.max_memory_mb * 1024 * 1024
+        return max(1, budget // max(1, row_floats * arrays * 8))
+
+    def resample_trades(self, trade_returns: np.ndarray, trade_days: Optional[np.ndarray] = None,
+                        n_simulations: int = 10000) -> Dict:
+        """Resample closed-trade returns with replacement
+
+        Resampled trades keep the original day layout (trade i of every
+        simulation lands on the day of original trade i) so daily PnL can be
+        checked against RiskManager.max_daily_loss.
+        """
+        trade_returns = np.asarray(trade_returns, dtype=np.float64)
+        n_trades = trade_returns.size
+        if n_trades == 0:
+            logger.warning("No trades to resample")
+            return self._summarize(np.zeros(n_simulations), np.zeros(n_simulations),
+                                   np.zeros(n_simulations, dtype=np.int64))
+
+        if trade_days is None:
+            trade_days = np.zeros(n_trades, dtype=np.int64)
+        trade_days = np.asarray(trade_days, dtype=np.int64)
+        # Start offset of each day's run of trades, for np.add.reduceat
+        day_starts = np.flatnonzero(np.diff(trade_days, prepend=trade_days[0] - 1))
+
+        final_pnl = np.empty(n_simulations)
+        drawdowns = np.empty(n_simulations)
+        breaches = np.empty(n_simulations, dtype=np.int64)
+        chunk = self._chunk_rows(n_trades, arrays=4)
+
+        for start in range(0, n_simulations, chunk):
+            stop = min(start + chunk, n_simulations)
+            sampled = trade_returns[self.rng.integers(0, n_trades, size=(stop - start, n_trades))]
+            equity = np.cumsum(sampled, axis=1)
+            per_day = np.add.reduceat(sampled, day_starts, axis=1)
+
+            final_pnl[start:stop] = equity[:, -1]
+            drawdowns[start:stop] = max_drawdown(equity)
+            breaches[start:stop] = (per_day <= -self.risk_manager.max_daily_loss).sum(axis=1)
+
+        return self._summarize(final_pnl, drawdowns, breaches)
+
+    def bootstrap_prices(self, prices: np.ndarray, backtester: MovingAverageBacktester,
+                         n_simulations: int = 1000, block_size: int = 24) -> Dict:
+        """Block-bootstrap historical log returns into synthetic paths and backtest them all"""
+        prices = np.asarray(prices, dtype=np.float64)
+        log_returns = np.diff(np.log(prices))
+        n_returns = log_returns.size
+        if n_returns < block_size:
+            raise ValueError(f"Need at least {block_size + 1} prices for block size {block_size}")
+
+        n_blocks = -(-n_returns // block_size)
+        offsets = np.arange(block_size)
+        n_bars = n_returns + 1
+
+        final_pnl = np.empty(n_simulations)
+        drawdowns = np.empty(n_simulations)
+        breaches = np.empty(n_simulations, dtype=np.int64)
+        # Paths, signals, EMA/SMA work arrays and the equity curve per simulation
+        chunk = self._chunk_rows(n_bars, arrays=10)
+
+        for start in range(0, n_simulations, chunk):
+            stop = min(start + chunk, n_simulations)
+            block_starts = self.rng.integers(0, n_returns - block_size + 1, size=(stop - start, n_blocks))
+            index = (block_starts[:, :, None] + offsets).reshape(stop - start, -1)[:, :n_returns]
+
+            paths = np.empty((stop - start, n_bars))
+            paths[:, 0] = 0.0
+            np.cumsum(log_returns[index], axis=1, out=paths[:, 1:])
+            np.exp(paths, out=paths)
+            paths *= prices[0]
+
+            equity = backtester.simulate(paths)['equity']
+            final_pnl[start:stop] = equity[:, -1]
+            drawdowns[start:stop] = max_drawdown(equity)
+            breaches[start:stop] = (daily_pnl(equity, backtester.bars_per_day)
+                                    <= -self.risk_manager.max_daily_loss).sum(axis=1)
+
+        return self._summarize(final_pnl, drawdowns, breaches)
+
+    def _summarize(self, final_pnl: np.ndarray, drawdowns: np.ndarray, breaches: np.ndarray) -> Dict:
+        """Distributions plus percentile summaries of the simulated outcomes"""
+        return {
+            'simulations': int(final_pnl.size),
+            'final_pnl': final_pnl,
+            'max_drawdown': drawdowns,
+            'daily_loss_breaches': breaches,
+            'summary': {
+                'final_pnl': {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(final_pnl, PERCENTILES))},
+                'max_drawdown': {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(drawdowns, PERCENTILES))},
+                'prob_loss': float((final_pnl < 0).mean()),
+                'prob_daily_loss_breach': float((breaches > 0).mean()),
+                'mean_daily_loss_breaches': float(breaches.mean()),
+                'max_daily_loss': self.risk_manager.max_daily_loss,
+            }
+        }
@@ -0,0 +1,297 @@
+"""
+Sample-efficient strategy parameter search.
+
+ParameterOptimizer runs a CMA-ES (covariance matrix adaptation evolution
+strategy) over a normalized parameter space and proposes each generation as
+one batch of backtests for a worker pool. Candidates are first scored on the
+leading part of the history; those clearly worse than what completed trials
+achieved at the same point are pruned before the full backtest. State is
+checkpointed to JSON after every generation so long searches can resume.
+"""
+
+import json
+import logging
+import math
+import os
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backtest_service.backtester import MovingAverageBacktester
+
+logger = logging.getLogger(__name__)
+
+# name -> (low, high, is_integer); percent values use trading_config units
+DEFAULT_SEARCH_SPACE = {
+    'sma_short_period': (3, 50, True),
+    'sma_long_period': (5, 200, True),
+    'ema_short_period': (3, 50, True),
+    'ema_long_period': (5, 200, True),
+    'stop_loss_percent': (0.5, 10.0, False),
+    'take_profit_percent': (0.5, 20.0, False),
+}
+
+# Short/long pairs that must stay ordered for the strategy to make sense
+ORDERED_PAIRS = [('sma_short_period', 'sma_long_period'), ('ema_short_period', 'ema_long_period')]
+
+
+def score_backtest(result: Dict, drawdown_penalty: float = 0.5) -> float:
+    """Objective: final PnL penalized by maximum drawdown"""
+    return float(result['final_pnl'] - drawdown_penalty * result['max_drawdown'])
+
+
+def evaluate_param_sets(param_sets: List[Dict], prices: List[float], stop: Optional[int] = None,
+                        drawdown_penalty: float = 0.5) -> List[float]:
+    """Process pool entry point: score parameter sets on prices[:stop]"""
+    window = prices[:stop] if stop else prices
+    return [score_backtest(MovingAverageBacktester.from_config(params).run(window), drawdown_penalty)
+            for params in param_sets]
+
+
+class ParameterOptimizer:
+    """CMA-ES parameter search with batched evaluation, pruning and checkpointing"""
+
+    def __init__(self, prices: List[float], base_params: Optional[Dict] = None,
+                 search_space: Optional[Dict[str, Tuple[float, float, bool]]] = None,
+                 population_size: Optional[int] = None, sigma: float = 0.3,
+                 prune_fraction: float = 0.4, prune_percentile: float = 50,
+                 min_trials_before_pruning: int = 10, drawdown_penalty: float = 0.5,
+                 checkpoint_path: Optional[str] = None, executor: Optional[Executor] = None,
+                 chunk_size: int = 4, seed: Optional[int] = None):
+        self.prices = [float(p) for p in prices]
+        self.base_params = dict(base_params or {})
+        self.search_space = dict(search_space or DEFAULT_SEARCH_SPACE)
+        self.names = list(self.search_space)
+        self.dim = len(self.names)
+        self.population_size = population_size or 4 + int(3 * math.log(self.dim))
+        self.prune_fraction = prune_fraction
+        self.prune_percentile = prune_percentile
+        self.min_trials_before_pruning = min_trials_before_pruning
+        self.drawdown_penalty = drawdown_penalty
+        self.checkpoint_path = checkpoint_path
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+
+        self._setup_strategy_parameters()
+
+        # Search state (everything below is checkpointed)
+        self.generation = 0
+        self.evaluations = 0
+        self.pruned = 0
+        self.mean = np.full(self.dim, 0.5)
+        self.sigma = sigma
+        self.cov = np.eye(self.dim)
+        self.path_sigma = np.zeros(self.dim)
+        self.path_cov = np.zeros(self.dim)
+        self.best_params = None
+        self.best_score = -np.inf
+        self.prefix_scores: List[float] = []
+        self.score_cache: Dict[str, float] = {}
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_checkpoint()
+
+    def _setup_strategy_parameters(self):
+        """Standard CMA-ES learning rates for the chosen dimension and population"""
+        n, lam = self.dim, self.population_size
+        self.mu = lam // 2
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1 / np.sum(self.weights ** 2)
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+    def decode(self, x: np.ndarray) -> Dict:
+        """Map a point of the unit cube to a concrete parameter set"""
+        params = dict(self.base_params)
+        for value, name in zip(np.clip(x, 0, 1), self.names):
+            low, high, is_integer = self.search_space[name]
+            decoded = low + value * (high - low)
+            params[name] = int(round(decoded)) if is_integer else round(float(decoded), 4)
+
+        for short_key, long_key in ORDERED_PAIRS:
+            if short_key in params and long_key in params and params[short_key] >= params[long_key]:
+                params[short_key], params[long_key] = params[long_key], params[short_key]
+                if params[short_key] == params[long_key]:
+                    params[long_key] += 1
+        return params
+
+    @staticmethod
+    def _params_key(params: Dict) -> str:
+        return json.dumps(params, sort_keys=True)
+
+    def _evaluate(self, param_sets: List[Dict], stop: Optional[int]) -> List[float]:
+        """Score a batch of parameter sets, in parallel chunks when an executor is set"""
+        if not param_sets:
+            return []
+        if self.executor is None:
+            return evaluate_param_sets(param_sets, self.prices, stop, self.drawdown_penalty)
+
+        chunks = [param_sets[i:i + self.chunk_size] for i in range(0, len(param_sets), self.chunk_size)]
+        futures = [self.executor.submit(evaluate_param_sets, chunk, self.prices, stop, self.drawdown_penalty)
+                   for chunk in chunks]
+        return [score for future in futures for score in future.result()]
+
+    def ask(self) -> Tuple[np.ndarray, List[Dict]]:
+        """Sample one generation of candidates"""
+        eigenvalues, basis = np.linalg.eigh(self.cov)
+        scale = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        z = self.rng.standard_normal((self.population_size, self.dim))
+        samples = self.mean + self.sigma * (z * scale) @ basis.T
+        samples = np.clip(samples, 0, 1)
+        return samples, [self.decode(x) for x in samples]
+
+    def evaluate_generation(self, param_sets: List[Dict]) -> np.ndarray:
+        """Score a generation, pruning weak candidates on a prefix of the history"""
+        scores = np.full(len(param_sets), np.nan)
+        pending = []
+        for i, params in enumerate(param_sets):
+            cached = self.score_cache.get(self._params_key(params))
+            if cached is not None:
+                scores[i] = cached
+            else:
+                pending.append(i)
+
+        stop = int(len(self.prices) * self.prune_fraction)
+        survivors = pending
+        if pending and 0 < self.prune_fraction < 1:
+            prefix = self._evaluate([param_sets[i] for i in pending], stop)
+            can_prune = len(self.prefix_scores) >= self.min_trials_before_pruning
+            threshold = np.percentile(self.prefix_scores, self.prune_percentile) if can_prune else -np.inf
+            survivors = []
+            for i, score in zip(pending, prefix):
+                if score >= threshold:
+                    survivors.append(i)
+                    # Track prefix performance of completed trials for future pruning decisions
+                    self.prefix_scores.append(score)
+                else:
+                    # Rank pruned candidates below every completed one, ordered by prefix score
+                    scores[i] = score - 1e6
+            self.pruned += len(pending) - len(survivors)
+
+        full = self._evaluate([param_sets[i] for i in survivors], None)
+        self.evaluations += len(pending)
+        for i, score in zip(survivors, full):
+            scores[i] = score
+            self.score_cache[self._params_key(param_sets[i])] = score
+            if score > self.best_score:
+                self.best_score = score
+                self.best_params = param_sets[i]
+
+        return scores
+
+    def tell(self, samples: np.ndarray, scores: np.ndarray):
+        """CMA-ES update of mean, step size and covariance from a scored generation"""
+        order = np.argsort(-scores)[:self.mu]
+        selected = samples[order]
+        old_mean = self.mean
+        self.mean = self.weights @ selected
+        step = (self.mean - old_mean) / self.sigma
+
+        eigenvalues, basis = np.linalg.eigh(self.cov)
+        inv_sqrt = basis @ np.diag(1 / np.sqrt(np.maximum(eigenvalues, 1e-20))) @ basis.T
+        self.path_sigma = ((1 - self.cs) * self.path_sigma
+                           + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt @ step)
+        norm = np.linalg.norm(self.path_sigma)
+        hsig = norm / math.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) / self.chi_n < 1.4 + 2 / (self.dim + 1)
+        self.path_cov = (1 - self.cc) * self.path_cov + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * step
+
+        deviations = (selected - old_mean) / self.sigma
+        self.cov = ((1 - self.c1 - self.cmu) * self.cov
+                    + self.c1 * (np.outer(self.path_cov, self.path_cov)
+                                 + (1 - hsig) * self.cc * (2 - self.cc) * self.cov)
+                    + self.cmu * (deviations.T * self.weights) @ deviations)
+        self.sigma *= math.exp((self.cs / self.damps) * (norm / self.chi_n - 1))
+        self.sigma = float(min(self.sigma, 1.0))
+        self.generation += 1
+
+    def run(self, max_evaluations: int = 300, max_generations: Optional[int] = None,
+            progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Optimize until the evaluation budget or generation limit is exhausted"""
+        while self.evaluations < max_evaluations and (max_generations is None or self.generation < max_generations):
+            samples, param_sets = self.ask()
+            scores = self.evaluate_generation(param_sets)
+            self.tell(samples, scores)
+            self.save_checkpoint()
+
+            logger.info(f"Optimizer generation {self.generation}: best score {self.best_score:.4f}, "
+                        f"{self.evaluations} evaluations, {self.pruned} pruned")
+            if progress_callback:
+                progress_callback(self.status(max_evaluations))
+
+            if self.sigma < 1e-3:
+                logger.info("Optimizer converged")
+                break
+
+        return self.status(max_evaluations)
+
+    def status(self, max_evaluations: Optional[int] = None) -> Dict:
+        """Current best result and search statistics"""
+        status = {
+            'generation': self.generation,
+            'evaluations': self.evaluations,
+            'pruned': self.pruned,
+            'sigma': self.sigma,
+            'best_score': float(self.best_score) if self.best_params else None,
+            'best_params': self.best_params,
+        }
+        if max_evaluations:
+            status['progress'] = round(min(1.0, self.evaluations / max_evaluations), 4)
+        return status
+
+    def save_checkpoint(self):
+        """Write search state to the checkpoint file (atomically)"""
+        if not self.checkpoint_path:
+            return
+        state = {
+            'names': self.names,
+            'generation': self.generation,
+            'evaluations': self.evaluations,
+            'pruned': self.pruned,
+            'mean': self.mean.tolist(),
+            'sigma': self.sigma,
+            'cov': self.cov.tolist(),
+            'path_sigma': self.path_sigma.tolist(),
+            'path_cov': self.path_cov.tolist(),
+            'best_params': self.best_params,
+            'best_score': float(self.best_score) if self.best_params else None,
+            'prefix_scores': self.prefix_scores,
+            'score_cache': self.score_cache,
+            'rng_state': self.rng.bit_generator.state,
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self):
+        """Resume search state from the checkpoint file"""
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                state = json.load(f)
+            if state['names'] != self.names:
+                logger.warning("Checkpoint search space differs, starting a fresh search")
+                return
+
+            self.generation = state['generation']
+            self.evaluations = state['evaluations']
+            self.pruned = state['pruned']
+            self.mean = np.array(state['mean'])
+            self.sigma = state['sigma']
+            self.cov = np.array(state['cov'])
+            self.path_sigma = np.array(state['path_sigma'])
+            self.path_cov = np.array(state['path_cov'])
+            self.best_params = state['best_params']
+            self.best_score = state['best_score'] if state['best_score'] is not None else -np.inf
+            self.prefix_scores = state['prefix_scores']
+            self.score_cache = state['score_cache']
+            self.rng.bit_generator.state = state['rng_state']
+            logger.info(f"Resumed optimizer from {self.checkpoint_path} at generation {self.generation}")
+        except Exception as e:
+            logger.error(f"Error loading optimizer checkpoint: {e}")
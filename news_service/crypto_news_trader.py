@@ -8,14 +8,45 @@ from bs4 import BeautifulSoup
 import sqlite3
 import json
 import time
+import threading
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 import re
 from collections import Counter
 
+from news_service.feed_fetcher import FeedFetcher
+from news_service.rolling_aggregates import RollingSignalAggregates
+from news_service.seen_index import SeenIndex, fingerprint
+from news_service.text_analyzer import KeywordMatcher
+
 class CryptoNewsTrader:
-    def __init__(self, db_path='crypto_trading_news.db'):
+    def __init__(self, db_path='crypto_trading_news.db', batch_size=500):
         self.db_path = db_path
+        # Signals are buffered and written in one transaction per cycle (or every batch_size rows)
+        self.batch_size = batch_size
+        self.pending_signals = []
         self.setup_database()
+        self.feeds = {
+            'coindesk': 'https://www.coindesk.com/arc/outboundfeeds/rss/',
+            'cointelegraph': 'https://cointelegraph.com/rss',
+            'cryptonews': 'https://cryptonews.com/news/feed/',
+            'bitcoin_com': 'https://news.bitcoin.com/feed/',
+            'decrypt': 'https://decrypt.co/feed',
+            'bitcoinist': 'https://bitcoinist.com/feed/',
+            'cryptoslate': 'https://cryptoslate.com/feed/'
+        }
+        # All feeds are fetched at once over one pooled session, with per-source timeouts
+        self.fetcher = FeedFetcher(max_workers=len(self.feeds))
+        # Articles parsed from each source's last changed download
+        self.feed_articles = {}
+        # Sources parsed (or unchanged) in the last fetch, whose validators commit_feeds may keep
+        self.fetched_sources = []
+        # URLs already analyzed and stored, so only new or edited articles are scored again
+        self.seen = SeenIndex(lookup=self.stored_fingerprints)
+        self.seen.warm(self.conn)
+        # Recommendation windows kept in memory; SQLite is read only to rebuild them on startup
+        self.aggregates = RollingSignalAggregates()
+        self.warm_aggregates()
         self.trading_keywords = {
             'bullish': ['bullish', 'moon', 'rally', 'surge', 'breakout', 'pump', 'growth', 
                        'adoption', 'partnership', 'approval', 'investment', 'institutional', 
@@ -27,10 +58,33 @@ class CryptoNewsTrader:
                            'employment', 'gdp', 'tariff', 'trade war', 'government shutdown', 
                            'sec', 'regulatory', 'jerome powell', 'yellen', 'treasury']
         }
+        self.crypto_aliases = {
+            'bitcoin': ['bitcoin', 'btc'],
+            'ethereum': ['ethereum', 'eth', 'ether'],
+            'solana': ['solana', 'sol'],
+            'cardano': ['cardano', 'ada'],
+            'polygon': ['polygon', 'matic'],
+            'chainlink': ['chainlink', 'link'],
+            'avalanche': ['avalanche', 'avax'],
+            'dogecoin': ['dogecoin', 'doge'],
+            'xrp': ['xrp', 'ripple'],
+            'binance': ['binance', 'bnb'],
+            'litecoin': ['litecoin', 'ltc'],
+            'polkadot': ['polkadot', 'dot']
+        }
+        # One precompiled, word-bounded pass finds every keyword class and coin mention
+        self.matcher = KeywordMatcher(self.trading_keywords, self.crypto_aliases)
         
     def setup_database(self):
         """Setup SQLite database for storing news and signals"""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL lets the dashboard read while a batch is written; NORMAL syncs once per checkpoint
+        # rather than per commit, and a 16 MB page cache keeps the hot index pages in memory
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA cache_size=-16000')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.write_lock = threading.Lock()
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS news_signals (
                 id INTEGER PRIMARY KEY,
@@ -43,31 +97,102 @@ class CryptoNewsTrader:
                 trading_signal TEXT,
                 confidence REAL,
                 keywords TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_ts INTEGER
             )
         ''')
+        # Coins mentioned per article, with the article's time so coin lookups are index range scans
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS news_coin_mentions (
+                article_id INTEGER NOT NULL,
+                coin TEXT NOT NULL,
+                created_ts INTEGER NOT NULL,
+                PRIMARY KEY (article_id, coin)
+            ) WITHOUT ROWID
+        ''')
         self.conn.commit()
+        self.migrate_database()
         
-    def get_crypto_news_feeds(self):
-        """Scrape multiple RSS feeds for crypto news"""
-        feeds = {
-            'coindesk': 'https://www.coindesk.com/arc/outboundfeeds/rss/',
-            'cointelegraph': 'https://cointelegraph.com/rss',
-            'cryptonews': 'https://cryptonews.com/news/feed/',
-            'bitcoin_com': 'https://news.bitcoin.com/feed/',
-            'decrypt': 'https://decrypt.co/feed',
-            'bitcoinist': 'https://bitcoinist.com/feed/',
-            'cryptoslate': 'https://cryptoslate.com/feed/'
-        }
+        # Queries from API handlers use their own connection so they never wait on the writer
+        if self.db_path == ':memory:':
+            self.read_conn = self.conn
+        else:
+            self.read_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.read_conn.execute('PRAGMA cache_size=-16000')
+        self.read_lock = threading.Lock()
+    
+    SCHEMA_VERSION = 1
+    
+    def migrate_database(self):
+        """Bring an existing database up to SCHEMA_VERSION (tracked in PRAGMA user_version)"""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+        
+        with self.conn:
+            # v1: integer epoch timestamps, time/confidence indexes, normalized coin mentions
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(news_signals)')]
+            existing = 'created_ts' not in columns
+            if existing:
+                self.conn.execute('ALTER TABLE news_signals ADD COLUMN created_ts INTEGER')
+            self.conn.execute('''
+                UPDATE news_signals SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)
+                WHERE created_ts IS NULL
+            ''')
+            
+            mentions = []
+            for article_id, keywords, created_ts in self.conn.execute(
+                    'SELECT id, keywords, created_ts FROM news_signals'):
+                try:
+                    coins = json.loads(keywords or '{}').get('crypto_mentions', [])
+                except ValueError:
+                    continue
+                mentions.extend((article_id, coin, created_ts or 0) for coin in set(coins))
+            self.conn.executemany('INSERT OR IGNORE INTO news_coin_mentions VALUES (?, ?, ?)', mentions)
+            
+            # Time leads so recent-window queries range-scan it; confidence is filtered from the same index
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_news_signals_time_confidence '
+                              'ON news_signals (created_ts, confidence)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_news_coin_mentions_coin ON news_coin_mentions (coin, created_ts)')
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        if existing:
+            print(f"Migrated news database to schema v{self.SCHEMA_VERSION} ({len(mentions)} coin mentions)")
+    
+    def _query(self, sql, params=()):
+        """Run a read query on the reader connection"""
+        with self.read_lock:
+            return self.read_conn.execute(sql, params).fetchall()
         
+    def get_crypto_news_feeds(self, changed_only=False):
+        """Fetch all RSS feeds concurrently and parse the ones that changed
+        
+        Unchanged feeds (304, or the same bytes as last time) are not parsed again; their
+        articles come from the last parse unless `changed_only` is set.
+        """
         all_news = []
+        self.fetched_sources = []
+        
+        print(f"Fetching from {len(self.feeds)} sources...")
+        responses = self.fetcher.fetch_all(self.feeds)
         
-        for source, feed_url in feeds.items():
+        for source in self.feeds:
+            response = responses[source]
+            if not response.ok:
+                print(f"❌ Error fetching {source}: {response.error or f'HTTP {response.status}'}")
+                continue
+            
+            if not response.changed:
+                self.fetched_sources.append(source)
+                print(f"⏭️  {source} unchanged ({response.elapsed * 1000:.0f} ms)")
+                if not changed_only:
+                    all_news.extend(self.feed_articles.get(source, []))
+                continue
+            
             try:
-                print(f"Fetching from {source}...")
-                feed = feedparser.parse(feed_url)
+                feed = feedparser.parse(response.content)
                 
                 # Get recent entries
+                articles = []
                 for entry in feed.entries[:15]:  # Limit per source
                     news_item = {
                         'title': entry.title,
@@ -76,17 +201,36 @@ class CryptoNewsTrader:
                         'published': entry.published if hasattr(entry, 'published') else str(datetime.now()),
                         'content': entry.summary if hasattr(entry, 'summary') else entry.title,
                     }
-                    all_news.append(news_item)
+                    articles.append(news_item)
+                self.feed_articles[source] = articles
+                self.fetched_sources.append(source)
+                all_news.extend(articles)
                     
-                print(f"✅ Got {len(feed.entries[:15])} articles from {source}")
-                time.sleep(1)  # Rate limiting
+                print(f"✅ Got {len(articles)} articles from {source} ({response.elapsed * 1000:.0f} ms)")
                 
             except Exception as e:
-                print(f"❌ Error fetching {source}: {e}")
+                print(f"❌ Error parsing {source}: {e}")
                 continue
-                
+        
+        print(f"Fetched all sources in {self.fetcher.last_cycle_ms:.0f} ms")
         return all_news
     
+    def commit_feeds(self):
+        """Keep the validators of this cycle's feeds whose articles are all stored
+        
+        Call after flush_signals. A feed with an article that failed to score or
+        save keeps its previous validators, so it is downloaded and parsed again
+        next cycle instead of answering 304.
+        """
+        stored = [source for source in self.fetched_sources
+                  if all(self.seen.contains(item) for item in self.feed_articles.get(source, []))]
+        self.fetcher.commit_validators(stored)
+        return stored
+    
+    def get_cached_articles(self):
+        """Articles from the last successful parse of every source, in feed order"""
+        return [item for source in self.feeds for item in self.feed_articles.get(source, [])]
+    
     def scrape_economic_calendar_events(self):
         """Scrape or check for major economic events that affect crypto"""
         # This is a placeholder - you can integrate with economic calendar APIs
@@ -111,21 +255,14 @@ class CryptoNewsTrader:
         
         return mock_events
     
-    def analyze_sentiment(self, text):
+    def analyze_sentiment(self, text, matches=None):
         """Advanced sentiment analysis using keyword matching and context"""
-        text = text.lower()
+        if matches is None:
+            matches = self.matcher.scan(text)
         
         # Count bullish vs bearish keywords
-        bullish_matches = []
-        bearish_matches = []
-        
-        for keyword in self.trading_keywords['bullish']:
-            if keyword in text:
-                bullish_matches.append(keyword)
-        
-        for keyword in self.trading_keywords['bearish']:
-            if keyword in text:
-                bearish_matches.append(keyword)
+        bullish_matches = matches['bullish']
+        bearish_matches = matches['bearish']
         
         # Weight calculation
         bullish_count = len(bullish_matches)
@@ -145,15 +282,18 @@ class CryptoNewsTrader:
         content = news_item.get('content', '').lower()
         full_text = f"{title} {content}"
         
+        # Every keyword class and coin mention in one pass over the text
+        matches = self.matcher.scan(full_text, lowered=True)
+        
         # Sentiment analysis
-        sentiment_score, bullish_words, bearish_words = self.analyze_sentiment(full_text)
+        sentiment_score, bullish_words, bearish_words = self.analyze_sentiment(full_text, matches)
         
         # Check for high-impact keywords (macroeconomic factors)
-        high_impact_matches = [keyword for keyword in self.trading_keywords['high_impact'] if keyword in full_text]
+        high_impact_matches = matches['high_impact']
         high_impact_score = len(high_impact_matches)
         
         # Check for specific crypto mentions
-        crypto_mentions = self.extract_crypto_mentions(full_text)
+        crypto_mentions = matches['crypto']
         
         # Generate base signal
         signal = "NEUTRAL"
@@ -211,70 +351,180 @@ class CryptoNewsTrader:
     
     def extract_crypto_mentions(self, text):
         """Extract cryptocurrency mentions from text"""
-        crypto_patterns = {
-            'bitcoin': r'\b(bitcoin|btc)\b',
-            'ethereum': r'\b(ethereum|eth|ether)\b',
-            'solana': r'\b(solana|sol)\b',
-            'cardano': r'\b(cardano|ada)\b',
-            'polygon': r'\b(polygon|matic)\b',
-            'chainlink': r'\b(chainlink|link)\b',
-            'avalanche': r'\b(avalanche|avax)\b',
-            'dogecoin': r'\b(dogecoin|doge)\b',
-            'xrp': r'\b(xrp|ripple)\b',
-            'binance': r'\b(binance|bnb)\b',
-            'litecoin': r'\b(litecoin|ltc)\b',
-            'polkadot': r'\b(polkadot|dot)\b'
-        }
-        
-        mentions = []
-        for crypto, pattern in crypto_patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                mentions.append(crypto.upper())
-        
-        return list(set(mentions))
+        return self.matcher.scan(text)['crypto']
     
-    def save_news_signal(self, news_item, signal_data):
-        """Save news and trading signal to database"""
-        try:
-            self.conn.execute('''
-                INSERT OR REPLACE INTO news_signals 
-                (title, url, source, published_date, content, sentiment_score, 
-                 trading_signal, confidence, keywords)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                news_item['title'],
-                news_item['url'],
-                news_item['source'],
-                news_item['published'],
-                news_item['content'][:500],
-                signal_data['sentiment_score'],
-                signal_data['signal'],
-                signal_data['confidence'],
-                json.dumps({
-                    'crypto_mentions': signal_data['crypto_mentions'],
-                    'high_impact': signal_data['high_impact_keywords'],
-                    'bullish': signal_data['bullish_words'],
-                    'bearish': signal_data['bearish_words']
-                })
-            ))
-            self.conn.commit()
-        except Exception as e:
-            print(f"Error saving to database: {e}")
+    def stored_fingerprints(self, urls):
+        """{url: fingerprint} of the given URLs already in news_signals"""
+        found = {}
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            for url, title, content in self._query(
+                    f"SELECT url, title, content FROM news_signals WHERE url IN ({','.join('?' * len(chunk))})", chunk):
+                found[url] = fingerprint(title, content)
+        return found
+    
+    def filter_new_articles(self, all_news):
+        """Articles not analyzed before, or whose text changed since"""
+        return self.seen.filter_new(all_news)
+    
+    def score_articles(self, articles, pool=None):
+        """(news item, signal) pairs in input order, scored on `pool`'s worker processes when given"""
+        if pool is not None:
+            return pool.score(articles)
+        scored = []
+        for news_item in articles:
+            try:
+                scored.append((news_item, self.generate_trading_signal(news_item)))
+            except Exception as e:
+                print(f"❌ Error processing news item {news_item.get('url')}: {e}")
+        return scored
+    
+    def published_timestamp(self, news_item):
+        """Epoch seconds of an article's published date (RFC 822 or ISO), or now"""
+        published = news_item.get('published') or ''
+        for parse in (parsedate_to_datetime, datetime.fromisoformat):
+            try:
+                return int(parse(published).timestamp())
+            except (TypeError, ValueError, IndexError):
+                continue
+        return int(time.time())
+    
+    def backfill(self, articles, pool=None, chunk_size=1000):
+        """Score and store historical articles (dated by their published time); returns the number stored"""
+        def new_articles():
+            chunk = []
+            for news_item in articles:
+                chunk.append(news_item)
+                if len(chunk) >= chunk_size:
+                    yield from self.filter_new_articles(chunk)
+                    chunk = []
+            yield from self.filter_new_articles(chunk)
+        
+        stored = 0
+        for news_item, signal_data in self.score_articles(new_articles(), pool):
+            self.save_news_signal(news_item, signal_data, created_ts=self.published_timestamp(news_item))
+            stored += 1
+        self.flush_signals()
+        return stored
+    
+    def save_news_signal(self, news_item, signal_data, created_ts=None):
+        """Queue news and trading signal for the next batched database write"""
+        created_ts = int(time.time()) if created_ts is None else int(created_ts)
+        self.pending_signals.append((news_item, signal_data['crypto_mentions'], (
+            news_item['title'],
+            news_item['url'],
+            news_item['source'],
+            news_item['published'],
+            news_item['content'][:500],
+            signal_data['sentiment_score'],
+            signal_data['signal'],
+            signal_data['confidence'],
+            json.dumps({
+                'crypto_mentions': signal_data['crypto_mentions'],
+                'high_impact': signal_data['high_impact_keywords'],
+                'bullish': signal_data['bullish_words'],
+                'bearish': signal_data['bearish_words']
+            }),
+            created_ts
+        )))
+        if len(self.pending_signals) >= self.batch_size:
+            self.flush_signals()
+    
+    def flush_signals(self):
+        """Write all queued signals with one executemany in a single transaction"""
+        with self.write_lock:
+            batch, self.pending_signals = self.pending_signals, []
+            if not batch:
+                return 0
+            try:
+                with self.conn:
+                    # Upsert keeps an updated article's id, so its coin mentions can be replaced in place
+                    self.conn.executemany('''
+                        INSERT INTO news_signals 
+                        (title, url, source, published_date, content, sentiment_score, 
+                         trading_signal, confidence, keywords, created_ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(url) DO UPDATE SET
+                            title = excluded.title, source = excluded.source,
+                            published_date = excluded.published_date, content = excluded.content,
+                            sentiment_score = excluded.sentiment_score, trading_signal = excluded.trading_signal,
+                            confidence = excluded.confidence, keywords = excluded.keywords,
+                            created_at = CURRENT_TIMESTAMP, created_ts = excluded.created_ts
+                    ''', [row for _, _, row in batch])
+                    
+                    ids = {}
+                    urls = [row[1] for _, _, row in batch]
+                    for start in range(0, len(urls), 500):
+                        chunk = urls[start:start + 500]
+                        ids.update((url, article_id) for article_id, url in self.conn.execute(
+                            f"SELECT id, url FROM news_signals WHERE url IN ({','.join('?' * len(chunk))})", chunk))
+                    self.conn.executemany('DELETE FROM news_coin_mentions WHERE article_id = ?',
+                                          [(article_id,) for article_id in ids.values()])
+                    self.conn.executemany('INSERT OR IGNORE INTO news_coin_mentions VALUES (?, ?, ?)', [
+                        (ids[row[1]], coin, row[-1]) for _, coins, row in batch for coin in coins])
+            except Exception as e:
+                print(f"Error saving to database: {e}")
+                return 0
+        
+        for news_item, coins, row in batch:
+            self.seen.mark(news_item)
+            self.aggregates.add(row[1], row[-1], row[6], row[7], coins,
+                                sentiment=row[5], source=row[2], title=row[0])
+        return len(batch)
+    
+    def warm_aggregates(self):
+        """Rebuild the rolling windows from signals still inside them"""
+        rows = self._query('''
+            SELECT s.url, s.created_ts, s.trading_signal, s.confidence, s.sentiment_score, s.source, s.title,
+                   group_concat(m.coin)
+            FROM news_signals s
+            LEFT JOIN news_coin_mentions m ON m.article_id = s.id
+            WHERE s.created_ts > ?
+            GROUP BY s.id
+            ORDER BY s.created_ts
+        ''', (int(time.time()) - self.aggregates.horizon,))
+        for url, created_ts, signal, confidence, sentiment, source, title, coins in rows:
+            self.aggregates.add(url, created_ts, signal, confidence or 0.0, coins.split(',') if coins else [],
+                                sentiment=sentiment, source=source, title=title)
+        return len(rows)
+    
+    def _window_stats(self, min_confidence, hours_back, coin=None):
+        """Signal counts, average confidence and top signals of a window, from memory when tracked"""
+        if self.aggregates.covers(hours_back, min_confidence, coin=coin is not None):
+            if coin is None:
+                return self.aggregates.overall_stats()
+            return self.aggregates.coin_stats(coin)
+        
+        # Untracked window: aggregate in SQLite
+        if coin is None:
+            source = 'FROM news_signals s WHERE s.created_ts > ? AND s.confidence > ?'
+            params = (int(time.time()) - hours_back * 3600, min_confidence)
+        else:
+            source = ('FROM news_coin_mentions m JOIN news_signals s ON s.id = m.article_id '
+                      'WHERE m.coin = ? AND m.created_ts > ? AND s.confidence > ?')
+            params = (coin, int(time.time()) - hours_back * 3600, min_confidence)
+        counts = dict.fromkeys(('BUY', 'SELL', 'NEUTRAL'), 0)
+        confidence_sum = 0.0
+        for trading_signal, count, total_confidence in self._query(
+                f'SELECT s.trading_signal, COUNT(*), SUM(s.confidence) {source} GROUP BY s.trading_signal', params):
+            key = trading_signal if trading_signal in counts else 'NEUTRAL'
+            counts[key] += count
+            confidence_sum += total_confidence
+        top = [{'signal': row[0], 'confidence': row[1], 'sentiment': row[2], 'source': row[3], 'title': row[4] or ''}
+               for row in self._query(f'''
+                   SELECT s.trading_signal, s.confidence, s.sentiment_score, s.source, s.title {source}
+                   ORDER BY s.confidence DESC, s.created_ts DESC LIMIT 5
+               ''', params)]
+        total = sum(counts.values())
+        return {'counts': counts, 'total': total,
+                'avg_confidence': confidence_sum / total if total else 0.0, 'top': top}
     
     def get_trading_recommendation(self, min_confidence=0.65, hours_back=6):
         """Get overall trading recommendation based on recent high-confidence signals"""
         try:
-            cursor = self.conn.execute('''
-                SELECT trading_signal, confidence, sentiment_score, source, title, keywords
-                FROM news_signals 
-                WHERE confidence > ? 
-                AND datetime(created_at) > datetime('now', '-{} hours')
-                ORDER BY confidence DESC, created_at DESC
-            '''.format(hours_back), (min_confidence,))
-            
-            signals = cursor.fetchall()
+            stats = self._window_stats(min_confidence, hours_back)
             
-            if not signals:
+            if not stats['total']:
                 return {
                     "recommendation": "HOLD",
                     "confidence": 0.5,
@@ -283,26 +533,13 @@ class CryptoNewsTrader:
                 }
             
             # Calculate weighted recommendation
-            buy_signals = 0
-            sell_signals = 0
-            neutral_signals = 0
-            total_confidence = 0
-            
-            for signal in signals:
-                trading_signal, confidence = signal[0], signal[1]
-                
-                if trading_signal == "BUY":
-                    buy_signals += 1
-                elif trading_signal == "SELL":
-                    sell_signals += 1
-                else:
-                    neutral_signals += 1
-                
-                total_confidence += confidence
+            buy_signals = stats['counts']['BUY']
+            sell_signals = stats['counts']['SELL']
+            neutral_signals = stats['counts']['NEUTRAL']
             
             # Generate recommendation with weighted confidence
-            total_signals = len(signals)
-            avg_confidence = total_confidence / total_signals
+            total_signals = stats['total']
+            avg_confidence = stats['avg_confidence']
             
             if buy_signals > sell_signals * 1.5:  # Need clear buy majority
                 recommendation = "BUY"
@@ -327,13 +564,13 @@ class CryptoNewsTrader:
                 'analysis_period_hours': hours_back,
                 'top_signals': [
                     {
-                        'signal': s[0],
-                        'confidence': s[1],
-                        'sentiment': s[2],
-                        'source': s[3],
-                        'title': s[4][:100] + '...' if len(s[4]) > 100 else s[4]
+                        'signal': s['signal'],
+                        'confidence': s['confidence'],
+                        'sentiment': s['sentiment'],
+                        'source': s['source'],
+                        'title': s['title'][:100] + '...' if len(s['title']) > 100 else s['title']
                     }
-                    for s in signals[:5]
+                    for s in stats['top'][:5]
                 ]
             }
             
@@ -341,21 +578,20 @@ class CryptoNewsTrader:
             print(f"Error getting recommendation: {e}")
             return {"error": str(e)}
     
+    def coin_name(self, crypto_symbol):
+        """Stored coin name for a name or ticker (BTC -> BITCOIN)"""
+        symbol = crypto_symbol.lower()
+        for coin, aliases in self.crypto_aliases.items():
+            if symbol in aliases:
+                return coin.upper()
+        return crypto_symbol.upper()
+    
     def get_crypto_specific_signals(self, crypto_symbol, hours_back=24):
         """Get signals specific to a particular cryptocurrency"""
         try:
-            cursor = self.conn.execute('''
-                SELECT trading_signal, confidence, sentiment_score, source, title, keywords
-                FROM news_signals 
-                WHERE keywords LIKE ? 
-                AND datetime(created_at) > datetime('now', '-{} hours')
-                AND confidence > 0.6
-                ORDER BY confidence DESC
-            '''.format(hours_back), (f'%{crypto_symbol.upper()}%',))
+            stats = self._window_stats(0.6, hours_back, coin=self.coin_name(crypto_symbol))
             
-            signals = cursor.fetchall()
-            
-            if not signals:
+            if not stats['total']:
                 return {
                     "crypto": crypto_symbol,
                     "recommendation": "HOLD",
@@ -363,9 +599,9 @@ class CryptoNewsTrader:
                 }
             
             # Analyze crypto-specific signals
-            buy_count = sum(1 for s in signals if s[0] == 'BUY')
-            sell_count = sum(1 for s in signals if s[0] == 'SELL')
-            avg_confidence = sum(s[1] for s in signals) / len(signals)
+            buy_count = stats['counts']['BUY']
+            sell_count = stats['counts']['SELL']
+            avg_confidence = stats['avg_confidence']
             
             if buy_count > sell_count:
                 recommendation = "BUY"
@@ -380,14 +616,14 @@ class CryptoNewsTrader:
                 'confidence': round(avg_confidence, 2),
                 'buy_signals': buy_count,
                 'sell_signals': sell_count,
-                'total_signals': len(signals),
-                'recent_news': [s[4][:100] + '...' for s in signals[:3]]
+                'total_signals': stats['total'],
+                'recent_news': [s['title'][:100] + '...' for s in stats['top'][:3]]
             }
             
         except Exception as e:
             return {"error": str(e)}
     
-    def run_analysis(self, min_confidence=0.65):
+    def run_analysis(self, min_confidence=0.65, pool=None):
         """Main function to run complete news analysis and generate trading signals"""
         print("🚀 CRYPTO NEWS TRADING SIGNAL GENERATOR")
         print("=" * 60)
@@ -402,15 +638,17 @@ class CryptoNewsTrader:
             
         print(f"\n✅ Total news articles collected: {len(all_news)}")
         
+        new_news = self.filter_new_articles(all_news)
+        print(f"🆕 New or updated articles: {len(new_news)} (skipping {len(all_news) - len(new_news)} already analyzed)")
+        
         # Analyze each news item
         print(f"\n🔍 Analyzing news for trading signals (min confidence: {min_confidence})...")
         print("-" * 60)
         
         high_confidence_signals = []
         
-        for i, news_item in enumerate(all_news, 1):
+        for i, (news_item, signal_data) in enumerate(self.score_articles(new_news, pool), 1):
             try:
-                signal_data = self.generate_trading_signal(news_item)
                 self.save_news_signal(news_item, signal_data)
                 
                 # Print high-confidence signals as we find them
@@ -433,12 +671,17 @@ class CryptoNewsTrader:
                 print(f"❌ Error processing news item {i}: {e}")
                 continue
         
+        # One transaction for every signal of this run; feeds count as seen only once stored
+        self.flush_signals()
+        self.commit_feeds()
+        
         # Get overall trading recommendation
         print(f"\n📊 GENERATING OVERALL TRADING RECOMMENDATION...")
         recommendation = self.get_trading_recommendation(min_confidence)
         
         return {
             'total_news': len(all_news),
+            'new_news': len(new_news),
             'high_confidence_signals': len(high_confidence_signals),
             'recommendation': recommendation,
             'detailed_signals': high_confidence_signals
@@ -447,11 +690,11 @@ class CryptoNewsTrader:
     def export_signals_to_csv(self, filename='crypto_signals.csv'):
         """Export trading signals to CSV for further analysis"""
         try:
-            cursor = self.conn.execute('''
+            rows = self._query('''
                 SELECT title, source, trading_signal, confidence, sentiment_score, 
                        published_date, created_at
                 FROM news_signals 
-                ORDER BY created_at DESC
+                ORDER BY created_ts DESC
             ''')
             
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
@@ -459,7 +702,7 @@ class CryptoNewsTrader:
                 writer = csv.writer(csvfile)
                 writer.writerow(['Title', 'Source', 'Signal', 'Confidence', 'Sentiment', 'Published', 'Analyzed'])
                 
-                for row in cursor:
+                for row in rows:
                     writer.writerow(row)
             
             print(f"✅ Signals exported to {filename}")
@@ -467,6 +710,14 @@ class CryptoNewsTrader:
         except Exception as e:
             print(f"❌ Error exporting to CSV: {e}")
 
+    def close(self):
+        """Write queued signals and release connections"""
+        self.flush_signals()
+        if self.read_conn is not self.conn:
+            self.read_conn.close()
+        self.conn.close()
+        self.fetcher.close()
+
 # Usage Example and Main Execution
 if __name__ == "__main__":
     # Initialize the trader
@@ -516,6 +767,6 @@ if __name__ == "__main__":
     else:
         print("❌ Analysis failed to complete.")
     
-    # Close database connection
-    trader.conn.close()
+    # Close database connections and the feed fetcher's session
+    trader.close()
     print("\n✅ Analysis complete. Database saved.")
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Concurrent RSS fetching.
+
+FeedFetcher downloads every news feed of a cycle at once over one pooled
+requests.Session, so a cycle takes about as long as the slowest source
+instead of the sum of all of them plus a sleep between each. Every source
+gets connect/read timeouts and an overall deadline (enforced while the body
+streams in), so one hung server only costs its own slot. Politeness is kept
+per host: at most one request in flight and at least `min_host_interval`
+seconds between requests to the same host. The raw response bytes are
+returned for the caller to hand to the feed parser.
+
+Requests are conditional: each source's ETag and Last-Modified are kept and
+sent back as If-None-Match / If-Modified-Since, and the body of every 200 is
+hashed. A 304, or a 200 whose hash matches the last one, marks the feed as
+unchanged so the caller can skip parsing and analysing it. Per-source
+counters report how often that happens. fetch_all holds the validators of
+the responses it returns until the caller commits them with
+commit_validators() (once the articles are stored), so a source that answers
+after the deadline, or whose articles fail to score or save, is fetched in
+full again next cycle rather than being marked as seen unparsed.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (compatible; CryptoNewsTrader/1.0; RSS reader)'
+
+
+class FeedResponse:
+    """Outcome of fetching one source"""
+
+    __slots__ = ('source', 'url', 'status', 'content', 'headers', 'elapsed', 'error', 'changed', 'validators')
+
+    def __init__(self, source: str, url: str, status: Optional[int] = None, content: bytes = b'',
+                 headers: Optional[Dict] = None, elapsed: float = 0.0, error: Optional[str] = None):
+        self.source = source
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+        self.elapsed = elapsed
+        self.error = error
+        self.changed = self.ok
+        self.validators: Optional[Dict] = None  # to keep for the next conditional request
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status in (200, 304)
+
+    def to_dict(self) -> Dict:
+        return {'source': self.source, 'status': self.status, 'changed': self.changed, 'bytes': len(self.content),
+                'elapsed_ms': round(self.elapsed * 1000, 1), 'error': self.error}
+
+
+class FeedFetcher:
+    """Fetch many feeds concurrently over one pooled session"""
+
+    def __init__(self, max_workers: int = 8, connect_timeout: float = 5.0, read_timeout: float = 10.0,
+                 deadline: float = 15.0, min_host_interval: float = 1.0, max_bytes: int = 5 * 1024 * 1024,
+                 user_agent: str = USER_AGENT, conditional: bool = True):
+        self.conditional = conditional
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.min_host_interval = min_host_interval
+        self.max_bytes = max_bytes
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'User-Agent': user_agent,
+                                     'Accept': 'application/rss+xml, application/atom+xml, application/xml, text/xml, */*'})
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='feed-fetch')
+
+        self.host_locks: Dict[str, threading.Lock] = {}
+        self.host_last_request: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.last_cycle: Dict[str, Dict] = {}
+        self.last_cycle_ms = 0.0
+
+        # Per source: ETag, Last-Modified and body hash of the last 200, and hit counters
+        self.validators: Dict[str, Dict] = {}
+        # Validators of the last fetch_all, kept only once committed
+        self.pending_validators: Dict[str, Dict] = {}
+        self.source_stats: Dict[str, Dict] = {}
+
+    def _host_lock(self, host: str) -> threading.Lock:
+        with self.lock:
+            return self.host_locks.setdefault(host, threading.Lock())
+
+    def fetch(self, source: str, url: str, headers: Optional[Dict] = None, store_validators: bool = True) -> FeedResponse:
+        """Fetch one feed, waiting out this host's politeness interval first
+
+        With store_validators=False the response's validators are left on the
+        response for the caller to keep once it has used the body.
+        """
+        headers = dict(headers or {})
+        if self.conditional:
+            headers.update(self._conditional_headers(source))
+        host = urlsplit(url).netloc
+        with self._host_lock(host):
+            wait_for = self.host_last_request.get(host, 0.0) + self.min_host_interval - time.monotonic()
+            if wait_for > 0:
+                time.sleep(wait_for)
+            self.host_last_request[host] = time.monotonic()
+            response = self._get(source, url, headers)
+        if self.conditional:
+            self._check_changed(response)
+            if store_validators and response.validators is not None:
+                with self.lock:
+                    self.validators[source] = response.validators
+        self._count(response)
+        return response
+
+    def _conditional_headers(self, source: str) -> Dict:
+        validators = self.validators.get(source, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def _check_changed(self, response: FeedResponse):
+        """Mark 304s and bodies identical to the last one as unchanged, and attach the new validators"""
+        if response.status == 304:
+            response.changed = False
+            return
+        if not response.ok:
+            return
+        digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        previous = self.validators.get(response.source, {})
+        response.changed = digest != previous.get('hash')
+        response.validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'hash': digest
+        }
+
+    def commit_validators(self, sources):
+        """Send the last fetch_all's ETag/Last-Modified for these sources next time, and compare with its hash"""
+        with self.lock:
+            for source in sources:
+                validators = self.pending_validators.pop(source, None)
+                if validators is not None:
+                    self.validators[source] = validators
+
+    def _count(self, response: FeedResponse):
+        with self.lock:
+            stats = self.source_stats.setdefault(response.source, {
+                'requests': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0, 'errors': 0, 'bytes': 0})
+            stats['requests'] += 1
+            stats['bytes'] += len(response.content)
+            if not response.ok:
+                stats['errors'] += 1
+            elif response.status == 304:
+                stats['not_modified'] += 1
+            elif not response.changed:
+                stats['unchanged'] += 1
+            else:
+                stats['changed'] += 1
+
+    @staticmethod
+    def _hit_rate(stats: Dict) -> Optional[float]:
+        """Share of requests that needed no parsing (304 or identical body)"""
+        if not stats['requests']:
+            return None
+        return round((stats['not_modified'] + stats['unchanged']) / stats['requests'], 3)
+
+    def _get(self, source: str, url: str, headers: Optional[Dict]) -> FeedResponse:
+        started = time.monotonic()
+        try:
+            with self.session.get(url, headers=headers, stream=True,
+                                  timeout=(self.connect_timeout, self.read_timeout)) as response:
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f'response larger than {self.max_bytes} bytes')
+                    if time.monotonic() - started > self.deadline:
+                        raise TimeoutError(f'no complete response within {self.deadline}s')
+                return FeedResponse(source, url, response.status_code, b''.join(chunks),
+                                    response.headers, time.monotonic() - started)
+        except (requests.RequestException, ValueError, TimeoutError) as e:
+            return FeedResponse(source, url, elapsed=time.monotonic() - started, error=str(e))
+
+    def fetch_all(self, feeds: Dict[str, str], headers: Optional[Dict[str, Dict]] = None) -> Dict[str, FeedResponse]:
+        """Fetch every {source: url} concurrently; sources still running at the deadline are reported as timed out"""
+        started = time.monotonic()
+        headers = headers or {}
+        futures = {source: self.executor.submit(self.fetch, source, url, headers.get(source), False)
+                   for source, url in feeds.items()}
+        # Allow for a politeness wait on top of one source's deadline
+        wait(futures.values(), timeout=self.deadline + self.min_host_interval + 1.0)
+
+        results = {}
+        pending = {}
+        for source, future in futures.items():
+            if future.done():
+                results[source] = future.result()
+                # Late responses are never returned, so their validators must not be kept either
+                if results[source].validators is not None:
+                    pending[source] = results[source].validators
+            else:
+                results[source] = FeedResponse(source, feeds[source], elapsed=time.monotonic() - started,
+                                               error='timed out')
+        with self.lock:
+            self.pending_validators = pending
+        self.last_cycle = {source: result.to_dict() for source, result in results.items()}
+        self.last_cycle_ms = (time.monotonic() - started) * 1000
+        return results
+
+    def status(self) -> Dict:
+        with self.lock:
+            totals = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0, 'errors': 0, 'bytes': 0}
+            sources = {}
+            for source, stats in self.source_stats.items():
+                for key in totals:
+                    totals[key] += stats[key]
+                sources[source] = dict(stats, hit_rate=self._hit_rate(stats), last=self.last_cycle.get(source))
+        return {'cycle_ms': round(self.last_cycle_ms, 1), 'hit_rate': self._hit_rate(totals),
+                'totals': totals, 'sources': sources}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
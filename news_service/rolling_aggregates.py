@@ -0,0 +1,179 @@
+"""
+Rolling in-memory signal aggregates.
+
+RollingSignalAggregates keeps, for the overall recommendation window and for
+each coin's window, running BUY/SELL/NEUTRAL counts and a confidence sum
+over time buckets. A saved signal is added to the current bucket of every
+window it qualifies for; buckets that slide out of a window are subtracted
+again. A recommendation read is then a handful of counter lookups instead of
+a query and a re-aggregation of hours of rows. The highest-confidence
+entries of a window are cached until the window next changes.
+
+SQLite remains the durable copy: warm() rebuilds the windows from it on
+startup.
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional
+
+SIGNALS = ('BUY', 'SELL', 'NEUTRAL')
+
+
+class _Window:
+    """Counts and confidence sum of qualifying signals over the last `seconds`"""
+
+    def __init__(self, seconds: int, min_confidence: float, bucket_seconds: int):
+        self.seconds = seconds
+        self.min_confidence = min_confidence
+        self.bucket_seconds = bucket_seconds
+        self.buckets = deque()  # [start, entries] oldest first
+        self.counts = dict.fromkeys(SIGNALS, 0)
+        self.confidence_sum = 0.0
+        self.total = 0
+        self.top_cache: Optional[List[Dict]] = None
+
+    def qualifies(self, entry: Dict) -> bool:
+        return entry['confidence'] > self.min_confidence
+
+    def _count(self, entry: Dict, sign: int):
+        signal = entry['signal'] if entry['signal'] in self.counts else 'NEUTRAL'
+        self.counts[signal] += sign
+        self.confidence_sum += sign * entry['confidence']
+        self.total += sign
+        self.top_cache = None
+
+    def _bucket_for(self, created_ts: int, create: bool):
+        start = created_ts - created_ts % self.bucket_seconds
+        # Entries almost always land in the newest bucket
+        for bucket in reversed(self.buckets):
+            if bucket[0] == start:
+                return bucket
+            if bucket[0] < start:
+                break
+        if not create:
+            return None
+        bucket = [start, []]
+        self.buckets.append(bucket)
+        if len(self.buckets) > 1 and self.buckets[-2][0] > start:
+            self.buckets = deque(sorted(self.buckets, key=lambda b: b[0]))
+        return bucket
+
+    def add(self, entry: Dict):
+        self._bucket_for(entry['created_ts'], create=True)[1].append(entry)
+        self._count(entry, 1)
+
+    def remove(self, entry: Dict):
+        bucket = self._bucket_for(entry['created_ts'], create=False)
+        if bucket is not None and entry in bucket[1]:
+            bucket[1].remove(entry)
+            self._count(entry, -1)
+
+    def expire(self, now: float):
+        cutoff = now - self.seconds
+        while self.buckets and self.buckets[0][0] + self.bucket_seconds <= cutoff:
+            for entry in self.buckets.popleft()[1]:
+                self._count(entry, -1)
+        # The oldest bucket straddles the cutoff; drop just its expired entries
+        if self.buckets:
+            expired = [entry for entry in self.buckets[0][1] if entry['created_ts'] <= cutoff]
+            for entry in expired:
+                self.buckets[0][1].remove(entry)
+                self._count(entry, -1)
+
+    def top(self, count: int) -> List[Dict]:
+        if self.top_cache is None or len(self.top_cache) < min(count, self.total):
+            entries = (entry for bucket in self.buckets for entry in bucket[1])
+            self.top_cache = heapq.nlargest(count, entries, key=lambda e: (e['confidence'], e['created_ts']))
+        return self.top_cache[:count]
+
+    def snapshot(self, top: int) -> Dict:
+        return {'counts': dict(self.counts), 'total': self.total,
+                'avg_confidence': self.confidence_sum / self.total if self.total else 0.0,
+                'top': self.top(top)}
+
+
+class RollingSignalAggregates:
+    """Sliding-window signal counts overall and per coin"""
+
+    def __init__(self, overall_hours: int = 6, overall_min_confidence: float = 0.65,
+                 coin_hours: int = 24, coin_min_confidence: float = 0.6,
+                 bucket_seconds: int = 60, top_count: int = 5):
+        self.overall_hours = overall_hours
+        self.overall_min_confidence = overall_min_confidence
+        self.coin_hours = coin_hours
+        self.coin_min_confidence = coin_min_confidence
+        self.bucket_seconds = bucket_seconds
+        self.top_count = top_count
+        self.overall = _Window(overall_hours * 3600, overall_min_confidence, bucket_seconds)
+        self.coins: Dict[str, _Window] = {}
+        # url -> entry, oldest first, so an updated article replaces its earlier signal
+        self.entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.horizon = max(overall_hours, coin_hours) * 3600
+        self.lock = threading.Lock()
+
+    def covers(self, hours: int, min_confidence: float, coin: bool = False) -> bool:
+        """True if a query with these parameters can be answered from memory"""
+        if coin:
+            return hours == self.coin_hours and min_confidence == self.coin_min_confidence
+        return hours == self.overall_hours and min_confidence == self.overall_min_confidence
+
+    def _windows(self, entry: Dict) -> Iterable[_Window]:
+        if self.overall.qualifies(entry):
+            yield self.overall
+        for coin in entry['coins']:
+            window = self.coins.get(coin)
+            if window is None:
+                window = self.coins[coin] = _Window(self.coin_hours * 3600, self.coin_min_confidence,
+                                                    self.bucket_seconds)
+            if window.qualifies(entry):
+                yield window
+
+    def add(self, url: str, created_ts: int, signal: str, confidence: float, coins: Iterable[str],
+            sentiment: float = 0.0, source: str = '', title: str = ''):
+        """Count a stored signal (replacing the earlier signal of the same url)"""
+        entry = {'created_ts': int(created_ts), 'signal': signal, 'confidence': float(confidence),
+                 'coins': tuple(set(coins)), 'sentiment': sentiment, 'source': source, 'title': title or ''}
+        with self.lock:
+            previous = self.entries.pop(url, None)
+            if previous is not None:
+                for window in self._windows(previous):
+                    window.remove(previous)
+            if entry['created_ts'] <= time.time() - self.horizon:
+                return
+            self.entries[url] = entry
+            for window in self._windows(entry):
+                window.add(entry)
+
+    def _expire(self, now: float):
+        self.overall.expire(now)
+        for coin in list(self.coins):
+            window = self.coins[coin]
+            window.expire(now)
+            if not window.buckets:
+                del self.coins[coin]
+        while self.entries:
+            url, entry = next(iter(self.entries.items()))
+            if entry['created_ts'] > now - self.horizon:
+                break
+            del self.entries[url]
+
+    def overall_stats(self) -> Dict:
+        with self.lock:
+            self._expire(time.time())
+            return self.overall.snapshot(self.top_count)
+
+    def coin_stats(self, coin: str) -> Dict:
+        with self.lock:
+            self._expire(time.time())
+            window = self.coins.get(coin)
+            if window is None:
+                return {'counts': dict.fromkeys(SIGNALS, 0), 'total': 0, 'avg_confidence': 0.0, 'top': []}
+            return window.snapshot(self.top_count)
+
+    def status(self) -> Dict:
+        with self.lock:
+            return {'entries': len(self.entries), 'overall_signals': self.overall.total,
+                    'coins': {coin: window.total for coin, window in self.coins.items()}}
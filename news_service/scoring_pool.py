@@ -0,0 +1,164 @@
+"""
+Process-pool news scoring.
+
+ScoringPool runs CryptoNewsTrader.generate_trading_signal on worker
+processes, in chunks, and yields (article, signal) pairs in input order. Only
+a bounded number of chunks is in flight at a time, so archives of hundreds of
+thousands of articles stream through with flat memory, and live scoring can
+be kept off the web server's threads. Workers only score; every result comes
+back to the caller, whose buffered writer (save_news_signal/flush_signals)
+stays the single connection writing to SQLite.
+
+With max_workers=0 the pool scores inline on the calling thread.
+
+Backfill an archive of JSON lines (title, url, source, published, content):
+
+    python -m news_service.scoring_pool archive.jsonl --workers 4
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_scorer = None
+
+
+def _init_worker(trading_keywords: Dict, crypto_aliases: Dict):
+    """Build one scoring-only trader per worker process with the parent's keyword configuration"""
+    global _scorer
+    from news_service.crypto_news_trader import CryptoNewsTrader
+    from news_service.text_analyzer import KeywordMatcher
+
+    _scorer = CryptoNewsTrader(db_path=':memory:')
+    _scorer.fetcher.close()
+    _scorer.trading_keywords = trading_keywords
+    _scorer.crypto_aliases = crypto_aliases
+    _scorer.matcher = KeywordMatcher(trading_keywords, crypto_aliases)
+
+
+def _score_chunk(articles: List[Dict]) -> List[Optional[Dict]]:
+    results = []
+    for article in articles:
+        try:
+            results.append(_scorer.generate_trading_signal(article))
+        except Exception as e:
+            logger.error(f"Error scoring {article.get('url')}: {e}")
+            results.append(None)
+    return results
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ScoringPool:
+    """Score articles on worker processes in ordered chunks"""
+
+    def __init__(self, trader, max_workers: Optional[int] = None, chunk_size: int = 200,
+                 max_pending_chunks: Optional[int] = None):
+        self.trader = trader
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.chunk_size = chunk_size
+        self.max_pending_chunks = max_pending_chunks or max(2 * self.max_workers, 1)
+        self.executor = None
+        self.stats = {'articles': 0, 'chunks': 0, 'errors': 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the workers on first use"""
+        if self.executor is None:
+            # spawn: workers start clean instead of inheriting the web server's threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(self.trader.trading_keywords, self.trader.crypto_aliases))
+        return self.executor
+
+    def score(self, articles: Iterable[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+        """(article, signal) for every article that scored, in input order"""
+        if self.max_workers <= 0:
+            for chunk in chunked(articles, self.chunk_size):
+                yield from self._collect(chunk, [self._score_inline(article) for article in chunk])
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        for chunk in chunked(articles, self.chunk_size):
+            pending.append((chunk, executor.submit(_score_chunk, chunk)))
+            if len(pending) >= self.max_pending_chunks:
+                chunk, future = pending.popleft()
+                yield from self._collect(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from self._collect(chunk, future.result())
+
+    def _score_inline(self, article: Dict) -> Optional[Dict]:
+        try:
+            return self.trader.generate_trading_signal(article)
+        except Exception as e:
+            logger.error(f"Error scoring {article.get('url')}: {e}")
+            return None
+
+    def _collect(self, chunk: List[Dict], signals: List[Optional[Dict]]) -> Iterator[Tuple[Dict, Dict]]:
+        self.stats['chunks'] += 1
+        for article, signal in zip(chunk, signals):
+            self.stats['articles'] += 1
+            if signal is None:
+                self.stats['errors'] += 1
+                continue
+            yield article, signal
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """Articles from a JSON-lines archive, skipping malformed lines"""
+    with open(path, encoding='utf-8') as archive:
+        for line in archive:
+            try:
+                article = json.loads(line)
+            except ValueError:
+                continue
+            if article.get('url') and article.get('title'):
+                yield {'title': article['title'], 'url': article['url'],
+                       'source': article.get('source', 'archive'),
+                       'published': article.get('published', ''),
+                       'content': article.get('content') or article['title']}
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from news_service.crypto_news_trader import CryptoNewsTrader
+
+    parser = argparse.ArgumentParser(description='Score and store an archive of news articles')
+    parser.add_argument('archive', help='JSON lines with title, url, source, published and content')
+    parser.add_argument('--db', default='crypto_trading_news.db')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=200)
+    args = parser.parse_args()
+
+    trader = CryptoNewsTrader(db_path=args.db)
+    pool = ScoringPool(trader, max_workers=args.workers, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+    stored = trader.backfill(read_archive(args.archive), pool)
+    elapsed = time.perf_counter() - started
+    pool.close()
+    trader.close()
+    print(f"Scored and stored {stored} new articles in {elapsed:.1f}s "
+          f"({pool.stats['articles'] / max(elapsed, 1e-9):,.0f} articles/s, {pool.stats['errors']} errors)")
@@ -0,0 +1,103 @@
+"""
+Seen-article index.
+
+Most articles in a news cycle were already scored minutes earlier. SeenIndex
+remembers a fingerprint of the title and stored content of every article URL
+already in news_signals (url is that table's unique key), so only articles
+that are new, or whose text changed, are scored and written again. The index
+is bounded (least recently seen URLs are dropped first) and warmed from
+SQLite on startup, so a restart does not re-analyze the whole feed backlog.
+URLs missing from the index are checked against the database through the
+optional `lookup` callback before they count as new, so evicted entries
+(e.g. during an archive backfill larger than the index) are not re-scored.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+# news_signals stores the first 500 characters of content; fingerprints use the same
+CONTENT_CHARS = 500
+
+
+def fingerprint(title: str, content: str) -> str:
+    """Hash of the article text as it is stored"""
+    text = f"{title or ''}\0{(content or '')[:CONTENT_CHARS]}"
+    return hashlib.blake2b(text.encode('utf-8', 'replace'), digest_size=8).hexdigest()
+
+
+class SeenIndex:
+    """Bounded URL -> fingerprint map of articles already analyzed"""
+
+    def __init__(self, max_size: int = 20000,
+                 lookup: Optional[Callable[[List[str]], Dict[str, str]]] = None):
+        self.max_size = max_size
+        self.lookup = lookup
+        self.entries: 'OrderedDict[str, str]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'checked': 0, 'new': 0, 'updated': 0, 'skipped': 0}
+
+    def warm(self, conn) -> int:
+        """Load the most recent articles' fingerprints from news_signals"""
+        rows = conn.execute('SELECT url, title, content FROM news_signals ORDER BY id DESC LIMIT ?',
+                            (self.max_size,)).fetchall()
+        with self.lock:
+            for url, title, content in reversed(rows):
+                if url:
+                    self._store(url, fingerprint(title, content))
+        return len(rows)
+
+    def _store(self, url: str, value: str):
+        self.entries[url] = value
+        self.entries.move_to_end(url)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def filter_new(self, articles: List[Dict]) -> List[Dict]:
+        """Articles that are new or changed since they were last marked, each URL once"""
+        fresh = []
+        batch = set()
+        if self.lookup is not None:
+            missing = [a.get('url') for a in articles if a.get('url') and a.get('url') not in self.entries]
+            stored = self.lookup(missing) if missing else {}
+            with self.lock:
+                for url, value in stored.items():
+                    self._store(url, value)
+        with self.lock:
+            for article in articles:
+                url = article.get('url')
+                self.stats['checked'] += 1
+                if url in batch:
+                    self.stats['skipped'] += 1
+                    continue
+                known = self.entries.get(url)
+                if known is not None:
+                    self.entries.move_to_end(url)
+                    if known == fingerprint(article.get('title'), article.get('content')):
+                        self.stats['skipped'] += 1
+                        continue
+                    self.stats['updated'] += 1
+                else:
+                    self.stats['new'] += 1
+                batch.add(url)
+                fresh.append(article)
+        return fresh
+
+    def contains(self, article: Dict) -> bool:
+        """True if the article is stored with its current text"""
+        with self.lock:
+            known = self.entries.get(article.get('url'))
+        return known is not None and known == fingerprint(article.get('title'), article.get('content'))
+
+    def mark(self, article: Dict):
+        """Record an article as analyzed and stored"""
+        if not article.get('url'):
+            return
+        with self.lock:
+            self._store(article['url'], fingerprint(article.get('title'), article.get('content')))
+
+    def status(self) -> Dict:
+        checked = self.stats['checked']
+        return {'size': len(self.entries), 'max_size': self.max_size, 'stats': dict(self.stats),
+                'skip_rate': round(self.stats['skipped'] / checked, 3) if checked else None}
@@ -1,6 +1,8 @@
 import hashlib
 import hmac
+import itertools
 import requests
+import threading
 import time
 import json
 import logging
@@ -21,10 +23,171 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Candle resolutions supported by /v2/history/candles, in seconds
+RESOLUTION_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '1d': 86400
+}
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every caller of one exchange client"""
+    
+    def __init__(self, rate: float = 20.0, burst: int = 20):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+    
+    def acquire(self):
+        """Block until a request token is available"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+    
+    def available(self) -> float:
+        """Tokens currently available (for budgeting polling cadence)"""
+        with self.lock:
+            self._refill()
+            return self.tokens
+
+class _Span:
+    """Times one stage of a trading cycle (use via LatencyTracer.span)"""
+    __slots__ = ('tracer', 'stage', 'root', 'start')
+    
+    def __init__(self, tracer: 'LatencyTracer', stage: int, root: bool):
+        self.tracer = tracer
+        self.stage = stage
+        self.root = root
+    
+    def __enter__(self):
+        if self.root:
+            self.tracer.local.trace_id = next(self.tracer.trace_ids)
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        tracer = self.tracer
+        tracer.buffer[next(tracer.slots) % tracer.capacity] = (
+            self.stage, getattr(tracer.local, 'trace_id', 0), self.start, end - self.start)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class LatencyTracer:
+    """Per-stage timing of the tick-to-order path in a fixed-size ring buffer
+    
+    Spans are written as small tuples into a preallocated ring (no locking on
+    the hot path) and summarized as percentiles with NumPy on demand. A root span (the
+    whole tick) starts a new trace id so nested stages of one cycle can be
+    grouped when exported as a Chrome/Perfetto trace file.
+    """
+    
+    def __init__(self, capacity: int = 8192, enabled: bool = True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.stage_ids: Dict[str, int] = {}
+        self.stage_names: List[str] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.trace_ids = itertools.count(1)
+        self.reset()
+    
+    def reset(self):
+        """Drop all recorded spans"""
+        self.slots = itertools.count()
+        self.buffer: List[Optional[Tuple[int, int, int, int]]] = [None] * self.capacity
+    
+    def _stage_id(self, stage: str) -> int:
+        stage_id = self.stage_ids.get(stage)
+        if stage_id is None:
+            with self.lock:
+                stage_id = self.stage_ids.setdefault(stage, len(self.stage_names))
+                if stage_id == len(self.stage_names):
+                    self.stage_names.append(stage)
+        return stage_id
+    
+    def span(self, stage: str, root: bool = False):
+        """Context manager timing `stage`; a root span begins a new trace"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, self._stage_id(stage), root)
+    
+    def _recorded(self) -> np.ndarray:
+        """Buffered spans as an (n, 4) array of stage, trace id, start ns, duration ns"""
+        spans = [span for span in self.buffer if span is not None]
+        return np.array(spans, dtype=np.int64).reshape(-1, 4)
+    
+    def summary(self) -> Dict[str, Dict]:
+        """Count, mean and p50/p90/p99/max latency (microseconds) per stage"""
+        recorded = self._recorded()
+        stages = recorded[:, 0]
+        durations = recorded[:, 3] / 1000.0
+        result = {}
+        for stage_id, name in enumerate(list(self.stage_names)):
+            samples = durations[stages == stage_id]
+            if not len(samples):
+                continue
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            result[name] = {
+                'count': int(len(samples)),
+                'mean_us': float(samples.mean()),
+                'p50_us': float(p50),
+                'p90_us': float(p90),
+                'p99_us': float(p99),
+                'max_us': float(samples.max())
+            }
+        return result
+    
+    def export(self, path: str) -> int:
+        """Write buffered spans as a Chrome trace-event file; returns the span count"""
+        recorded = self._recorded()
+        recorded = recorded[np.argsort(recorded[:, 2], kind='stable')]
+        events = [{
+            'name': self.stage_names[stage],
+            'ph': 'X',
+            'ts': start / 1000.0,
+            'dur': duration / 1000.0,
+            'pid': os.getpid(),
+            'tid': trace_id,
+            'args': {'trace_id': trace_id}
+        } for stage, trace_id, start, duration in recorded.tolist()]
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+# Shared by every bot in the process
+latency_tracer = LatencyTracer()
+
 class DeltaExchangeAPI:
     """Delta Exchange API client for trading operations"""
     
-    def __init__(self, api_key: str, api_secret: str, base_url: str = 'https://api.india.delta.exchange', symbol: str = None):
+    def __init__(self, api_key: str, api_secret: str, base_url: str = 'https://api.india.delta.exchange', symbol: str = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         logger.info(f"DeltaExchangeAPI initialized with Base URL: {base_url}")
         logger.info(f"DeltaExchangeAPI initialized with Symbol: {symbol}")
         
@@ -32,6 +195,7 @@ class DeltaExchangeAPI:
         self.api_secret = api_secret
         self.base_url = base_url
         self.symbol = symbol
+        self.rate_limiter = rate_limiter
         
     def generate_signature(self, secret: str, message: str) -> str:
         """Generate HMAC SHA256 signature for API authentication"""
@@ -70,6 +234,9 @@ class DeltaExchangeAPI:
             'Content-Type': 'application/json'
         }
         
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        
         try:
             logger.info(f"Making API request: {method} {url}")
             logger.info(f"Request params: {params}")
@@ -130,6 +297,35 @@ class DeltaExchangeAPI:
             logger.error(f"Failed to get ticker: {response}")
             return {}
     
+    def get_product(self, symbol: str) -> Dict:
+        """Get product specification (contract_value, tick_size, ...) for a symbol"""
+        response = self.make_request('GET', f'/v2/products/{symbol}')
+        if response.get('success'):
+            return response.get('result', {})
+        else:
+            logger.error(f"Failed to get product: {response}")
+            return {}
+    
+    def get_l2_orderbook(self, symbol: str, depth: Optional[int] = None) -> Dict:
+        """Get the L2 order book snapshot ({'buy': [...], 'sell': [...]}) for a symbol"""
+        params = {'depth': depth} if depth else None
+        response = self.make_request('GET', f'/v2/l2orderbook/{symbol}', params=params)
+        if response.get('success'):
+            return response.get('result', {})
+        else:
+            logger.error(f"Failed to get order book: {response}")
+            return {}
+    
+    def get_tickers(self, contract_types: str = None) -> List[Dict]:
+        """Get ticker data for all products in a single call"""
+        params = {'contract_types': contract_types} if contract_types else None
+        response = self.make_request('GET', '/v2/tickers', params=params)
+        if response.get('success'):
+            return response.get('result', [])
+        else:
+            logger.error(f"Failed to get tickers: {response}")
+            return []
+    
     def place_order(self, product_symbol: str, side: str, size: int, order_type: str = 'market_order', 
                    limit_price: str = None, stop_price: str = None) -> Dict:
         """Place a trading order"""
@@ -155,8 +351,8 @@ class DeltaExchangeAPI:
             logger.error(f"Failed to place order: {response}")
             return {}
     
-    def get_positions(self) -> List[Dict]:
-        """Get current positions for the trading symbol"""
+    def get_positions(self) -> Optional[List[Dict]]:
+        """Get current positions, or None if the request failed (an empty list means flat)"""
         # Use the correct endpoint from official documentation
         response = self.make_request('GET', '/v2/positions/margined', params={})
         if response.get('success'):
@@ -164,7 +360,7 @@ class DeltaExchangeAPI:
             return response.get('result', [])
         else:
             logger.error(f"Failed to get positions: {response}")
-            return []
+            return None
     
     def get_orders(self, product_symbol: str = None, state: str = 'open') -> List[Dict]:
         """Get orders"""
@@ -232,19 +428,216 @@ class TechnicalIndicators:
         death_cross = short_prev >= long_prev and short_current < long_current
         
         return golden_cross, death_cross
+    
+    @staticmethod
+    def rsi(prices: List[float], period: int = 14) -> List[float]:
+        """Calculate Relative Strength Index with Wilder smoothing"""
+        if len(prices) <= period:
+            return []
+        
+        deltas = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
+        gains = [max(delta, 0.0) for delta in deltas]
+        losses = [max(-delta, 0.0) for delta in deltas]
+        avg_gain = sum(gains[:period]) / period
+        avg_loss = sum(losses[:period]) / period
+        
+        def value(gain, loss):
+            return 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+        
+        rsi_values = [value(avg_gain, avg_loss)]
+        for gain, loss in zip(gains[period:], losses[period:]):
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+            rsi_values.append(value(avg_gain, avg_loss))
+        
+        return rsi_values
+
+class IndicatorState:
+    """Indicators over one price buffer, each computed at most once per evaluation
+    
+    Strategies evaluated together share one IndicatorState, so two strategies
+    reading the same SMA or EMA period cost one computation, not two.
+    SMAs only need their last two values for crossover detection.
+    """
+    
+    def __init__(self, prices: List[float]):
+        self.prices = prices
+        self.cache: Dict[Tuple[str, int], List[float]] = {}
+    
+    def sma(self, period: int) -> List[float]:
+        """Last two SMA values (fewer if the buffer is short)"""
+        key = ('sma', period)
+        if key not in self.cache:
+            prices = self.prices
+            values = []
+            if len(prices) > period:
+                values.append(sum(prices[-period - 1:-1]) / period)
+            if len(prices) >= period:
+                values.append(sum(prices[-period:]) / period)
+            self.cache[key] = values
+        return self.cache[key]
+    
+    def ema(self, period: int) -> List[float]:
+        key = ('ema', period)
+        if key not in self.cache:
+            self.cache[key] = TechnicalIndicators.ema(self.prices, period)
+        return self.cache[key]
+    
+    def rsi(self, period: int) -> List[float]:
+        key = ('rsi', period)
+        if key not in self.cache:
+            self.cache[key] = TechnicalIndicators.rsi(self.prices, period)
+        return self.cache[key]
+
+class Strategy:
+    """Base class for strategies registered in a StrategySet
+    
+    evaluate() returns a vote in [-1, 1]: positive to buy, negative to sell,
+    0 for no opinion. Indicators are read from the shared IndicatorState and
+    external inputs (news) from the context dict. A strategy with veto set
+    blocks any signal its vote opposes, whatever the weighted score.
+    """
+    
+    name = 'strategy'
+    veto = False
+    
+    def __init__(self, weight: float = 1.0):
+        self.weight = weight
+    
+    def required_history(self) -> int:
+        """Price points needed before the vote is meaningful"""
+        return 0
+    
+    def evaluate(self, state: IndicatorState, context: Dict) -> float:
+        raise NotImplementedError
+
+class SmaCrossStrategy(Strategy):
+    """Buy on a golden cross, sell on a death cross of two SMAs"""
+    
+    name = 'sma'
+    
+    def __init__(self, short_period: int = 9, long_period: int = 10, weight: float = 1.0):
+        super().__init__(weight)
+        self.short_period = short_period
+        self.long_period = long_period
+    
+    def required_history(self) -> int:
+        return self.long_period
+    
+    def evaluate(self, state: IndicatorState, context: Dict) -> float:
+        golden, death = TechnicalIndicators.detect_crossover(state.sma(self.short_period), state.sma(self.long_period))
+        return 1.0 if golden else -1.0 if death else 0.0
+
+class EmaCrossStrategy(SmaCrossStrategy):
+    """Buy on a golden cross, sell on a death cross of two EMAs"""
+    
+    name = 'ema'
+    
+    def evaluate(self, state: IndicatorState, context: Dict) -> float:
+        golden, death = TechnicalIndicators.detect_crossover(state.ema(self.short_period), state.ema(self.long_period))
+        return 1.0 if golden else -1.0 if death else 0.0
+
+class RsiStrategy(Strategy):
+    """Buy when RSI climbs out of oversold, sell when it drops out of overbought"""
+    
+    name = 'rsi'
+    
+    def __init__(self, period: int = 14, oversold: float = 30, overbought: float = 70, weight: float = 1.0):
+        super().__init__(weight)
+        self.period = period
+        self.oversold = oversold
+        self.overbought = overbought
+    
+    def required_history(self) -> int:
+        return self.period + 2
+    
+    def evaluate(self, state: IndicatorState, context: Dict) -> float:
+        values = state.rsi(self.period)
+        if len(values) < 2:
+            return 0.0
+        previous, current = values[-2], values[-1]
+        if previous < self.oversold <= current:
+            return 1.0
+        if previous > self.overbought >= current:
+            return -1.0
+        return 0.0
+
+class NewsStrategy(Strategy):
+    """Vote with the news recommendation passed in the context ('BUY', 'SELL' or 'NEUTRAL')
+    
+    The context only carries a recommendation above the news confidence
+    threshold, and such news vetoes a technical signal it contradicts.
+    """
+    
+    name = 'news'
+    veto = True
+    
+    def evaluate(self, state: IndicatorState, context: Dict) -> float:
+        recommendation = context.get('news', 'NEUTRAL')
+        return 1.0 if recommendation == 'BUY' else -1.0 if recommendation == 'SELL' else 0.0
+
+class StrategySet:
+    """Strategies registered for one symbol, evaluated in one pass and combined by weight
+    
+    The weighted sum of votes is the score; it becomes a buy signal at
+    +threshold and a sell signal at -threshold, unless a vetoing strategy
+    votes against it. Strategies with zero weight are skipped entirely.
+    """
+    
+    def __init__(self, strategies: Optional[List[Strategy]] = None, threshold: float = 0.8):
+        self.strategies: Dict[str, Strategy] = {}
+        self.threshold = threshold
+        for strategy in strategies or []:
+            self.register(strategy)
+    
+    def register(self, strategy: Strategy):
+        """Add a strategy, replacing any registered under the same name"""
+        self.strategies[strategy.name] = strategy
+    
+    def unregister(self, name: str):
+        self.strategies.pop(name, None)
+    
+    def required_history(self) -> int:
+        return max((s.required_history() for s in self.strategies.values() if s.weight), default=0)
+    
+    def evaluate(self, state: IndicatorState, context: Optional[Dict] = None) -> Dict:
+        """Votes of every active strategy, their weighted score, the resulting signal and any veto"""
+        context = context or {}
+        votes = {}
+        score = 0.0
+        for name, strategy in self.strategies.items():
+            if not strategy.weight:
+                continue
+            vote = strategy.evaluate(state, context)
+            votes[name] = vote
+            score += strategy.weight * vote
+        
+        signal = 'buy' if score >= self.threshold else 'sell' if score <= -self.threshold else None
+        vetoed_by = None
+        if signal:
+            direction = 1 if signal == 'buy' else -1
+            vetoed_by = next((name for name, vote in votes.items()
+                              if self.strategies[name].veto and vote * direction < 0), None)
+            if vetoed_by:
+                signal = None
+        return {'votes': votes, 'score': score, 'signal': signal, 'vetoed_by': vetoed_by}
 
 class RiskManager:
     """Risk management for trading operations"""
     
     def __init__(self, max_position_size: int = 10, stop_loss_pct: float = 0.02, 
-                 take_profit_pct: float = 0.04, max_daily_loss: float = 0.05):
+                 take_profit_pct: float = 0.04, max_daily_loss: float = 0.05,
+                 max_daily_trades: Optional[int] = None, min_position_size: int = 1):
         self.max_position_size = max_position_size
+        self.min_position_size = min_position_size  # order size when the contract value is unknown
         self.stop_loss_pct = stop_loss_pct
         self.take_profit_pct = take_profit_pct
         self.max_daily_loss = max_daily_loss
-        self.daily_pnl = 0.0
+        self.max_daily_trades = max_daily_trades
+        self.daily_pnl = 0.0  # fraction of account balance
         self.trades_today = 0
         self.last_reset_date = datetime.now().date()
+        self.day_start_pnl = None  # ledger total PnL at the start of the day
     
     def reset_daily_counters(self):
         """Reset daily counters if new day"""
@@ -252,29 +645,70 @@ class RiskManager:
         if current_date > self.last_reset_date:
             self.daily_pnl = 0.0
             self.trades_today = 0
+            self.day_start_pnl = None
             self.last_reset_date = current_date
             logger.info("Daily counters reset")
     
+    def update_pnl(self, total_pnl: float, account_balance: float):
+        """Update today's PnL (as a fraction of account balance) from a running PnL total"""
+        self.reset_daily_counters()
+        if self.day_start_pnl is None:
+            # Baseline so that PnL already booked today (e.g. restored after a restart) is kept
+            self.day_start_pnl = total_pnl - self.daily_pnl * account_balance
+        self.daily_pnl = (total_pnl - self.day_start_pnl) / account_balance
+    
+    def record_trade(self):
+        """Count an order sent today"""
+        self.reset_daily_counters()
+        self.trades_today += 1
+    
+    def export_state(self) -> Dict:
+        """Daily counters in JSON-serializable form"""
+        return {
+            'daily_pnl': self.daily_pnl,
+            'trades_today': self.trades_today,
+            'last_reset_date': self.last_reset_date.isoformat()
+        }
+    
+    def restore_state(self, state: Dict):
+        """Restore daily counters saved with export_state"""
+        self.daily_pnl = float(state.get('daily_pnl', 0.0))
+        self.trades_today = int(state.get('trades_today', 0))
+        self.last_reset_date = datetime.fromisoformat(state['last_reset_date']).date()
+        self.day_start_pnl = None
+        self.reset_daily_counters()
+    
     def can_trade(self) -> bool:
         """Check if trading is allowed based on risk parameters"""
         self.reset_daily_counters()
         
-        if abs(self.daily_pnl) >= self.max_daily_loss:
+        if self.daily_pnl <= -self.max_daily_loss:
             logger.warning(f"Daily loss limit reached: {self.daily_pnl:.4f}")
             return False
         
+        if self.max_daily_trades is not None and self.trades_today >= self.max_daily_trades:
+            logger.warning(f"Daily trade limit reached: {self.trades_today}")
+            return False
+        
         return True
     
-    def calculate_position_size(self, current_price: float, account_balance: float) -> int:
-        """Calculate appropriate position size based on risk management"""
-        return 1
+    def calculate_position_size(self, current_price: float, account_balance: float,
+                                contract_value: Optional[float] = 1.0) -> int:
+        """Calculate appropriate position size (in contracts) based on risk management
+        
+        Without a contract value (product lookup failed) the size cannot be
+        derived from the risk budget, so the minimum size is traded instead.
+        """
         if not self.can_trade():
             return 0
         
+        if not contract_value:
+            return min(self.min_position_size, self.max_position_size)
+        
         # Use a percentage of account balance for position sizing
         risk_amount = account_balance * 0.01  # 1% of account per trade
         position_value = risk_amount / self.stop_loss_pct
-        position_size = int(position_value / current_price)
+        position_size = int(position_value / (current_price * contract_value))
         
         # Ensure position size doesn't exceed maximum
         return min(position_size, self.max_position_size)
@@ -293,14 +727,117 @@ class RiskManager:
         else:
             return entry_price * (1 - self.take_profit_pct)
 
+class PositionLedger:
+    """Position and PnL for one symbol, maintained incrementally from our own fills"""
+    
+    def __init__(self, symbol: str, contract_value: float = 1.0):
+        self.symbol = symbol
+        self.contract_value = contract_value
+        self.size = 0.0
+        self.entry_price = 0.0
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+        self.mark_price = 0.0
+        self.unrealized_pnl = 0.0
+        self.lock = threading.Lock()
+    
+    def apply_fill(self, side: str, size: float, price: float, fee: float = 0.0):
+        """Net a fill into the position with average-price accounting"""
+        signed_size = size if side == 'buy' else -size
+        with self.lock:
+            current = self.size
+            new_size = current + signed_size
+            
+            if current == 0 or (current > 0) == (signed_size > 0):
+                # Opening or adding: weighted average entry
+                self.entry_price = (self.entry_price * abs(current) + price * abs(signed_size)) / abs(new_size)
+            else:
+                # Reducing, closing or flipping: realize PnL on the closed quantity
+                closed = min(abs(current), abs(signed_size))
+                self.realized_pnl += ((price - self.entry_price) * closed * self.contract_value
+                                      * (1 if current > 0 else -1))
+                if new_size == 0:
+                    self.entry_price = 0.0
+                elif (new_size > 0) != (current > 0):
+                    self.entry_price = price
+            
+            self.realized_pnl -= fee
+            self.fees_paid += fee
+            self.size = new_size
+            self._mark(price)
+    
+    def _mark(self, price: float):
+        self.mark_price = price
+        self.unrealized_pnl = (price - self.entry_price) * self.size * self.contract_value if self.size else 0.0
+    
+    def mark(self, price: float):
+        """Mark the position to market (O(1), no exchange call)"""
+        with self.lock:
+            self._mark(price)
+    
+    def reconcile(self, position: Optional[Dict]) -> bool:
+        """Adopt the exchange's size and entry price; returns True if they had drifted
+        
+        Realized PnL stays the ledger's own running total: the exchange reports it
+        per position, so adopting it would reset the day's PnL whenever a position
+        closes or reopens. Quantity the exchange closed without our fill (stop,
+        liquidation, manual close) is realized at the last mark price instead.
+        """
+        size = float(position.get('size', 0)) if position else 0.0
+        entry_price = float(position.get('entry_price', 0) or 0) if position else 0.0
+        with self.lock:
+            drifted = size != self.size or (size != 0 and abs(entry_price - self.entry_price) > 1e-9)
+            if drifted:
+                logger.info(f"[{self.symbol}] Position ledger reconciled: size {self.size} -> {size}")
+            current = self.size
+            if current != 0 and (size == 0 or (size > 0) != (current > 0) or abs(size) < abs(current)):
+                closed = abs(current) if size == 0 or (size > 0) != (current > 0) else abs(current) - abs(size)
+                exit_price = self.mark_price or self.entry_price
+                self.realized_pnl += ((exit_price - self.entry_price) * closed * self.contract_value
+                                      * (1 if current > 0 else -1))
+            self.size = size
+            self.entry_price = entry_price if size else 0.0
+            if self.mark_price:
+                self._mark(self.mark_price)
+            return drifted
+    
+    def to_position(self) -> Optional[Dict]:
+        """Open position in the /v2/positions/margined shape, or None when flat"""
+        with self.lock:
+            if self.size == 0:
+                return None
+            return {
+                'product_symbol': self.symbol,
+                'size': self.size,
+                'entry_price': self.entry_price,
+                'realized_pnl': self.realized_pnl,
+                'unrealized_pnl': self.unrealized_pnl,
+                'mark_price': self.mark_price
+            }
+    
+    def snapshot(self) -> Optional[Dict]:
+        """Position summary for status reporting, or None when flat"""
+        with self.lock:
+            if self.size == 0:
+                return None
+            return {
+                'side': 'long' if self.size > 0 else 'short',
+                'size': abs(self.size),
+                'entry_price': self.entry_price,
+                'realized_pnl': self.realized_pnl,
+                'unrealized_pnl': self.unrealized_pnl,
+                'total_pnl': self.realized_pnl + self.unrealized_pnl
+            }
+
 class MovingAverageTradingBot:
     """Main trading bot class implementing moving average strategies"""
     
-    def __init__(self, api_key: str, api_secret: str, symbol: str = 'BTCUSD'):
+    def __init__(self, api_key: str, api_secret: str, symbol: str = 'BTCUSD', api: Optional[DeltaExchangeAPI] = None):
         logger.info(f"MovingAverageTradingBot initialized with Symbol: {symbol}")
         
         self.symbol = symbol
-        self.api = DeltaExchangeAPI(api_key, api_secret, symbol=self.symbol)
+        # A shared client (and its rate limiter) can be injected when several bots run in one process
+        self.api = api or DeltaExchangeAPI(api_key, api_secret, symbol=self.symbol)
         self.risk_manager = RiskManager()
         self.indicators = TechnicalIndicators()
         
@@ -309,9 +846,19 @@ class MovingAverageTradingBot:
         self.long_ma_period = 10
         self.ema_short_period = 9
         self.ema_long_period = 10
+        self.rsi_period = 14
         self.candle_resolution = '1h'
         self.lookback_hours = 24
         
+        # Strategies voting on every tick; a signal needs a weighted score of at least signal_threshold
+        self.strategy_weights = {'sma': 1.0, 'ema': 1.0, 'rsi': 0.0, 'news': 0.3}
+        self.signal_threshold = 0.8
+        self.strategies = StrategySet()
+        self.configure_strategies()
+        
+        # Version of the last configuration snapshot applied (see apply_config)
+        self.config_version = 0
+        
         # Trading state
         self.current_position = None
         self.last_signal_time = 0
@@ -321,8 +868,210 @@ class MovingAverageTradingBot:
         self.price_data = []
         self.timestamps = []
         
+        # Optional crash-safe state journal (see trading_engine.state_journal)
+        self.journal = None
+        
+        # Local position ledger, reconciled with the exchange whenever positions are fetched
+        self.ledger = PositionLedger(symbol)
+        self.reconcile_interval = 60
+        self.last_reconcile = 0.0
+        
+        # Per-stage latency of the tick-to-order path
+        self.tracer = latency_tracer
+        
+        # Position sizing inputs and the optional shared portfolio risk engine
+        self.account_balance = 10000
+        self.contract_value = None
+        self.contract_value_retry_at = 0.0
+        self.contract_value_retry_seconds = 300
+        self.risk_engine = None
+        
+        # Optional L2 book (see trading_engine.order_book): market orders are capped at
+        # the size it fills within max_slippage_bps of mid
+        self.order_book = None
+        self.max_slippage_bps = 20.0
+        
         logger.info(f"Trading bot initialized for {symbol}")
     
+    def attach_journal(self, journal):
+        """Journal price and state changes so a restart can resume without refetching"""
+        self.journal = journal
+        journal.register(self)
+    
+    def apply_config(self, config: Dict, version: int = 0) -> Dict:
+        """Apply strategy and risk settings between ticks; returns {field: (old, new)} for changes
+        
+        Indicators are recomputed from the price buffer on every tick, so new
+        MA periods take effect on the next evaluation without refetching history.
+        """
+        updates = {
+            'short_ma_period': config.get('sma_short_period'),
+            'long_ma_period': config.get('sma_long_period'),
+            'ema_short_period': config.get('ema_short_period'),
+            'ema_long_period': config.get('ema_long_period'),
+            'rsi_period': config.get('rsi_period'),
+            'signal_threshold': config.get('signal_threshold'),
+            'max_slippage_bps': config.get('max_slippage_bps'),
+        }
+        risk_updates = {
+            'max_position_size': config.get('position_size'),
+            'stop_loss_pct': config['stop_loss_percent'] / 100 if config.get('stop_loss_percent') is not None else None,
+            'take_profit_pct': config['take_profit_percent'] / 100 if config.get('take_profit_percent') is not None else None,
+            'max_daily_trades': config.get('max_daily_trades'),
+        }
+        
+        changed = {}
+        for target, fields in ((self, updates), (self.risk_manager, risk_updates)):
+            for name, value in fields.items():
+                if value is None:
+                    continue
+                if name.endswith('_period') or name in ('max_position_size', 'max_daily_trades'):
+                    value = int(value)
+                old = getattr(target, name)
+                if old != value:
+                    setattr(target, name, value)
+                    changed[name] = (old, value)
+        
+        for name, old in list(self.strategy_weights.items()):
+            value = config.get(f'{name}_weight')
+            if value is not None and float(value) != old:
+                self.strategy_weights[name] = float(value)
+                changed[f'{name}_weight'] = (old, float(value))
+        self.configure_strategies()
+        
+        if 'max_position_size' in changed and self.risk_engine:
+            self.register_risk()
+        
+        longest = self.strategies.required_history()
+        if self.price_data and len(self.price_data) < longest:
+            logger.warning(f"[{self.symbol}] Price buffer has {len(self.price_data)} points, "
+                           f"signals resume once {longest} are available")
+        
+        self.config_version = version
+        if changed:
+            logger.info(f"[{self.symbol}] Applied config v{version}: "
+                        + ", ".join(f"{name} {old} -> {new}" for name, (old, new) in changed.items()))
+        return changed
+    
+    def configure_strategies(self):
+        """Sync the built-in strategies with the bot's periods and weights; other registered strategies are kept"""
+        for strategy in (SmaCrossStrategy(self.short_ma_period, self.long_ma_period),
+                         EmaCrossStrategy(self.ema_short_period, self.ema_long_period),
+                         RsiStrategy(self.rsi_period),
+                         NewsStrategy()):
+            strategy.weight = self.strategy_weights.get(strategy.name, 0.0)
+            self.strategies.register(strategy)
+        self.strategies.threshold = self.signal_threshold
+    
+    def attach_risk_engine(self, risk_engine):
+        """Check orders against portfolio-wide limits shared with other bots"""
+        self.risk_engine = risk_engine
+        self.register_risk()
+        self.sync_risk()
+    
+    def register_risk(self):
+        """Register limits and contract value with the portfolio engine once the contract value is known
+        
+        Until then the symbol stays out of the portfolio arrays rather than
+        being counted with a guessed contract value; get_contract_value
+        registers it when a lookup succeeds.
+        """
+        if self.get_contract_value() is not None:
+            self.risk_engine.register(self.symbol, self.risk_manager.max_position_size, self.contract_value)
+    
+    def check_portfolio_risk(self, side: str, position_size: int, current_price: float) -> bool:
+        """Pre-trade portfolio check; passes the minimum-size order traded while the contract value is unknown"""
+        if not self.risk_engine:
+            return True
+        if self.contract_value is None:
+            logger.warning(f"[{self.symbol}] Contract value unknown, skipping the portfolio exposure check "
+                           f"for a {position_size}-contract order")
+            return True
+        return self.risk_engine.check_order(self.symbol, side, position_size, current_price)
+    
+    def fit_to_book(self, side: str, position_size: int) -> int:
+        """Cap a market order at what the L2 book fills within max_slippage_bps (no book: unchanged)"""
+        book = self.order_book
+        if book is None or not book.is_ready():
+            return position_size
+        
+        fillable = int(book.max_size(side, self.max_slippage_bps))
+        if fillable < position_size:
+            logger.warning(f"[{self.symbol}] Book fills {fillable} of {position_size} contracts within "
+                           f"{self.max_slippage_bps} bps, reducing order")
+            position_size = fillable
+        expected = book.fill_price(side, position_size) if position_size > 0 else None
+        if expected:
+            logger.info(f"[{self.symbol}] Expected fill ~{expected['average_price']:.2f} "
+                        f"({expected['slippage_bps']:.1f} bps from mid)")
+        return position_size
+    
+    def get_contract_value(self) -> Optional[float]:
+        """Underlying amount per contract, fetched once from the product specification
+        
+        None while the product is unavailable; a failed lookup is retried at
+        most every contract_value_retry_seconds.
+        """
+        if self.contract_value is None and time.monotonic() >= self.contract_value_retry_at:
+            try:
+                product = self.api.get_product(self.symbol)
+            except Exception as e:
+                logger.error(f"Error getting product for {self.symbol}: {e}")
+                product = {}
+            if not product.get('contract_value'):
+                self.contract_value_retry_at = time.monotonic() + self.contract_value_retry_seconds
+                logger.error(f"[{self.symbol}] Contract value unavailable, trading the minimum size "
+                             f"and retrying in {self.contract_value_retry_seconds}s")
+                return None
+            self.contract_value = float(product['contract_value'])
+            self.ledger.contract_value = self.contract_value
+            if self.risk_engine:
+                # The symbol was left out of the portfolio engine while the value was unknown
+                self.risk_engine.register(self.symbol, self.risk_manager.max_position_size, self.contract_value)
+                self.sync_risk()
+        return self.contract_value
+    
+    def sync_risk(self):
+        """Push ledger PnL and exposure into the daily risk counters and the portfolio engine"""
+        total_pnl = self.ledger.realized_pnl + self.ledger.unrealized_pnl
+        self.risk_manager.update_pnl(total_pnl, self.account_balance)
+        if self.risk_engine and self.contract_value is not None:
+            self.risk_engine.update(self.symbol, self.ledger.size, self.ledger.mark_price,
+                                    self.risk_manager.daily_pnl * self.account_balance)
+    
+    def export_state(self) -> Dict:
+        """Everything needed to resume trading after a restart"""
+        return {
+            'symbol': self.symbol,
+            'price_data': list(self.price_data),
+            'timestamps': list(self.timestamps),
+            'last_signal_time': self.last_signal_time,
+            'risk': self.risk_manager.export_state()
+        }
+    
+    def restore_state(self, state: Dict, max_age_seconds: float = 3600) -> bool:
+        """Restore state saved with export_state if its newest price is recent enough"""
+        timestamps = state.get('timestamps') or []
+        if not timestamps or time.time() - timestamps[-1] > max_age_seconds:
+            return False
+        
+        self.price_data = [float(p) for p in state['price_data']]
+        self.timestamps = list(timestamps)
+        self.last_signal_time = float(state.get('last_signal_time', 0))
+        if state.get('risk'):
+            self.risk_manager.restore_state(state['risk'])
+        return True
+    
+    def resume_from_journal(self) -> bool:
+        """Warm start from journaled state; False means history must be fetched"""
+        if not self.journal:
+            return False
+        state = self.journal.recovered.get(self.symbol)
+        if state and self.restore_state(state):
+            logger.info(f"Resumed {self.symbol} from journal with {len(self.price_data)} prices")
+            return True
+        return False
+    
     def fetch_historical_data(self) -> bool:
         """Fetch historical candle data for analysis"""
         try:
@@ -339,6 +1088,9 @@ class MovingAverageTradingBot:
             self.price_data = [float(candle['close']) for candle in candles]
             self.timestamps = [candle['time'] for candle in candles]
             
+            if self.journal:
+                self.journal.append({'type': 'full', 'symbol': self.symbol, 'state': self.export_state()})
+            
             logger.info(f"Fetched {len(self.price_data)} candles for analysis")
             return True
             
@@ -349,20 +1101,11 @@ class MovingAverageTradingBot:
     def update_current_price(self) -> Optional[float]:
         """Get current market price"""
         try:
-            ticker = self.api.get_ticker(self.symbol)
+            with self.tracer.span('update_price'):
+                ticker = self.api.get_ticker(self.symbol)
             if ticker and 'close' in ticker:
                 current_price = float(ticker['close'])
-                
-                # Add to price data
-                self.price_data.append(current_price)
-                self.timestamps.append(int(time.time()))
-                
-                # Keep only recent data
-                max_data_points = 200
-                if len(self.price_data) > max_data_points:
-                    self.price_data = self.price_data[-max_data_points:]
-                    self.timestamps = self.timestamps[-max_data_points:]
-                
+                self.add_price(current_price)
                 return current_price
             
         except Exception as e:
@@ -370,48 +1113,128 @@ class MovingAverageTradingBot:
         
         return None
     
+    def add_price(self, current_price: float, timestamp: Optional[int] = None):
+        """Append a price observation to the rolling price buffer"""
+        self.ledger.mark(current_price)
+        self.sync_risk()
+        self.price_data.append(current_price)
+        self.timestamps.append(timestamp if timestamp is not None else int(time.time()))
+        
+        # Keep only recent data
+        max_data_points = 200
+        if len(self.price_data) > max_data_points:
+            self.price_data = self.price_data[-max_data_points:]
+            self.timestamps = self.timestamps[-max_data_points:]
+        
+        if self.journal:
+            self.journal.record_price(self.symbol, current_price, self.timestamps[-1])
+    
+    def strategy_context(self) -> Dict:
+        """Inputs for the strategies beyond the price buffer (none for the standalone bot)"""
+        return {}
+    
     def calculate_signals(self) -> Dict:
-        """Calculate trading signals based on moving averages"""
-        if len(self.price_data) < max(self.long_ma_period, self.ema_long_period):
-            return {'sma_signal': None, 'ema_signal': None}
+        """Evaluate every registered strategy in one pass over shared indicator state"""
+        current_price = self.price_data[-1] if self.price_data else None
+        if not self.price_data or len(self.price_data) < self.strategies.required_history():
+            return {'sma_signal': None, 'ema_signal': None, 'sma_short': None, 'sma_long': None,
+                    'ema_short': None, 'ema_long': None, 'rsi': None, 'votes': {}, 'score': 0.0,
+                    'signal': None, 'vetoed_by': None, 'current_price': current_price}
         
-        # Calculate SMAs
-        sma_short = self.indicators.sma(self.price_data, self.short_ma_period)
-        sma_long = self.indicators.sma(self.price_data, self.long_ma_period)
+        state = IndicatorState(self.price_data)
+        result = self.strategies.evaluate(state, self.strategy_context())
+        votes = result['votes']
         
-        # Calculate EMAs
-        ema_short = self.indicators.ema(self.price_data, self.ema_short_period)
-        ema_long = self.indicators.ema(self.price_data, self.ema_long_period)
+        def side(vote):
+            return 'buy' if vote > 0 else 'sell' if vote < 0 else None
         
-        # Detect crossovers
-        sma_golden, sma_death = self.indicators.detect_crossover(sma_short, sma_long)
-        ema_golden, ema_death = self.indicators.detect_crossover(ema_short, ema_long)
+        def last(values):
+            return values[-1] if values else None
         
+        # Indicator values for status reporting come from the same cache the strategies used
         signals = {
-            'sma_signal': 'buy' if sma_golden else 'sell' if sma_death else None,
-            'ema_signal': 'buy' if ema_golden else 'sell' if ema_death else None,
-            'sma_short': sma_short[-1] if sma_short else None,
-            'sma_long': sma_long[-1] if sma_long else None,
-            'ema_short': ema_short[-1] if ema_short else None,
-            'ema_long': ema_long[-1] if ema_long else None,
-            'current_price': self.price_data[-1]
+            'sma_signal': side(votes.get('sma', 0)),
+            'ema_signal': side(votes.get('ema', 0)),
+            'sma_short': last(state.sma(self.short_ma_period)),
+            'sma_long': last(state.sma(self.long_ma_period)),
+            'ema_short': last(state.ema(self.ema_short_period)),
+            'ema_long': last(state.ema(self.ema_long_period)),
+            'rsi': last(state.rsi(self.rsi_period)) if 'rsi' in votes else None,
+            'current_price': current_price
         }
+        signals.update(result)
         
         return signals
     
+    def select_signal(self, signals: Dict) -> Optional[str]:
+        """Pick the signal to trade on: the weighted vote of all strategies"""
+        return signals.get('signal')
+    
+    def process_tick(self, current_price: float) -> Dict:
+        """Evaluate signals on the current price buffer and trade if warranted"""
+        with self.tracer.span('calculate_signals'):
+            signals = self.calculate_signals()
+        with self.tracer.span('select_signal'):
+            signal = self.select_signal(signals)
+        executed = False
+        
+        if signal:
+            logger.info(f"[{self.symbol}] Trading signal detected: {signal.upper()}")
+            with self.tracer.span('execute_trade'):
+                executed = self.execute_trade(signal, current_price)
+            if executed:
+                logger.info(f"[{self.symbol}] Trade executed successfully: {signal}")
+            else:
+                logger.warning(f"[{self.symbol}] Failed to execute trade: {signal}")
+            
+            # Cooldown and risk counters may have changed
+            if self.journal:
+                self.journal.record_state(self.symbol, self.last_signal_time, self.risk_manager.export_state())
+        
+        return {'signals': signals, 'signal': signal, 'executed': executed}
+    
     def get_current_position(self) -> Optional[Dict]:
-        """Get current position for the trading symbol"""
+        """Get current position for the trading symbol
+        
+        If the exchange cannot be reached the ledger's position is returned
+        unreconciled, so a failed request is never mistaken for being flat.
+        """
         try:
             positions = self.api.get_positions()
+            if positions is None:
+                logger.warning(f"[{self.symbol}] Positions unavailable, using the local ledger")
+                return self.ledger.to_position()
+            current = None
             for position in positions:
                 if position.get('product_symbol') == self.symbol:
                     if float(position.get('size', 0)) != 0:
-                        return position
-            return None
+                        current = position
+                        break
+            
+            self.ledger.reconcile(current)
+            self.last_reconcile = time.monotonic()
+            self.sync_risk()
+            return current
             
         except Exception as e:
             logger.error(f"Error getting current position: {e}")
-            return None
+            return self.ledger.to_position()
+    
+    def get_local_position(self) -> Optional[Dict]:
+        """Position from the local ledger, reconciled with the exchange at most every reconcile_interval"""
+        if time.monotonic() - self.last_reconcile >= self.reconcile_interval:
+            self.get_current_position()
+        return self.ledger.to_position()
+    
+    def record_fill(self, order: Dict, side: str, size: int, fallback_price: float):
+        """Apply our own order's fill to the local ledger and risk counters"""
+        filled = size - int(order.get('unfilled_size', 0) or 0)
+        price = float(order.get('average_fill_price') or fallback_price or 0)
+        fee = float(order.get('paid_commission') or order.get('fee') or 0)
+        if filled > 0 and price:
+            self.ledger.apply_fill(side, filled, price, fee)
+        self.risk_manager.record_trade()
+        self.sync_risk()
     
     def execute_trade(self, signal: str, current_price: float) -> bool:
         """Execute trade based on signal"""
@@ -462,22 +1285,33 @@ class MovingAverageTradingBot:
     def open_long_position(self, current_price: float) -> bool:
         """Open a long position"""
         try:
-            # Calculate position size (assuming account balance of 10000 for demo)
-            position_size = self.risk_manager.calculate_position_size(current_price, 10000)
+            # Calculate position size in contracts
+            position_size = self.risk_manager.calculate_position_size(
+                current_price, self.account_balance, self.get_contract_value())
             
             if position_size <= 0:
                 logger.warning("Position size is 0, skipping trade")
                 return False
             
+            position_size = self.fit_to_book('buy', position_size)
+            if position_size <= 0:
+                logger.warning("Order book too thin within slippage limit, skipping trade")
+                return False
+            
+            if not self.check_portfolio_risk('buy', position_size, current_price):
+                return False
+            
             # Place market buy order
-            order = self.api.place_order(
-                product_symbol=self.symbol,
-                side='buy',
-                size=position_size,
-                order_type='market_order'
-            )
+            with self.tracer.span('place_order'):
+                order = self.api.place_order(
+                    product_symbol=self.symbol,
+                    side='buy',
+                    size=position_size,
+                    order_type='market_order'
+                )
             
             if order:
+                self.record_fill(order, 'buy', position_size, current_price)
                 logger.info(f"Long position opened: {position_size} units at ~{current_price}")
                 self.last_signal_time = time.time()
                 return True
@@ -490,22 +1324,33 @@ class MovingAverageTradingBot:
     def open_short_position(self, current_price: float) -> bool:
         """Open a short position"""
         try:
-            # Calculate position size
-            position_size = self.risk_manager.calculate_position_size(current_price, 10000)
+            # Calculate position size in contracts
+            position_size = self.risk_manager.calculate_position_size(
+                current_price, self.account_balance, self.get_contract_value())
             
             if position_size <= 0:
                 logger.warning("Position size is 0, skipping trade")
                 return False
             
+            position_size = self.fit_to_book('sell', position_size)
+            if position_size <= 0:
+                logger.warning("Order book too thin within slippage limit, skipping trade")
+                return False
+            
+            if not self.check_portfolio_risk('sell', position_size, current_price):
+                return False
+            
             # Place market sell order
-            order = self.api.place_order(
-                product_symbol=self.symbol,
-                side='sell',
-                size=position_size,
-                order_type='market_order'
-            )
+            with self.tracer.span('place_order'):
+                order = self.api.place_order(
+                    product_symbol=self.symbol,
+                    side='sell',
+                    size=position_size,
+                    order_type='market_order'
+                )
             
             if order:
+                self.record_fill(order, 'sell', position_size, current_price)
                 logger.info(f"Short position opened: {position_size} units at ~{current_price}")
                 self.last_signal_time = time.time()
                 return True
@@ -521,14 +1366,16 @@ class MovingAverageTradingBot:
             position_size = abs(int(float(position.get('size', 0))))
             current_side = 'buy' if float(position.get('size', 0)) < 0 else 'sell'
             
-            order = self.api.place_order(
-                product_symbol=self.symbol,
-                side=current_side,
-                size=position_size,
-                order_type='market_order'
-            )
+            with self.tracer.span('place_order'):
+                order = self.api.place_order(
+                    product_symbol=self.symbol,
+                    side=current_side,
+                    size=position_size,
+                    order_type='market_order'
+                )
             
             if order:
+                self.record_fill(order, current_side, position_size, self.ledger.mark_price or position.get('mark_price'))
                 logger.info(f"Position closed: {position_size} units")
                 return True
                 
@@ -539,7 +1386,7 @@ class MovingAverageTradingBot:
     
     def log_status(self, signals: Dict):
         """Log current trading status"""
-        current_position = self.get_current_position()
+        current_position = self.get_local_position()
         position_info = "No position"
         
         if current_position:
@@ -574,33 +1421,16 @@ class MovingAverageTradingBot:
                     time.sleep(30)
                     continue
                 
-                # Calculate signals
-                signals = self.calculate_signals()
+                # Evaluate the strategies and trade through the same path as the engine
+                result = self.process_tick(current_price)
                 
                 # Log current status
-                self.log_status(signals)
+                self.log_status(result['signals'])
+                
+                # Like the original loop, stop after the first executed trade
+                if result['executed']:
+                    break
                 
-                # Check for trading signals
-                primary_signal = signals['sma_signal']  # Use SMA as primary signal
-                secondary_signal=signals['ema_signal']
-                if primary_signal:
-                    logger.info(f"Trading signal detected: {primary_signal.upper()}")
-                    
-                    # Execute trade
-                    if self.execute_trade(primary_signal, current_price):
-                        logger.info(f"Trade executed successfully: {primary_signal}")
-                        break
-                    else:
-                        logger.warning(f"Failed to execute trade: {primary_signal}")
-                elif secondary_signal:
-                    logger.info(f"Trading signal detected: {secondary_signal.upper()}")
-                    
-                    # Execute trade
-                    if self.execute_trade(secondary_signal, current_price):
-                        logger.info(f"Trade executed successfully: {secondary_signal}")
-                        break
-                    else:
-                        logger.warning(f"Failed to execute trade: {secondary_signal}")
                 # Wait before next iteration
                 time.sleep(10)  # Check every minute
                 
@@ -0,0 +1,126 @@
+"""
+Volatility-adaptive polling cadence.
+
+A fixed polling interval wastes API budget when the market is quiet and
+reacts too slowly when it moves. AdaptiveCadence picks each bot's next
+polling/evaluation interval from:
+
+- realized volatility of the recent price buffer (time-normalized, compared
+  with its own slow-moving baseline), and
+- how close the short and long moving averages are to crossing, measured
+  in expected price moves over one base interval,
+
+then clamps the result to the configured [min_interval, max_interval] and
+backs off while the shared RateLimiter's token budget runs low.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class AdaptiveCadence:
+    """Next polling interval for one symbol, with metrics on how it was chosen"""
+
+    def __init__(self, base_interval: float = 10.0, min_interval: float = 2.0, max_interval: float = 60.0,
+                 window: int = 30, rate_limiter=None, enabled: bool = True, baseline_alpha: float = 0.02):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.window = window
+        self.rate_limiter = rate_limiter
+        self.enabled = enabled
+        self.baseline_alpha = baseline_alpha
+
+        self.interval = base_interval
+        self.volatility = 0.0  # std of log returns per sqrt(second)
+        self.baseline_volatility = 0.0
+        self.crossing_distance: Optional[float] = None
+        self.budget_fraction = 1.0
+        self.reason = 'base'
+        self.updates = 0
+        self.interval_sum = 0.0
+
+    def _realized_volatility(self, prices: List[float], timestamps: List[int]) -> float:
+        """Std of log returns scaled to one second, over the last `window` observations"""
+        n = min(len(prices), len(timestamps), self.window + 1)
+        if n < 3:
+            return 0.0
+        p = np.asarray(prices[-n:], dtype=float)
+        dt = np.diff(np.asarray(timestamps[-n:], dtype=float))
+        valid = (dt > 0) & (p[:-1] > 0) & (p[1:] > 0)
+        if valid.sum() < 2:
+            return 0.0
+        returns = np.log(p[1:][valid] / p[:-1][valid]) / np.sqrt(dt[valid])
+        return float(returns.std())
+
+    def update(self, prices: List[float], timestamps: List[int],
+               ma_short: Optional[float] = None, ma_long: Optional[float] = None) -> float:
+        """Recompute the interval from the latest buffer and MA values"""
+        if not self.enabled:
+            self.interval, self.reason = self.base_interval, 'fixed'
+            return self._record(self.interval)
+
+        self.volatility = self._realized_volatility(prices, timestamps)
+        if self.volatility > 0:
+            if self.baseline_volatility == 0:
+                self.baseline_volatility = self.volatility
+            else:
+                self.baseline_volatility += self.baseline_alpha * (self.volatility - self.baseline_volatility)
+
+        interval = self.base_interval
+        self.reason = 'base'
+
+        # Faster in volatile markets, slower in quiet ones (relative to this symbol's norm)
+        if self.volatility > 0 and self.baseline_volatility > 0:
+            vol_ratio = self.volatility / self.baseline_volatility
+            interval /= vol_ratio
+            if vol_ratio > 1.2:
+                self.reason = 'volatile'
+            elif vol_ratio < 0.8:
+                self.reason = 'quiet'
+
+        # Faster when the MAs are within a couple of expected moves of crossing
+        self.crossing_distance = None
+        price = prices[-1] if prices else 0
+        if ma_short is not None and ma_long is not None and price > 0 and self.volatility > 0:
+            expected_move = price * self.volatility * math.sqrt(self.base_interval)
+            self.crossing_distance = float(abs(ma_short - ma_long) / expected_move)
+            if self.crossing_distance < 2:
+                interval = min(interval, self.base_interval * max(self.crossing_distance / 2, 0.0))
+                self.reason = 'near_crossing'
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+
+        # Back off (never faster than base, up to 2x) while the shared request budget is low
+        if self.rate_limiter is not None:
+            self.budget_fraction = self.rate_limiter.available() / self.rate_limiter.burst
+            if self.budget_fraction < 0.25:
+                interval = max(interval, self.base_interval * (1 + (0.25 - self.budget_fraction) * 4))
+                interval = min(interval, self.max_interval)
+                self.reason = 'rate_limited'
+
+        self.interval = interval
+        return self._record(interval)
+
+    def _record(self, interval: float) -> float:
+        self.updates += 1
+        self.interval_sum += interval
+        return interval
+
+    def metrics(self) -> Dict:
+        """Chosen cadence and the inputs behind it"""
+        return {
+            'enabled': self.enabled,
+            'interval': round(self.interval, 3),
+            'average_interval': round(self.interval_sum / self.updates, 3) if self.updates else None,
+            'reason': self.reason,
+            'volatility_1m': self.volatility * math.sqrt(60),
+            'baseline_volatility_1m': self.baseline_volatility * math.sqrt(60),
+            'crossing_distance': self.crossing_distance,
+            'budget_fraction': round(self.budget_fraction, 3),
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+            'base_interval': self.base_interval
+        }
@@ -0,0 +1,98 @@
+"""
+Local store of closed candles.
+
+CandleStore keeps the close history of every symbol and resolution it has
+seen, in memory and in one compressed .npz file per (symbol, resolution)
+on disk, so restarts and scans of hundreds of products do not refetch
+history. refresh() tops a series up incrementally from its last stored
+candle, and matrix() lines the cached series of many symbols up as one 2D
+array for vectorized ranking.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from strategymovingaverage import RESOLUTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class CandleStore:
+    """Close history per (symbol, resolution), cached on disk and refreshed incrementally"""
+
+    def __init__(self, api, directory: str, max_bars: int = 500):
+        self.api = api
+        self.directory = directory
+        self.max_bars = max_bars
+        self.series: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol: str, resolution: str) -> str:
+        return os.path.join(self.directory, f'{symbol}_{resolution}.npz')
+
+    def get(self, symbol: str, resolution: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(times, closes) as stored, loading from disk on first use"""
+        key = (symbol, resolution)
+        if key not in self.series:
+            times, closes = np.empty(0, dtype=np.int64), np.empty(0)
+            path = self._path(symbol, resolution)
+            if os.path.exists(path):
+                try:
+                    with np.load(path) as data:
+                        times, closes = data['times'], data['closes']
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable candle cache {path}: {e}")
+            with self.lock:
+                self.series.setdefault(key, (times, closes))
+        return self.series[key]
+
+    def is_stale(self, symbol: str, resolution: str) -> bool:
+        """True once a newer closed candle than the last stored one should exist"""
+        times, _ = self.get(symbol, resolution)
+        seconds = RESOLUTION_SECONDS.get(resolution, 3600)
+        return len(times) == 0 or int(times[-1]) + 2 * seconds <= time.time()
+
+    def refresh(self, symbol: str, resolution: str, bars: int) -> bool:
+        """Fetch candles newer than the last stored one (or the last `bars`) and persist them"""
+        times, closes = self.get(symbol, resolution)
+        seconds = RESOLUTION_SECONDS.get(resolution, 3600)
+        end = int(time.time())
+        start = int(times[-1]) + 1 if len(times) else end - bars * seconds
+        candles = self.api.get_candles(symbol, resolution, start, end)
+        if not candles:
+            return False
+
+        # Only closed candles are stored; the live bar comes from the ticker
+        new = sorted((int(c['time']), float(c['close'])) for c in candles
+                     if c.get('close') is not None and int(c['time']) + seconds <= end)
+        if not new:
+            return False
+        new_times = np.array([t for t, _ in new], dtype=np.int64)
+        new_closes = np.array([c for _, c in new])
+        keep = new_times > (times[-1] if len(times) else -1)
+        times = np.concatenate([times, new_times[keep]])[-self.max_bars:]
+        closes = np.concatenate([closes, new_closes[keep]])[-self.max_bars:]
+
+        with self.lock:
+            self.series[(symbol, resolution)] = (times, closes)
+        path = self._path(symbol, resolution)
+        temp_path = path + '.tmp.npz'
+        np.savez_compressed(temp_path, times=times, closes=closes)
+        os.replace(temp_path, path)
+        return True
+
+    def matrix(self, symbols: List[str], resolution: str, bars: int) -> np.ndarray:
+        """Last `bars` closes of every symbol as one (symbols x bars) array, NaN-padded on the left"""
+        out = np.full((len(symbols), bars), np.nan)
+        for row, symbol in enumerate(symbols):
+            _, closes = self.get(symbol, resolution)
+            if len(closes):
+                tail = closes[-bars:]
+                out[row, bars - len(tail):] = tail
+        return out
@@ -0,0 +1,61 @@
+"""
+Versioned configuration snapshots for running bots.
+
+The web process publishes every accepted configuration change as a new
+immutable ConfigSnapshot. Publishing swaps a single reference and posts a
+CONFIG event to every subscribed trading loop, so a loop picks up the
+whole snapshot between ticks and never sees a half-applied update.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping
+
+from trading_engine.events import CONFIG, TradingEvents
+
+
+class ConfigSnapshot:
+    """One immutable, numbered version of the trading configuration"""
+
+    __slots__ = ('version', 'values', 'created_at')
+
+    def __init__(self, version: int, values: Mapping):
+        self.version = version
+        self.values = MappingProxyType(dict(values))
+        self.created_at = time.time()
+
+
+class ConfigStore:
+    """Holds the current snapshot and notifies trading loops of new versions"""
+
+    def __init__(self, initial: Mapping):
+        self.lock = threading.Lock()
+        self.snapshot = ConfigSnapshot(1, initial)
+        self.subscribers: List[TradingEvents] = []
+
+    def current(self) -> ConfigSnapshot:
+        return self.snapshot
+
+    def publish(self, values: Mapping) -> ConfigSnapshot:
+        """Make `values` the current configuration and wake subscribed loops"""
+        with self.lock:
+            self.snapshot = ConfigSnapshot(self.snapshot.version + 1, values)
+            snapshot = self.snapshot
+            subscribers = list(self.subscribers)
+        for events in subscribers:
+            events.post(CONFIG, {'version': snapshot.version})
+        return snapshot
+
+    def subscribe(self, events: TradingEvents):
+        with self.lock:
+            if events not in self.subscribers:
+                self.subscribers.append(events)
+
+    def unsubscribe(self, events: TradingEvents):
+        with self.lock:
+            if events in self.subscribers:
+                self.subscribers.remove(events)
+
+    def status(self) -> Dict:
+        return {'version': self.snapshot.version, 'created_at': self.snapshot.created_at}
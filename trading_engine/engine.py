@@ -0,0 +1,262 @@
+"""
+Multi-symbol trading engine.
+
+One TradingEngine hosts the strategies of many symbols in a single process.
+All symbols share one DeltaExchangeAPI client (and its RateLimiter) and one
+MarketDataHub that fetches every ticker in a single bulk call, while each
+symbol keeps its own MovingAverageTradingBot state (price buffer, cooldowns,
+risk counters). Orders from every symbol are checked against one shared
+PortfolioRiskEngine. Symbols are scheduled cooperatively on one engine thread by
+their next monotonic deadline, and the thread wakes early for pushed ticks,
+news updates and stop requests. Each symbol's deadline comes from its own
+AdaptiveCadence, so volatile symbols and those near an MA crossing are polled
+more often than quiet ones, within the shared rate limiter's budget.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from strategymovingaverage import DeltaExchangeAPI, MovingAverageTradingBot, latency_tracer
+from trading_engine.cadence import AdaptiveCadence
+from trading_engine.config_store import ConfigStore
+from trading_engine.events import CONFIG, NEWS, STOP, TICK, TradingEvents
+from trading_engine.market_data import MarketDataHub
+from trading_engine.portfolio_risk import PortfolioRiskEngine
+
+logger = logging.getLogger(__name__)
+
+
+class TradingEngine:
+    """Run many symbols' strategies in one process over shared exchange resources"""
+
+    def __init__(self, api: DeltaExchangeAPI, symbols: List[str],
+                 bot_factory: Optional[Callable[[str, DeltaExchangeAPI], MovingAverageTradingBot]] = None,
+                 interval: float = 10.0, position_refresh_interval: float = 30.0,
+                 status_callback: Optional[Callable[[Dict], None]] = None,
+                 trade_callback: Optional[Callable[[Dict], None]] = None,
+                 risk_engine: Optional[PortfolioRiskEngine] = None,
+                 config_store: Optional[ConfigStore] = None):
+        self.api = api
+        self.risk_engine = risk_engine or PortfolioRiskEngine()
+        self.market_data = MarketDataHub(api, max_age=min(1.0, interval / 2))
+        self.interval = interval
+        self.position_refresh_interval = position_refresh_interval
+        self.status_callback = status_callback
+        self.trade_callback = trade_callback
+
+        bot_factory = bot_factory or (lambda symbol, shared_api: MovingAverageTradingBot(
+            shared_api.api_key, shared_api.api_secret, symbol, api=shared_api))
+        self.bots: Dict[str, MovingAverageTradingBot] = {symbol: bot_factory(symbol, api) for symbol in symbols}
+        self.status: Dict[str, Dict] = {symbol: {'symbol': symbol, 'state': 'idle'} for symbol in symbols}
+        self.cadences: Dict[str, AdaptiveCadence] = {
+            symbol: AdaptiveCadence(base_interval=interval, rate_limiter=getattr(api, 'rate_limiter', None))
+            for symbol in symbols
+        }
+        self.positions: Dict[str, Dict] = {}
+        self.last_position_refresh = 0.0
+
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.events = TradingEvents()
+
+        self.config_store = config_store
+        if config_store:
+            config_store.subscribe(self.events)
+
+    def start(self):
+        """Start the engine loop on its own thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop the engine loop immediately (it is woken if waiting)"""
+        self.running = False
+        self.events.stop()
+
+    def push_tick(self, symbol: str, price: float):
+        """Hand a new price to the engine for immediate evaluation"""
+        self.events.post(TICK, {'symbol': symbol, 'price': price})
+
+    def notify_news(self):
+        """Re-evaluate every symbol with the bots' updated news recommendation"""
+        self.events.post(NEWS)
+
+    def _apply_config(self):
+        """Apply the current config snapshot to every bot (between steps)"""
+        snapshot = self.config_store.current()
+        self.interval = snapshot.values.get('trading_interval', self.interval)
+        for cadence in self.cadences.values():
+            cadence.base_interval = self.interval
+            cadence.min_interval = snapshot.values.get('min_trading_interval', cadence.min_interval)
+            cadence.max_interval = snapshot.values.get('max_trading_interval', cadence.max_interval)
+            cadence.enabled = snapshot.values.get('enable_adaptive_cadence', cadence.enabled)
+        # Ticker snapshots must stay fresher than the fastest cadence a symbol can pick
+        self.market_data.max_age = min(1.0, min((c.min_interval for c in self.cadences.values()), default=self.interval) / 2)
+        for bot in self.bots.values():
+            if bot.config_version != snapshot.version:
+                bot.apply_config(snapshot.values, snapshot.version)
+
+    def _warm_up(self) -> List[str]:
+        """Resume journaled state or fetch history for every symbol; symbols without data are left out"""
+        ready = []
+        if self.config_store:
+            self._apply_config()
+        for symbol, bot in self.bots.items():
+            if not self.running:
+                break
+            bot.attach_risk_engine(self.risk_engine)
+            if bot.resume_from_journal() or bot.fetch_historical_data():
+                ready.append(symbol)
+                self._set_status(symbol, state='running')
+            else:
+                logger.error(f"[{symbol}] Failed to fetch historical data, symbol disabled")
+                self._set_status(symbol, state='error', error='Failed to fetch historical data')
+        return ready
+
+    def _refresh_positions(self):
+        """One positions call reconciles every hosted symbol's local ledger"""
+        if time.monotonic() - self.last_position_refresh < self.position_refresh_interval:
+            return
+        positions = self.api.get_positions()
+        if positions is None:
+            # A failed request says nothing about the positions; keep the ledgers until the next refresh
+            self.last_position_refresh = time.monotonic()
+            logger.warning("Positions unavailable, ledgers not reconciled this cycle")
+            return
+        self.positions = {
+            p.get('product_symbol'): p for p in positions
+            if p.get('product_symbol') in self.bots and float(p.get('size', 0) or 0) != 0
+        }
+        self.last_position_refresh = time.monotonic()
+        for symbol, bot in self.bots.items():
+            bot.ledger.reconcile(self.positions.get(symbol))
+            bot.last_reconcile = self.last_position_refresh
+            bot.sync_risk()
+
+    def step(self, symbol: str, price: Optional[float] = None, new_price: bool = True):
+        """Evaluate one symbol against a pushed price or the current market snapshot"""
+        bot = self.bots[symbol]
+        if price is None:
+            price = self.market_data.get_price(symbol)
+        if price is None:
+            self._set_status(symbol, state='stale', error='No ticker for symbol')
+            return
+
+        with bot.tracer.span('tick', root=True):
+            if new_price:
+                bot.add_price(price)
+            result = bot.process_tick(price)
+        signals = result['signals']
+        cadence = self.cadences[symbol]
+        cadence.update(bot.price_data, bot.timestamps, signals.get('sma_short'), signals.get('sma_long'))
+        if result['executed']:
+            if self.trade_callback:
+                self.trade_callback({
+                    'symbol': symbol,
+                    'signal': result['signal'],
+                    'price': price,
+                    'timestamp': datetime.now().isoformat()
+                })
+
+        # Position and PnL come from the fill-driven ledger, marked on every price
+        self._set_status(
+            symbol,
+            state='running',
+            error=None,
+            current_price=price,
+            position=bot.ledger.snapshot(),
+            signals={key: signals.get(key) for key in
+                     ('sma_signal', 'ema_signal', 'sma_short', 'sma_long', 'ema_short', 'ema_long',
+                      'rsi', 'votes', 'score', 'signal')},
+            last_signal=result['signal'],
+            trades_today=bot.risk_manager.trades_today,
+            cadence=cadence.metrics(),
+            last_update=datetime.now().isoformat()
+        )
+
+    def run(self):
+        """Cooperative scheduler: run each due symbol's step, then sleep to the next deadline"""
+        logger.info(f"Starting trading engine for {len(self.bots)} symbols")
+        try:
+            ready = self._warm_up()
+            now = time.monotonic()
+            schedule = [(now, symbol) for symbol in ready]
+            heapq.heapify(schedule)
+
+            while self.running and schedule:
+                # Sleep until an event arrives or the earliest symbol deadline
+                events = self.events.wait(schedule[0][0])
+                if any(kind == STOP for kind, _ in events) or not self.running:
+                    break
+
+                for kind, payload in events:
+                    if kind == TICK and payload.get('symbol') in ready:
+                        self._safe_step(payload['symbol'], float(payload['price']))
+                    elif kind in (NEWS, CONFIG):
+                        if kind == CONFIG and self.config_store:
+                            self._apply_config()
+                        # Re-evaluate every symbol on its latest price with the new sentiment or settings
+                        for symbol in ready:
+                            if self.bots[symbol].price_data:
+                                self._safe_step(symbol, self.bots[symbol].price_data[-1], new_price=False)
+
+                # Every symbol due now shares one tickers call and one positions call
+                due = []
+                while schedule and schedule[0][0] <= time.monotonic():
+                    due.append(heapq.heappop(schedule)[1])
+                if due:
+                    with latency_tracer.span('refresh_tickers', root=True):
+                        self.market_data.refresh_all()
+                    self._refresh_positions()
+
+                for symbol in due:
+                    if not self.running:
+                        break
+                    self._safe_step(symbol)
+                    heapq.heappush(schedule, (time.monotonic() + self.cadences[symbol].interval, symbol))
+
+                if events or due:
+                    if self.status_callback:
+                        self.status_callback(self.get_status())
+
+        except Exception as e:
+            logger.error(f"Error in trading engine: {e}")
+        finally:
+            self.running = False
+            if self.config_store:
+                self.config_store.unsubscribe(self.events)
+            for symbol in self.bots:
+                self._set_status(symbol, state='stopped')
+            logger.info("Trading engine stopped")
+
+    def _safe_step(self, symbol: str, price: Optional[float] = None, new_price: bool = True):
+        """Run one symbol's step without letting its errors stop the other symbols"""
+        try:
+            self.step(symbol, price, new_price)
+        except Exception as e:
+            logger.error(f"[{symbol}] Error in engine step: {e}")
+            self._set_status(symbol, state='error', error=str(e))
+
+    def _set_status(self, symbol: str, **fields):
+        with self.lock:
+            self.status[symbol].update(fields)
+
+    def get_status(self) -> Dict:
+        """Per-symbol status snapshot"""
+        with self.lock:
+            status = {
+                'running': self.running,
+                'symbols': {symbol: dict(status) for symbol, status in self.status.items()}
+            }
+        status['risk'] = self.risk_engine.status()
+        status['market_data'] = self.market_data.status()['stats']
+        return status
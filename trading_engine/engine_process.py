@@ -0,0 +1,189 @@
+"""
+Trading host in a separate process.
+
+The web server (Flask/Socket.IO, the news worker and its feed parsing) and
+the trading loops used to share one interpreter, so dashboard load and news
+scoring competed with order timing for the GIL. EngineProcess starts a
+TradingHost in a child process and talks to it over two multiprocessing
+queues:
+
+- commands (web -> engine): (request_id, command, payload) tuples, answered
+  with a reply message; request_id None means fire-and-forget (news).
+- messages (engine -> web): ('reply', request_id, reply) for commands and
+  ('event', name, data) for status updates, trades and errors, which the web
+  process relays to Socket.IO clients.
+
+If the child dies it is restarted on the next command. The current config
+is re-sent first, and the state journal lets the bots resume without
+refetching history. InlineEngine offers the same interface with the host
+in-process, for single-process deployments and debugging.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from typing import Callable, Dict, Optional
+
+from trading_engine.host import TradingHost
+
+logger = logging.getLogger(__name__)
+
+
+def run_host(commands, messages, config: Dict, journal_dir: str, tracing_enabled: bool,
+             candle_dir: Optional[str] = None):
+    """Child process entry point: serve commands until None arrives"""
+    host = TradingHost(config, emit=lambda event, data: messages.put(('event', event, data)),
+                       journal_dir=journal_dir, tracing_enabled=tracing_enabled, candle_dir=candle_dir)
+    logger.info("Trading host process started")
+    try:
+        while True:
+            message = commands.get()
+            if message is None:
+                break
+            request_id, command, payload = message
+            try:
+                reply = host.handle(command, payload)
+            except Exception as e:
+                logger.error(f"Error handling engine command {command}: {e}")
+                reply = {'success': False, 'message': f'Error in {command}: {str(e)}'}
+            if request_id is not None:
+                messages.put(('reply', request_id, reply))
+    finally:
+        host.shutdown()
+        logger.info("Trading host process stopped")
+
+
+class EngineProcess:
+    """Web-side handle to a TradingHost running in its own process"""
+
+    def __init__(self, config_provider: Callable[[], Dict], emit: Callable[[str, Dict], None],
+                 journal_dir: str, tracing_enabled: bool = True, request_timeout: float = 10.0,
+                 candle_dir: Optional[str] = None):
+        self.config_provider = config_provider
+        self.emit = emit
+        self.journal_dir = journal_dir
+        self.tracing_enabled = tracing_enabled
+        self.candle_dir = candle_dir
+        self.request_timeout = request_timeout
+
+        # spawn: the child starts clean instead of inheriting the web server's threads
+        self.context = multiprocessing.get_context('spawn')
+        self.process = None
+        self.commands = None
+        self.messages = None
+        self.reader = None
+        self.lock = threading.Lock()
+        self.request_ids = itertools.count(1)
+        self.pending: Dict[int, list] = {}
+        self.stopped = False
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Start (or restart) the trading process"""
+        with self.lock:
+            if self.is_alive():
+                return
+            self.commands = self.context.Queue()
+            self.messages = self.context.Queue()
+            self.process = self.context.Process(
+                target=run_host,
+                args=(self.commands, self.messages, dict(self.config_provider()),
+                      self.journal_dir, self.tracing_enabled, self.candle_dir),
+                name='trading-engine',
+                daemon=True
+            )
+            self.process.start()
+            self.reader = threading.Thread(target=self._read_messages, args=(self.messages, self.process),
+                                           daemon=True)
+            self.reader.start()
+            logger.info(f"Trading engine process started (pid {self.process.pid})")
+
+    def _read_messages(self, messages, process):
+        """Dispatch replies to waiting requests and relay events (web process thread)"""
+        while True:
+            try:
+                kind, key, data = messages.get(timeout=1.0)
+            except queue.Empty:
+                if not process.is_alive():
+                    break
+                continue
+            except (EOFError, OSError):
+                break
+
+            if kind == 'reply':
+                waiter = self.pending.pop(key, None)
+                if waiter:
+                    waiter[1] = data
+                    waiter[0].set()
+            else:
+                try:
+                    self.emit(key, data)
+                except Exception as e:
+                    logger.error(f"Error relaying engine event {key}: {e}")
+
+        # Fail any requests still waiting on the dead process
+        for request_id, waiter in list(self.pending.items()):
+            if waiter[1] is None:
+                waiter[1] = {'success': False, 'message': 'Trading engine process exited'}
+                waiter[0].set()
+
+    def request(self, command: str, payload: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        """Send a command and wait for its reply"""
+        self.start()
+        request_id = next(self.request_ids)
+        waiter = [threading.Event(), None]
+        self.pending[request_id] = waiter
+        self.commands.put((request_id, command, payload or {}))
+        if not waiter[0].wait(timeout or self.request_timeout):
+            self.pending.pop(request_id, None)
+            return {'success': False, 'message': f'Trading engine did not answer {command} in time'}
+        return waiter[1]
+
+    def send(self, command: str, payload: Optional[Dict] = None):
+        """Send a command without waiting for a reply, restarting the process if it died"""
+        if not self.is_alive():
+            if self.stopped:
+                logger.warning(f"Trading engine process stopped, dropping {command}")
+                return
+            if self.process is not None:
+                logger.error(f"Trading engine process exited (code {self.process.exitcode}), "
+                             f"restarting it to deliver {command}")
+            self.start()
+        self.commands.put((None, command, payload or {}))
+
+    def stop(self, timeout: float = 10.0):
+        """Ask the trading process to shut down cleanly"""
+        self.stopped = True
+        if self.is_alive():
+            self.commands.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+class InlineEngine:
+    """Same interface as EngineProcess with the TradingHost in this process"""
+
+    def __init__(self, config_provider: Callable[[], Dict], emit: Callable[[str, Dict], None],
+                 journal_dir: str, tracing_enabled: bool = True, candle_dir: Optional[str] = None):
+        self.host = TradingHost(dict(config_provider()), emit=emit, journal_dir=journal_dir,
+                                tracing_enabled=tracing_enabled, candle_dir=candle_dir)
+
+    def is_alive(self) -> bool:
+        return True
+
+    def start(self):
+        pass
+
+    def request(self, command: str, payload: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        return self.host.handle(command, payload)
+
+    def send(self, command: str, payload: Optional[Dict] = None):
+        self.host.handle(command, payload)
+
+    def stop(self, timeout: float = 10.0):
+        self.host.shutdown()
@@ -0,0 +1,63 @@
+"""
+Wake-up events for trading loops.
+
+Trading loops block on TradingEvents.wait() instead of sleeping for a fixed
+time. A loop wakes as soon as something is posted (a new tick, a bar close,
+a news update, a stop request) or when its next monotonic deadline for
+periodic work arrives, whichever comes first.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+TICK = 'tick'
+BAR_CLOSE = 'bar_close'
+NEWS = 'news'
+CONFIG = 'config'
+STOP = 'stop'
+
+
+class TradingEvents:
+    """Thread-safe event queue with deadline-aware waiting"""
+
+    def __init__(self, max_pending: int = 10000):
+        self.condition = threading.Condition()
+        self.pending = deque(maxlen=max_pending)
+        self.stopped = False
+
+    def post(self, kind: str, payload: Optional[Dict[str, Any]] = None):
+        """Queue an event and wake the waiting loop"""
+        with self.condition:
+            if kind == STOP:
+                self.stopped = True
+            self.pending.append((kind, payload or {}))
+            self.condition.notify_all()
+
+    def stop(self):
+        """Request an immediate stop"""
+        self.post(STOP)
+
+    def wait(self, deadline: Optional[float] = None) -> List[tuple]:
+        """Block until events are pending or the monotonic `deadline` passes
+
+        Returns and clears all pending events (an empty list means the
+        deadline was reached).
+        """
+        with self.condition:
+            while not self.pending:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                self.condition.wait(timeout)
+            events = list(self.pending)
+            self.pending.clear()
+            return events
+
+
+def next_bar_close(resolution_seconds: int) -> float:
+    """Monotonic time of the next wall-clock bar boundary for a candle resolution"""
+    now = time.time()
+    boundary = (now // resolution_seconds + 1) * resolution_seconds
+    return time.monotonic() + (boundary - now)
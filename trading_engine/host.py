@@ -0,0 +1,385 @@
+"""
+Trading host: every live trading component of one process.
+
+TradingHost owns the single-symbol bot, the multi-symbol engine, their
+market-data hubs and order books, the universe scanner, the shared portfolio
+risk engine,
+the config snapshots and the state journal, and is
+driven entirely through handle(command, payload). Replies are plain
+JSON-serializable dicts and outbound notifications go through an
+`emit(event, data)` callback, so the host can live in the web process or
+behind the IPC channel of trading_engine.engine_process unchanged.
+"""
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from strategymovingaverage import DeltaExchangeAPI, RateLimiter, latency_tracer
+from trading_engine.candle_store import CandleStore
+from trading_engine.config_store import ConfigStore
+from trading_engine.engine import TradingEngine
+from trading_engine.live_bot import LiveTradingBot
+from trading_engine.market_data import MarketDataHub, MarketSnapshot
+from trading_engine.order_book import L2OrderBook, OrderBookStream
+from trading_engine.paper_exchange import PaperExchangeAPI
+from trading_engine.portfolio_risk import PortfolioRiskEngine
+from trading_engine.scanner import UniverseScanner
+from trading_engine.state_journal import StateJournal
+
+logger = logging.getLogger(__name__)
+
+CREDENTIALS_MISSING = 'API credentials not configured. Please set API key and secret in configuration.'
+
+
+class TradingHost:
+    """Runs bots and the engine, and answers dashboard commands about them"""
+
+    def __init__(self, config: Dict, emit: Callable[[str, Dict], None], journal_dir: str,
+                 tracing_enabled: bool = True, candle_dir: Optional[str] = None):
+        self.emit = emit
+        self.journal_dir = journal_dir
+        self.journal = None
+        self.candle_dir = candle_dir or os.path.join(journal_dir, 'candles')
+        self.scanner: Optional[UniverseScanner] = None
+        self.order_book_streams: Dict[str, OrderBookStream] = {}
+        self.config_store = ConfigStore(config)
+        # Exposure and daily loss limits shared by the single bot and every engine symbol
+        self.portfolio_risk = PortfolioRiskEngine()
+        self.bot: Optional[LiveTradingBot] = None
+        self.bot_thread = None
+        self.market_data: Optional[MarketDataHub] = None
+        self.engine: Optional[TradingEngine] = None
+        self.news_recommendation: Dict = {}
+        latency_tracer.enabled = tracing_enabled
+
+    def handle(self, command: str, payload: Optional[Dict] = None) -> Dict:
+        """Run one command and return its reply"""
+        handler = getattr(self, f'cmd_{command}', None)
+        if handler is None:
+            return {'success': False, 'message': f'Unknown command: {command}'}
+        return handler(**(payload or {}))
+
+    @property
+    def bot_running(self) -> bool:
+        return bool(self.bot and self.bot.running)
+
+    @property
+    def engine_running(self) -> bool:
+        return bool(self.engine and self.engine.running)
+
+    def get_journal(self) -> StateJournal:
+        """Open the bot state journal on first use"""
+        if self.journal is None:
+            self.journal = StateJournal(self.journal_dir)
+        return self.journal
+
+    def _credentials(self):
+        config = self.config_store.current().values
+        return config.get('api_key', '').strip(), config.get('api_secret', '').strip()
+
+    def _market_api(self, api_key: str, api_secret: str, **kwargs) -> DeltaExchangeAPI:
+        """Exchange client, wrapped in the fill simulator when paper trading is enabled"""
+        api = DeltaExchangeAPI(api_key, api_secret, **kwargs)
+        if self.config_store.current().values.get('enable_paper_trading'):
+            logger.info("Paper trading enabled - orders will be simulated locally")
+            return PaperExchangeAPI(api)
+        return api
+
+    def _publish_market_data(self, snapshot: MarketSnapshot):
+        self.emit('market_data', snapshot.to_dict())
+
+    def _start_order_books(self, owner: str, api, bots: Dict[str, LiveTradingBot]):
+        """Stream L2 books for `bots` (when enabled) and let them size market orders against depth"""
+        previous = self.order_book_streams.pop(owner, None)
+        if previous:
+            previous.stop()
+        if not self.config_store.current().values.get('enable_order_book'):
+            return
+        books = {symbol: L2OrderBook(symbol) for symbol in bots}
+        for symbol, bot in bots.items():
+            bot.order_book = books[symbol]
+        stream = OrderBookStream(api, books)
+        stream.start()
+        self.order_book_streams[owner] = stream
+
+    def _stop_order_books(self, owner: str):
+        stream = self.order_book_streams.pop(owner, None)
+        if stream:
+            stream.stop()
+
+    def _create_bot(self, api_key: str, api_secret: str, symbol: str, api) -> LiveTradingBot:
+        bot = LiveTradingBot(api_key, api_secret, symbol, api=api, emit=self.emit)
+        bot.news_recommendation = self.news_recommendation
+        bot.attach_journal(self.get_journal())
+        return bot
+
+    # Configuration
+
+    def cmd_config(self, values: Dict) -> Dict:
+        """Publish a new config snapshot to the running bots"""
+        snapshot = self.config_store.publish(values)
+        return {'success': True, 'version': snapshot.version,
+                'running': self.bot_running or self.engine_running}
+
+    def cmd_config_version(self) -> Dict:
+        applied = {}
+        if self.bot_running:
+            applied[self.bot.symbol] = self.bot.config_version
+        if self.engine_running:
+            applied.update({symbol: bot.config_version for symbol, bot in self.engine.bots.items()})
+        return {'success': True, 'current': self.config_store.status(), 'applied': applied}
+
+    # Single-symbol bot
+
+    def cmd_start_bot(self) -> Dict:
+        if self.bot_running:
+            return {'success': False, 'message': 'Bot is already running'}
+
+        api_key, api_secret = self._credentials()
+        if not api_key or not api_secret:
+            return {'success': False, 'message': CREDENTIALS_MISSING}
+
+        symbol = self.config_store.current().values.get('trading_symbol', 'BTCUSD')
+        try:
+            logger.info(f"Starting bot with Symbol: {symbol}")
+            api = self._market_api(api_key, api_secret, symbol=symbol, rate_limiter=RateLimiter())
+            bot = self._create_bot(api_key, api_secret, symbol, api)
+            # The bot, the dashboard and manual trades all read prices from one hub
+            self.market_data = MarketDataHub(api)
+            self.market_data.subscribe(self._publish_market_data, symbol)
+            bot.attach_market_data(self.market_data)
+            bot.attach_risk_engine(self.portfolio_risk)
+            bot.attach_config_store(self.config_store)
+            self._start_order_books('bot', api, {symbol: bot})
+            bot.running = True
+            self.bot = bot
+
+            self.bot_thread = threading.Thread(target=bot.run)
+            self.bot_thread.daemon = True
+            self.bot_thread.start()
+        except Exception as e:
+            logger.error(f"Failed to create trading bot: {e}")
+            return {'success': False, 'message': f'Failed to create bot: {str(e)}'}
+
+        logger.info(f"Trading bot started successfully for {symbol}")
+        return {'success': True, 'message': 'Bot started successfully'}
+
+    def cmd_stop_bot(self) -> Dict:
+        if not self.bot_running:
+            return {'success': False, 'message': 'Bot is not running'}
+        self.bot.stop()
+        self._stop_order_books('bot')
+        return {'success': True, 'message': 'Bot stopped successfully'}
+
+    def cmd_status(self) -> Dict:
+        if not self.bot:
+            return {'success': True, 'status': None}
+        return {'success': True, 'status': dict(self.bot.status, running=self.bot_running)}
+
+    def cmd_manual_trade(self, side: str) -> Dict:
+        if not self.bot:
+            return {'success': False, 'message': 'Bot not initialized'}
+
+        # A fresh snapshot from the hub; the bot loop takes it as a tick, this thread never touches price_data
+        snapshot = self.market_data.get(self.bot.symbol)
+        if snapshot is None:
+            return {'success': False, 'message': 'Could not get current price'}
+        current_price = snapshot.price
+
+        if side == 'buy':
+            success = self.bot.open_long_position(current_price)
+        else:
+            success = self.bot.open_short_position(current_price)
+
+        if success:
+            return {'success': True, 'message': f'{side.capitalize()} order executed'}
+        return {'success': False, 'message': 'Failed to execute order'}
+
+    def cmd_close_position(self) -> Dict:
+        if not self.bot:
+            return {'success': False, 'message': 'Bot not initialized'}
+
+        position = self.bot.get_current_position()
+        if not position:
+            return {'success': False, 'message': 'No position to close'}
+
+        if self.bot.close_position(position):
+            return {'success': True, 'message': 'Position closed successfully'}
+        return {'success': False, 'message': 'Failed to close position'}
+
+    def cmd_positions(self) -> Dict:
+        if not self.bot:
+            return {'success': False, 'message': 'Bot not initialized'}
+        positions = self.bot.api.get_positions()
+        if positions is None:
+            return {'success': False, 'message': 'Failed to get positions'}
+        return {'success': True, 'positions': positions}
+
+    def cmd_orders(self) -> Dict:
+        if not self.bot:
+            return {'success': False, 'message': 'Bot not initialized'}
+        return {'success': True, 'orders': self.bot.api.get_orders()}
+
+    # Multi-symbol engine
+
+    def cmd_start_engine(self, symbols: Optional[List[str]] = None, top: Optional[int] = None) -> Dict:
+        """Start the engine for `symbols`, or for the scanner's `top` ranked products"""
+        if self.engine_running:
+            return {'success': False, 'message': 'Engine is already running'}
+
+        api_key, api_secret = self._credentials()
+        if not api_key or not api_secret:
+            return {'success': False, 'message': CREDENTIALS_MISSING}
+
+        if top:
+            if not self.scanner or not self.scanner.rankings:
+                return {'success': False, 'message': 'No scanner rankings yet; start the scanner first'}
+            symbols = self.scanner.top(int(top))
+        if not symbols:
+            return {'success': False, 'message': 'Please provide a list of symbols'}
+
+        # One client and one rate limiter shared by every hosted symbol
+        shared_api = self._market_api(api_key, api_secret, rate_limiter=RateLimiter())
+        self.engine = TradingEngine(
+            shared_api,
+            symbols,
+            bot_factory=lambda symbol, api: self._create_bot(api_key, api_secret, symbol, api),
+            interval=self.config_store.current().values.get('trading_interval', 10),
+            status_callback=lambda status: self.emit('engine_status', status),
+            trade_callback=lambda trade: self.emit('trade_executed', trade),
+            risk_engine=self.portfolio_risk,
+            config_store=self.config_store
+        )
+        # Only hosted symbols: a bulk ticker refresh (e.g. the scanner's) covers every listed product
+        for symbol in self.engine.bots:
+            self.engine.market_data.subscribe(self._publish_market_data, symbol)
+        self._start_order_books('engine', shared_api, self.engine.bots)
+        self.engine.start()
+
+        logger.info(f"Trading engine started for {', '.join(symbols)}")
+        return {'success': True, 'message': f'Engine started for {len(symbols)} symbols', 'symbols': symbols}
+
+    def cmd_stop_engine(self) -> Dict:
+        if not self.engine_running:
+            return {'success': False, 'message': 'Engine is not running'}
+        self.engine.stop()
+        self._stop_order_books('engine')
+        return {'success': True, 'message': 'Engine stopped successfully'}
+
+    def cmd_engine_status(self) -> Dict:
+        if not self.engine:
+            return {'success': True, 'status': {'running': False, 'symbols': {}}}
+        return {'success': True, 'status': self.engine.get_status()}
+
+    # Universe scanner
+
+    def cmd_start_scanner(self) -> Dict:
+        if self.scanner and self.scanner.running:
+            return {'success': False, 'message': 'Scanner is already running'}
+
+        # Public market data only: its own client and rate limiter, never paper-wrapped
+        config = self.config_store.current().values
+        api_key, api_secret = self._credentials()
+        api = DeltaExchangeAPI(api_key, api_secret, rate_limiter=RateLimiter())
+        self.scanner = UniverseScanner(
+            MarketDataHub(api),
+            CandleStore(api, self.candle_dir),
+            short_period=int(config.get('sma_short_period', 9)),
+            long_period=int(config.get('sma_long_period', 21)),
+            status_callback=lambda status: self.emit('scanner_update', status)
+        )
+        self.scanner.start()
+        return {'success': True, 'message': 'Scanner started'}
+
+    def cmd_stop_scanner(self) -> Dict:
+        if not self.scanner or not self.scanner.running:
+            return {'success': False, 'message': 'Scanner is not running'}
+        self.scanner.stop()
+        return {'success': True, 'message': 'Scanner stopped'}
+
+    def cmd_scanner(self, limit: int = 50) -> Dict:
+        if not self.scanner:
+            return {'success': True, 'scanner': {'running': False, 'rankings': []}}
+        return {'success': True, 'scanner': self.scanner.status(limit=int(limit))}
+
+    # News, risk, market data, order books, cadence, paper trading and latency
+
+    def cmd_news(self, recommendation: Optional[Dict]) -> Dict:
+        """New news recommendation: every running loop re-evaluates with it"""
+        self.news_recommendation = recommendation or {}
+        if self.bot_running:
+            self.bot.set_news(self.news_recommendation)
+        if self.engine_running:
+            for bot in self.engine.bots.values():
+                bot.news_recommendation = self.news_recommendation
+            self.engine.notify_news()
+        return {'success': True}
+
+    def cmd_risk(self) -> Dict:
+        return {'success': True, 'risk': self.portfolio_risk.status()}
+
+    def cmd_market_data(self) -> Dict:
+        """Latest snapshot per symbol and fetch statistics of each hub"""
+        hubs = {}
+        if self.market_data:
+            hubs['bot'] = self.market_data.status()
+        if self.engine:
+            hubs['engine'] = self.engine.market_data.status()
+        return {'success': True, 'market_data': hubs}
+
+    def cmd_order_book(self, symbol: Optional[str] = None, levels: int = 10) -> Dict:
+        """Top levels, spread and depth of a streamed book (the single bot's symbol by default)"""
+        symbol = symbol or (self.bot.symbol if self.bot else None)
+        for stream in self.order_book_streams.values():
+            if symbol in stream.books:
+                return {'success': True, 'order_book': stream.books[symbol].snapshot(int(levels)),
+                        'stream': stream.status()}
+        return {'success': False, 'message': f'No order book for {symbol}; enable_order_book must be on and the bot or engine running'}
+
+    def cmd_cadence(self) -> Dict:
+        """Polling interval each running loop has chosen, and why"""
+        cadence = {}
+        if self.bot:
+            cadence[self.bot.symbol] = self.bot.cadence.metrics()
+        if self.engine:
+            cadence.update({symbol: c.metrics() for symbol, c in self.engine.cadences.items()})
+        return {'success': True, 'cadence': cadence}
+
+    def cmd_paper_summary(self) -> Dict:
+        apis = [bot_api for bot_api in (self.bot.api if self.bot else None,
+                                        self.engine.api if self.engine else None)
+                if isinstance(bot_api, PaperExchangeAPI)]
+        if not apis:
+            return {'success': False, 'message': 'Paper trading is not active'}
+        return {'success': True, 'summary': apis[0].get_account_summary(),
+                'positions': apis[0].get_positions()}
+
+    def cmd_latency(self) -> Dict:
+        return {'success': True, 'enabled': latency_tracer.enabled, 'stages': latency_tracer.summary()}
+
+    def cmd_latency_export(self, path: str) -> Dict:
+        spans = latency_tracer.export(path)
+        return {'success': True, 'path': path, 'spans': spans}
+
+    def cmd_latency_reset(self) -> Dict:
+        latency_tracer.reset()
+        return {'success': True, 'message': 'Latency spans cleared'}
+
+    def shutdown(self):
+        """Stop everything and snapshot the journal"""
+        if self.bot_running:
+            self.bot.stop()
+        if self.engine_running:
+            self.engine.stop()
+        if self.scanner and self.scanner.running:
+            self.scanner.stop()
+        for owner in list(self.order_book_streams):
+            self._stop_order_books(owner)
+        if self.bot_thread:
+            self.bot_thread.join(timeout=5)
+        if self.engine and self.engine.thread:
+            self.engine.thread.join(timeout=5)
+        if self.journal:
+            self.journal.close()
@@ -0,0 +1,296 @@
+"""
+Live trading bot used by the trading host.
+
+LiveTradingBot is the event-driven trading loop that votes the moving
+average signals together with the latest news recommendation. It has no dependency
+on Flask or Socket.IO: status updates, trades and errors are reported
+through an `emit(event, data)` callback, and news recommendations are pushed
+in with set_news(). With a MarketDataHub attached, prices arrive as
+immutable snapshots, so a price fetched for someone else (a manual trade,
+the dashboard) reaches the loop as a tick instead of a second request. That lets the same bot run inside the web server or in
+a separate trading process (see trading_engine.engine_process).
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from strategymovingaverage import DeltaExchangeAPI, MovingAverageTradingBot, RESOLUTION_SECONDS
+from trading_engine.cadence import AdaptiveCadence
+from trading_engine.config_store import ConfigStore
+from trading_engine.events import BAR_CLOSE, CONFIG, NEWS, STOP, TICK, TradingEvents, next_bar_close
+from trading_engine.market_data import MarketDataHub, MarketSnapshot
+from trading_engine.paper_exchange import PaperExchangeAPI
+
+logger = logging.getLogger(__name__)
+
+
+def _no_emit(event: str, data: Dict):
+    pass
+
+
+class LiveTradingBot(MovingAverageTradingBot):
+    """Event-driven moving average bot with news filtering and status callbacks"""
+
+    def __init__(self, api_key: str, api_secret: str, symbol: str = 'BTCUSD',
+                 api: Optional[DeltaExchangeAPI] = None,
+                 emit: Optional[Callable[[str, Dict], None]] = None):
+        super().__init__(api_key, api_secret, symbol, api=api)
+        self.emit = emit or _no_emit
+        self.last_news_recommendation = 'NEUTRAL'
+        self.news_recommendation: Dict = {}
+
+        # Event-driven loop: wake on ticks, bar closes, news, config changes and stop requests
+        self.events = TradingEvents()
+        self.running = False
+        self.retry_interval = 30
+
+        # Polling interval adapts to volatility and MA crossing distance within the API budget
+        self.cadence = AdaptiveCadence(rate_limiter=getattr(self.api, 'rate_limiter', None))
+
+        # News settings (overridden by apply_config)
+        self.news_confidence_threshold = 0.7
+        self.enable_news_trading = True
+        self.config_store = None
+
+        # Shared price source; only this loop appends to price_data
+        self.market_data: Optional[MarketDataHub] = None
+        self.last_snapshot_sequence = 0
+
+        self.status = {
+            'running': False,
+            'symbol': symbol,
+            'current_price': 0,
+            'position': None,
+            'signals': {},
+            'last_update': None,
+            'pnl': 0,
+            'trades_today': 0
+        }
+
+    def attach_config_store(self, store: ConfigStore):
+        """Apply the current config now and every new version between ticks"""
+        self.config_store = store
+        snapshot = store.current()
+        self.apply_config(snapshot.values, snapshot.version)
+        store.subscribe(self.events)
+
+    def attach_market_data(self, hub: MarketDataHub):
+        """Poll through `hub` and take every snapshot it publishes for this symbol"""
+        self.market_data = hub
+        hub.subscribe(self._on_snapshot, self.symbol)
+
+    def _on_snapshot(self, snapshot: MarketSnapshot):
+        self.events.post(TICK, {'snapshot': snapshot})
+
+    def take_snapshot(self, snapshot: MarketSnapshot) -> bool:
+        """Append a snapshot's price to the buffer unless it was already taken"""
+        if snapshot.sequence <= self.last_snapshot_sequence:
+            return False
+        self.last_snapshot_sequence = snapshot.sequence
+        self.add_price(snapshot.price, int(snapshot.timestamp))
+        return True
+
+    def update_current_price(self) -> Optional[float]:
+        """Current price from the market-data hub (shared, single-flight) when attached"""
+        if self.market_data is None:
+            return super().update_current_price()
+        with self.tracer.span('update_price'):
+            snapshot = self.market_data.get(self.symbol)
+        if snapshot is None:
+            return None
+        self.take_snapshot(snapshot)
+        return snapshot.price
+
+    def apply_config(self, config: Dict, version: int = 0) -> Dict:
+        """Also apply polling cadence and news settings"""
+        changed = super().apply_config(config, version)
+        for target, name, key in ((self.cadence, 'base_interval', 'trading_interval'),
+                                  (self.cadence, 'min_interval', 'min_trading_interval'),
+                                  (self.cadence, 'max_interval', 'max_trading_interval'),
+                                  (self.cadence, 'enabled', 'enable_adaptive_cadence'),
+                                  (self, 'news_confidence_threshold', 'news_confidence_threshold'),
+                                  (self, 'enable_news_trading', 'enable_news_trading')):
+            value = config.get(key)
+            if value is not None and getattr(target, name) != value:
+                changed[name] = (getattr(target, name), value)
+                setattr(target, name, value)
+        return changed
+
+    def set_news(self, recommendation: Optional[Dict]):
+        """Take a new news recommendation and re-evaluate on it"""
+        self.news_recommendation = recommendation or {}
+        self.events.post(NEWS)
+
+    def stop(self):
+        """Stop the loop immediately (it is woken if waiting)"""
+        self.running = False
+        self.events.stop()
+
+    def log_status(self, signals: Dict):
+        """Log and emit a status update"""
+        super().log_status(signals)
+
+        # Position and P&L come from the local ledger, marked to the latest price;
+        # the exchange is only consulted every reconcile_interval seconds
+        position_info = self.ledger.snapshot()
+        self.status.update({
+            'running': True,
+            'symbol': self.symbol,
+            'paper_trading': isinstance(self.api, PaperExchangeAPI),
+            'current_price': signals['current_price'],
+            'position': position_info,
+            'signals': {key: signals.get(key) for key in
+                        ('sma_signal', 'ema_signal', 'sma_short', 'sma_long', 'ema_short', 'ema_long',
+                         'rsi', 'votes', 'score', 'signal')},
+            'last_update': datetime.now().isoformat(),
+            'pnl': position_info['total_pnl'] if position_info else 0,
+            'trades_today': self.risk_manager.trades_today,
+            'cadence': self.cadence.metrics()
+        })
+        self.emit('status_update', dict(self.status))
+
+    def run(self):
+        """Event-driven trading loop; returns when stop() is called"""
+        logger.info(f"[{self.symbol}] Starting live trading bot")
+        self.running = True
+        self.status['running'] = True
+
+        try:
+            # Resume from the state journal, or fetch initial historical data
+            if not self.resume_from_journal() and not self.fetch_historical_data():
+                logger.error(f"[{self.symbol}] Failed to fetch historical data")
+                self.emit('bot_error', {'error': 'Failed to fetch historical data'})
+                return
+
+            resolution_seconds = RESOLUTION_SECONDS.get(self.candle_resolution, 3600)
+            last_poll = next_poll = time.monotonic()
+            next_bar = next_bar_close(resolution_seconds)
+
+            while self.running:
+                # Sleep until an event arrives or the next periodic deadline
+                events = self.events.wait(min(next_poll, next_bar))
+                # Snapshots from this loop's own polls were already taken
+                events = [(kind, payload) for kind, payload in events
+                          if kind != TICK or payload.get('snapshot') is None
+                          or payload['snapshot'].sequence > self.last_snapshot_sequence]
+                if not events and time.monotonic() < min(next_poll, next_bar):
+                    continue
+                kinds = {kind for kind, _ in events}
+                if STOP in kinds or not self.running:
+                    break
+
+                # A new config version is applied as a whole, between ticks
+                if CONFIG in kinds and self.config_store:
+                    snapshot = self.config_store.current()
+                    if snapshot.version != self.config_version:
+                        self.apply_config(snapshot.values, snapshot.version)
+
+                # One traced cycle: price update through order placement
+                with self.tracer.span('tick', root=True):
+                    # Pushed ticks and new hub snapshots are evaluated immediately
+                    current_price = None
+                    for kind, payload in events:
+                        if kind != TICK:
+                            continue
+                        if payload.get('snapshot') is not None:
+                            if self.take_snapshot(payload['snapshot']):
+                                current_price = payload['snapshot'].price
+                        elif payload.get('price'):
+                            current_price = float(payload['price'])
+                            self.add_price(current_price)
+
+                    now = time.monotonic()
+                    if now >= next_poll:
+                        polled_price = self.update_current_price()
+                        if not polled_price:
+                            logger.warning(f"[{self.symbol}] Failed to get current price, retrying...")
+                            next_poll = now + self.retry_interval
+                            continue
+                        current_price = polled_price
+                        last_poll = now
+
+                    if now >= next_bar:
+                        kinds.add(BAR_CLOSE)
+                        next_bar = next_bar_close(resolution_seconds)
+
+                    # News, bar closes and config changes re-evaluate the latest price without another fetch
+                    if current_price is None and kinds & {NEWS, BAR_CLOSE, CONFIG} and self.price_data:
+                        current_price = self.price_data[-1]
+                    if current_price is None:
+                        continue
+
+                    # Calculate signals, combine with news and trade if warranted
+                    result = self.process_tick(current_price)
+
+                # The next poll is paced by the cadence chosen from the updated buffer
+                signals = result['signals']
+                interval = self.cadence.update(self.price_data, self.timestamps,
+                                               signals.get('sma_short'), signals.get('sma_long'))
+                next_poll = last_poll + interval
+
+                # Log current status (this emits a status update)
+                self.log_status(result['signals'])
+
+                if result['executed']:
+                    self.emit('trade_executed', {
+                        'symbol': self.symbol,
+                        'signal': result['signal'],
+                        'price': current_price,
+                        'timestamp': datetime.now().isoformat(),
+                        'news_sentiment': self.last_news_recommendation
+                    })
+
+        except Exception as e:
+            logger.error(f"[{self.symbol}] Error in trading bot: {e}")
+            self.emit('bot_error', {'error': str(e)})
+        finally:
+            if self.config_store:
+                self.config_store.unsubscribe(self.events)
+            if self.market_data:
+                self.market_data.unsubscribe(self._on_snapshot, self.symbol)
+            self.running = False
+            self.status['running'] = False
+            self.emit('bot_stopped', {'symbol': self.symbol})
+
+    def strategy_context(self) -> Dict:
+        """The news recommendation is voted on by the 'news' strategy"""
+        with self.tracer.span('news_recommendation'):
+            news_recommendation = self.get_news_recommendation()
+        self.last_news_recommendation = news_recommendation
+        return {'news': news_recommendation}
+
+    def select_signal(self, signals: Dict):
+        """Weighted vote of the technical strategies and news sentiment"""
+        final_signal = signals.get('signal')
+        votes = signals.get('votes', {})
+
+        if final_signal:
+            logger.info(f"Strategy votes: {votes}, score {signals['score']:.2f}, "
+                        f"News: {self.last_news_recommendation}")
+        elif signals.get('vetoed_by'):
+            logger.warning(f"News sentiment ({self.last_news_recommendation}) contradicts the technical "
+                           f"signal, not trading: {votes}, score {signals['score']:.2f}")
+        elif any(votes.values()):
+            logger.info(f"Strategy votes below threshold ({self.signal_threshold}): {votes}, "
+                        f"score {signals['score']:.2f}")
+
+        return final_signal
+
+    def get_news_recommendation(self):
+        """Get news-based trading recommendation"""
+        try:
+            recommendation = self.news_recommendation
+            if not self.enable_news_trading or not recommendation:
+                return 'NEUTRAL'
+
+            # Only use high-confidence news signals
+            if recommendation.get('overall_confidence', 0) >= self.news_confidence_threshold:
+                return recommendation.get('recommendation', 'NEUTRAL')
+            else:
+                return 'NEUTRAL'
+
+        except Exception as e:
+            logger.error(f"Error getting news recommendation: {e}")
+            return 'NEUTRAL'
@@ -0,0 +1,165 @@
+"""
+Market-data hub with single-flight fetching.
+
+One MarketDataHub owns ticker fetching for every symbol it serves. A caller
+asking for a symbol gets the cached snapshot while it is fresh; otherwise one
+caller fetches and every concurrent caller for the same symbol (or for the
+bulk /v2/tickers refresh) waits for that one request instead of sending its
+own. Each fetched ticker becomes an immutable MarketSnapshot, numbered per
+hub, and is published to subscribers: the symbol's trading loop, the
+dashboard relay and anyone else who asked. Consumers read snapshots and never
+share a mutable price buffer.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MarketSnapshot:
+    """One immutable ticker observation"""
+
+    __slots__ = ('symbol', 'price', 'ticker', 'sequence', 'fetched_at', 'timestamp')
+
+    def __init__(self, symbol: str, price: float, ticker: Mapping, sequence: int):
+        self.symbol = symbol
+        self.price = price
+        self.ticker = MappingProxyType(dict(ticker))
+        self.sequence = sequence
+        self.fetched_at = time.monotonic()
+        self.timestamp = time.time()
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def to_dict(self) -> Dict:
+        return {'symbol': self.symbol, 'price': self.price, 'sequence': self.sequence,
+                'timestamp': self.timestamp}
+
+
+class _Flight:
+    """An in-progress fetch that concurrent callers wait on"""
+
+    __slots__ = ('done', 'result')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class MarketDataHub:
+    """Latest snapshot per symbol, fetched once for all concurrent consumers"""
+
+    ALL = '*'
+
+    def __init__(self, api, max_age: float = 1.0, wait_timeout: float = 30.0):
+        self.api = api
+        self.max_age = max_age
+        self.wait_timeout = wait_timeout
+        self.snapshots: Dict[str, MarketSnapshot] = {}
+        self.last_bulk_refresh = 0.0
+        self.lock = threading.Lock()
+        self.flights: Dict[str, _Flight] = {}
+        self.subscribers: Dict[str, List[Callable[[MarketSnapshot], None]]] = {}
+        self.sequence = itertools.count(1)
+        self.stats = {'fetches': 0, 'bulk_fetches': 0, 'collapsed': 0, 'cache_hits': 0}
+
+    def latest(self, symbol: str) -> Optional[MarketSnapshot]:
+        """Most recent snapshot without fetching"""
+        return self.snapshots.get(symbol)
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        snapshot = self.snapshots.get(symbol)
+        return snapshot.price if snapshot else None
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[MarketSnapshot]:
+        """Snapshot no older than `max_age`, fetching it (once) if needed"""
+        max_age = self.max_age if max_age is None else max_age
+        snapshot = self.snapshots.get(symbol)
+        if snapshot is not None and snapshot.age() < max_age:
+            self.stats['cache_hits'] += 1
+            return snapshot
+        return self._single_flight(symbol, lambda: self._fetch_ticker(symbol))
+
+    def refresh_all(self, max_age: Optional[float] = None) -> Dict[str, MarketSnapshot]:
+        """Refresh every symbol with one bulk tickers call unless the last one is still fresh"""
+        max_age = self.max_age if max_age is None else max_age
+        if time.monotonic() - self.last_bulk_refresh >= max_age:
+            self._single_flight(self.ALL, self._fetch_all)
+        return self.snapshots
+
+    def _single_flight(self, key: str, fetch: Callable):
+        """Run `fetch` unless the same key is already being fetched; then wait for that result"""
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+            else:
+                self.stats['collapsed'] += 1
+
+        if not leader:
+            flight.done.wait(self.wait_timeout)
+            return flight.result
+
+        try:
+            flight.result = fetch()
+        except Exception as e:
+            logger.error(f"Error fetching market data for {key}: {e}")
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _fetch_ticker(self, symbol: str) -> Optional[MarketSnapshot]:
+        self.stats['fetches'] += 1
+        ticker = self.api.get_ticker(symbol)
+        if not ticker or ticker.get('close') is None:
+            return None
+        return self._publish(symbol, ticker)
+
+    def _fetch_all(self) -> Dict[str, MarketSnapshot]:
+        self.stats['bulk_fetches'] += 1
+        tickers = self.api.get_tickers()
+        if tickers:
+            self.last_bulk_refresh = time.monotonic()
+        for ticker in tickers:
+            if ticker.get('symbol') and ticker.get('close') is not None:
+                self._publish(ticker['symbol'], ticker)
+        return self.snapshots
+
+    def _publish(self, symbol: str, ticker: Mapping) -> MarketSnapshot:
+        """Store a new snapshot and hand it to the symbol's subscribers"""
+        snapshot = MarketSnapshot(symbol, float(ticker['close']), ticker, next(self.sequence))
+        with self.lock:
+            self.snapshots[symbol] = snapshot
+            callbacks = self.subscribers.get(symbol, []) + self.subscribers.get(self.ALL, [])
+        for callback in callbacks:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Error publishing {symbol} market data: {e}")
+        return snapshot
+
+    def subscribe(self, callback: Callable[[MarketSnapshot], None], symbol: str = ALL):
+        """Call `callback` with every new snapshot of `symbol` (all symbols by default)"""
+        with self.lock:
+            self.subscribers[symbol] = self.subscribers.get(symbol, []) + [callback]
+
+    def unsubscribe(self, callback: Callable[[MarketSnapshot], None], symbol: str = ALL):
+        with self.lock:
+            self.subscribers[symbol] = [c for c in self.subscribers.get(symbol, []) if c != callback]
+
+    def status(self) -> Dict:
+        with self.lock:
+            snapshots = dict(self.snapshots)
+        return {
+            'symbols': {symbol: snapshot.to_dict() for symbol, snapshot in snapshots.items()},
+            'stats': dict(self.stats)
+        }
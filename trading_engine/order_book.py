@@ -0,0 +1,312 @@
+"""
+L2 order book.
+
+L2OrderBook keeps the price levels of both sides as two sorted, compact
+array('d') pairs (prices and sizes). Levels are located with bisect, so a
+level update costs one O(log n) search plus a contiguous insert or delete.
+Bids are stored with negated prices so both sides sort best-first. Queries
+for spread, depth within N bps of mid and the expected fill price of a
+market order of a given size run straight off those arrays.
+
+OrderBookStream maintains one or more books from the exchange's
+`l2_updates` WebSocket channel. It applies the initial snapshot and then the
+deltas, and resubscribes on a sequence gap. Without a WebSocket client, or
+while the stream is down, it polls REST snapshots of /v2/l2orderbook
+instead.
+"""
+
+import json
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import simple_websocket
+except ImportError:  # optional: fall back to REST snapshots
+    simple_websocket = None
+
+logger = logging.getLogger(__name__)
+
+DELTA_SOCKET_URL = 'wss://socket.india.delta.exchange'
+
+
+class BookSide:
+    """Price levels of one side, best first"""
+
+    def __init__(self, is_bid: bool):
+        self.sign = -1.0 if is_bid else 1.0
+        self.keys = array('d')  # price * sign, ascending
+        self.sizes = array('d')
+
+    def clear(self):
+        self.keys = array('d')
+        self.sizes = array('d')
+
+    def update(self, price: float, size: float):
+        """Set the size at a price level; size 0 removes the level"""
+        key = price * self.sign
+        index = bisect_left(self.keys, key)
+        exists = index < len(self.keys) and self.keys[index] == key
+        if size <= 0:
+            if exists:
+                del self.keys[index]
+                del self.sizes[index]
+        elif exists:
+            self.sizes[index] = size
+        else:
+            self.keys.insert(index, key)
+            self.sizes.insert(index, size)
+
+    def best(self) -> Optional[float]:
+        return self.keys[0] * self.sign if self.keys else None
+
+    def levels(self, count: int) -> List[Tuple[float, float]]:
+        return [(self.keys[i] * self.sign, self.sizes[i]) for i in range(min(count, len(self.keys)))]
+
+    def size_within(self, limit_price: float) -> float:
+        """Total size at prices no worse than `limit_price`"""
+        return float(sum(self.sizes[:bisect_right(self.keys, limit_price * self.sign)]))
+
+    def walk(self, size: float) -> Optional[Tuple[float, float]]:
+        """(average price, worst price) of taking `size`; None if the book is too thin"""
+        if size <= 0:
+            return None
+        remaining = size
+        notional = 0.0
+        for key, level_size in zip(self.keys, self.sizes):
+            take = min(remaining, level_size)
+            notional += take * key * self.sign
+            remaining -= take
+            if remaining <= 0:
+                return notional / size, key * self.sign
+        return None
+
+    def size_for_average(self, limit_price: float) -> float:
+        """Largest size whose average fill price stays no worse than `limit_price`"""
+        filled = 0.0
+        notional = 0.0
+        for key, level_size in zip(self.keys, self.sizes):
+            price = key * self.sign
+            if (notional + price * level_size - limit_price * (filled + level_size)) * self.sign <= 0:
+                filled += level_size
+                notional += price * level_size
+                continue
+            # Take just enough of this level to land on the limit average
+            if (price - limit_price) * self.sign > 0:
+                filled += (limit_price * filled - notional) / (price - limit_price)
+            break
+        return filled
+
+
+class L2OrderBook:
+    """Bids and asks for one symbol with spread, depth and fill-price queries"""
+
+    def __init__(self, symbol: str, stale_after: float = 10.0):
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.sequence: Optional[int] = None
+        self.updated_at = 0.0
+        # Set on a sequence gap: the levels are incomplete until the next snapshot
+        self.needs_snapshot = False
+        self.stale_after = stale_after
+        self.lock = threading.Lock()
+
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, sequence: Optional[int] = None):
+        """Replace the book with a full snapshot of (price, size) levels"""
+        with self.lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, size in bids:
+                self.bids.update(float(price), float(size))
+            for price, size in asks:
+                self.asks.update(float(price), float(size))
+            self.sequence = sequence
+            self.updated_at = time.monotonic()
+            self.needs_snapshot = False
+
+    def apply_delta(self, bids: Iterable, asks: Iterable, sequence: Optional[int] = None) -> bool:
+        """Apply changed levels; returns False on a sequence gap and for every delta until the next snapshot"""
+        with self.lock:
+            if self.needs_snapshot:
+                return False
+            if sequence is not None and self.sequence is not None and sequence != self.sequence + 1:
+                self.needs_snapshot = True
+                return False
+            for price, size in bids:
+                self.bids.update(float(price), float(size))
+            for price, size in asks:
+                self.asks.update(float(price), float(size))
+            self.sequence = sequence
+            self.updated_at = time.monotonic()
+            return True
+
+    def is_ready(self) -> bool:
+        """Both sides present, complete (no gap since the last snapshot) and recently updated"""
+        return (not self.needs_snapshot and bool(self.bids.keys) and bool(self.asks.keys)
+                and time.monotonic() - self.updated_at < self.stale_after)
+
+    def side(self, order_side: str) -> BookSide:
+        """The side a market order of `order_side` takes liquidity from"""
+        return self.asks if order_side == 'buy' else self.bids
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        return (bid + ask) / 2 if bid is not None and ask is not None else None
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        return ask - bid if bid is not None and ask is not None else None
+
+    def spread_bps(self) -> Optional[float]:
+        mid = self.mid()
+        return self.spread() / mid * 10000 if mid else None
+
+    def depth(self, bps: float, order_side: str) -> float:
+        """Size available to a market `order_side` within `bps` of mid"""
+        mid = self.mid()
+        if mid is None:
+            return 0.0
+        limit = mid * (1 + bps / 10000) if order_side == 'buy' else mid * (1 - bps / 10000)
+        with self.lock:
+            return self.side(order_side).size_within(limit)
+
+    def fill_price(self, order_side: str, size: float) -> Optional[Dict]:
+        """Expected average and worst price of a market order, and its slippage from mid in bps"""
+        mid = self.mid()
+        with self.lock:
+            result = self.side(order_side).walk(size)
+        if result is None or mid is None:
+            return None
+        average, worst = result
+        slippage = (average - mid) / mid * 10000
+        return {'average_price': average, 'worst_price': worst,
+                'slippage_bps': slippage if order_side == 'buy' else -slippage}
+
+    def max_size(self, order_side: str, max_slippage_bps: float) -> float:
+        """Largest market order whose average fill stays within `max_slippage_bps` of mid"""
+        mid = self.mid()
+        if mid is None:
+            return 0.0
+        limit = mid * (1 + max_slippage_bps / 10000) if order_side == 'buy' else mid * (1 - max_slippage_bps / 10000)
+        with self.lock:
+            return self.side(order_side).size_for_average(limit)
+
+    def snapshot(self, levels: int = 10) -> Dict:
+        with self.lock:
+            bids, asks = self.bids.levels(levels), self.asks.levels(levels)
+        return {
+            'symbol': self.symbol,
+            'ready': self.is_ready(),
+            'sequence': self.sequence,
+            'needs_snapshot': self.needs_snapshot,
+            'bids': bids,
+            'asks': asks,
+            'mid': self.mid(),
+            'spread': self.spread(),
+            'spread_bps': self.spread_bps(),
+            'depth_10bps': {'buy': self.depth(10, 'buy'), 'sell': self.depth(10, 'sell')},
+            'age': time.monotonic() - self.updated_at if self.updated_at else None
+        }
+
+
+class OrderBookStream:
+    """Keep L2 books current from the l2_updates channel, or REST snapshots as a fallback"""
+
+    def __init__(self, api, books: Dict[str, L2OrderBook], url: str = DELTA_SOCKET_URL,
+                 poll_interval: float = 2.0, reconnect_delay: float = 5.0):
+        self.api = api
+        self.books = books
+        self.url = url
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.running = False
+        self.thread = None
+        self.mode = None
+        self.stats = {'snapshots': 0, 'deltas': 0, 'gaps': 0, 'dropped': 0, 'reconnects': 0, 'polls': 0}
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        logger.info(f"Starting order book stream for {', '.join(self.books)}")
+        while self.running:
+            if simple_websocket is not None:
+                try:
+                    self.mode = 'websocket'
+                    self._stream()
+                except Exception as e:
+                    logger.warning(f"Order book stream disconnected: {e}")
+                    self.stats['reconnects'] += 1
+            if not self.running:
+                break
+            # REST snapshots until the stream can be retried
+            self.mode = 'rest'
+            deadline = time.monotonic() + (self.reconnect_delay if simple_websocket is not None else float('inf'))
+            while self.running and time.monotonic() < deadline:
+                self.poll()
+                time.sleep(self.poll_interval)
+        logger.info("Order book stream stopped")
+
+    def poll(self):
+        """Refresh every book from a REST snapshot"""
+        for symbol, book in self.books.items():
+            result = self.api.get_l2_orderbook(symbol)
+            if result:
+                book.apply_snapshot(((level['price'], level['size']) for level in result.get('buy', [])),
+                                    ((level['price'], level['size']) for level in result.get('sell', [])))
+                self.stats['polls'] += 1
+
+    def _subscribe(self, ws, action: str = 'subscribe', symbols: Optional[List[str]] = None):
+        ws.send(json.dumps({'type': action, 'payload': {
+            'channels': [{'name': 'l2_updates', 'symbols': symbols or list(self.books)}]}}))
+
+    def _stream(self):
+        ws = simple_websocket.Client.connect(self.url)
+        try:
+            self._subscribe(ws)
+            while self.running:
+                message = ws.receive(timeout=1.0)
+                if message is None:
+                    continue
+                self.handle_message(json.loads(message), ws)
+        finally:
+            ws.close()
+
+    def handle_message(self, message: Dict, ws=None):
+        """Apply one l2_updates message (snapshot or delta) to its book"""
+        if message.get('type') != 'l2_updates':
+            return
+        book = self.books.get(message.get('symbol'))
+        if book is None:
+            return
+        sequence = message.get('sequence_no')
+        if message.get('action') == 'snapshot':
+            book.apply_snapshot(message.get('bids', []), message.get('asks', []), sequence)
+            self.stats['snapshots'] += 1
+        elif book.needs_snapshot:
+            # Resubscribed on an earlier gap; deltas are useless until its snapshot arrives
+            self.stats['dropped'] += 1
+        elif book.apply_delta(message.get('bids', []), message.get('asks', []), sequence):
+            self.stats['deltas'] += 1
+        else:
+            # Missed an update: resubscribe to get a fresh snapshot for this symbol
+            self.stats['gaps'] += 1
+            logger.warning(f"[{book.symbol}] Order book sequence gap, resubscribing")
+            if ws is not None:
+                self._subscribe(ws, 'unsubscribe', [book.symbol])
+                self._subscribe(ws, 'subscribe', [book.symbol])
+
+    def status(self) -> Dict:
+        return {'running': self.running, 'mode': self.mode, 'symbols': list(self.books), 'stats': dict(self.stats)}
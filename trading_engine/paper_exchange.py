@@ -0,0 +1,220 @@
+"""
+Paper-trading exchange simulator.
+
+PaperExchangeAPI exposes the same methods the bots use on DeltaExchangeAPI
+(get_candles, get_ticker, get_tickers, get_product, get_l2_orderbook,
+place_order, get_positions, get_orders) so it can be injected wherever the real client sits. Market data
+is read live, either from a shared MarketDataHub or straight from the real
+client, while orders are matched locally with modelled latency, slippage and
+fees. Positions, orders and PnL live entirely in memory, so many paper
+accounts can run side by side against one live feed without touching the
+exchange.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from strategymovingaverage import DeltaExchangeAPI, PositionLedger
+
+logger = logging.getLogger(__name__)
+
+
+class PaperExchangeAPI:
+    """In-memory matching and fill simulator behind the DeltaExchangeAPI interface"""
+
+    def __init__(self, market_api: DeltaExchangeAPI, feed=None, latency_ms: float = 150.0,
+                 slippage_bps: float = 2.0, impact_bps_per_unit: float = 0.5,
+                 taker_fee_pct: float = 0.05, maker_fee_pct: float = 0.02,
+                 clock: Callable[[], float] = time.monotonic):
+        self.market_api = market_api
+        self.feed = feed
+        self.latency = latency_ms / 1000
+        self.slippage_bps = slippage_bps
+        self.impact_bps_per_unit = impact_bps_per_unit
+        self.taker_fee = taker_fee_pct / 100
+        self.maker_fee = maker_fee_pct / 100
+        self.clock = clock
+
+        # Mirror the attributes code may read off the real client
+        self.api_key = market_api.api_key
+        self.api_secret = market_api.api_secret
+        self.symbol = market_api.symbol
+        self.rate_limiter = market_api.rate_limiter
+
+        self.lock = threading.Lock()
+        self.order_ids = itertools.count(1)
+        self.open_orders: List[Dict] = []
+        self.filled_orders: List[Dict] = []
+        self.ledgers: Dict[str, PositionLedger] = {}
+        self.marks: Dict[str, float] = {}
+        self.contract_values: Dict[str, float] = {}
+        self.fees_paid = 0.0
+
+    # Market data (live)
+
+    def get_candles(self, symbol: str, resolution: str, start: int, end: int) -> List[Dict]:
+        return self.market_api.get_candles(symbol, resolution, start, end)
+
+    def get_ticker(self, symbol: str) -> Dict:
+        """Live ticker; also drives matching of resting paper orders"""
+        if self.feed is not None:
+            snapshot = self.feed.get(symbol)
+            ticker = dict(snapshot.ticker) if snapshot else {}
+        else:
+            ticker = self.market_api.get_ticker(symbol)
+        if ticker and ticker.get('close') is not None:
+            self.on_price(symbol, float(ticker['close']))
+        return ticker
+
+    def get_product(self, symbol: str) -> Dict:
+        return self.market_api.get_product(symbol)
+
+    def get_l2_orderbook(self, symbol: str, depth: Optional[int] = None) -> Dict:
+        return self.market_api.get_l2_orderbook(symbol, depth)
+
+    def _contract_value(self, symbol: str) -> float:
+        """Contract value used for notional, fees and PnL (fetched once per symbol)"""
+        if symbol not in self.contract_values:
+            product = self.market_api.get_product(symbol)
+            if not product.get('contract_value'):
+                return 1.0
+            self.contract_values[symbol] = float(product['contract_value'])
+        return self.contract_values[symbol]
+
+    def get_tickers(self, contract_types: str = None) -> List[Dict]:
+        tickers = self.market_api.get_tickers(contract_types)
+        for ticker in tickers:
+            if ticker.get('symbol') and ticker.get('close') is not None:
+                self.on_price(ticker['symbol'], float(ticker['close']))
+        return tickers
+
+    # Order handling (simulated)
+
+    def place_order(self, product_symbol: str, side: str, size: int, order_type: str = 'market_order',
+                    limit_price: str = None, stop_price: str = None) -> Dict:
+        """Accept an order; it becomes fillable once the modelled latency has passed
+
+        A market order is matched before returning, like on the exchange: the
+        call waits out the latency and fills against a fresh price, so the
+        returned order carries its average_fill_price and paid_commission.
+        Limit and stop orders are returned open and fill on later prices.
+        """
+        if side not in ('buy', 'sell') or size <= 0:
+            logger.error(f"Paper order rejected: side={side} size={size}")
+            return {}
+        if order_type == 'limit_order' and not limit_price:
+            logger.error("Paper limit order rejected: limit_price required")
+            return {}
+
+        contract_value = self._contract_value(product_symbol)
+        order = {
+            'id': next(self.order_ids),
+            'product_symbol': product_symbol,
+            'side': side,
+            'size': int(size),
+            'order_type': order_type,
+            'limit_price': str(limit_price) if limit_price else None,
+            'stop_price': str(stop_price) if stop_price else None,
+            'contract_value': contract_value,
+            'state': 'open',
+            'unfilled_size': int(size),
+            'paper': True,
+            'created_at': time.time(),
+            'active_at': self.clock() + self.latency,
+        }
+        with self.lock:
+            self.open_orders.append(order)
+        logger.info(f"Paper order accepted: {side} {size} {product_symbol} ({order_type})")
+
+        if order_type == 'market_order':
+            wait_for = order['active_at'] - self.clock()
+            if wait_for > 0:
+                time.sleep(wait_for)
+            try:
+                ticker = self.get_ticker(product_symbol)  # fills through on_price
+            except Exception as e:
+                logger.warning(f"Paper order {order['id']}: no fresh price ({e}), using the last mark")
+                ticker = None
+            if ticker and ticker.get('close') is not None:
+                with self.lock:
+                    return dict(order)
+
+        # A fresh mark may already be available (e.g. zero latency)
+        mark = self.marks.get(product_symbol)
+        if mark is not None:
+            self.on_price(product_symbol, mark)
+        with self.lock:
+            return dict(order)
+
+    def on_price(self, symbol: str, price: float):
+        """Record a market price, fill eligible orders and mark positions"""
+        now = self.clock()
+        with self.lock:
+            self.marks[symbol] = price
+            remaining = []
+            for order in self.open_orders:
+                if order['product_symbol'] != symbol or order['active_at'] > now or not self._try_fill(order, price):
+                    remaining.append(order)
+            self.open_orders = remaining
+
+            ledger = self.ledgers.get(symbol)
+            if ledger:
+                ledger.mark(price)
+
+    def _try_fill(self, order: Dict, price: float) -> bool:
+        """Fill an active order at `price` if its conditions are met (lock held)"""
+        direction = 1 if order['side'] == 'buy' else -1
+        if order['stop_price'] is not None:
+            stop = float(order['stop_price'])
+            if (direction > 0 and price < stop) or (direction < 0 and price > stop):
+                return False
+
+        if order['order_type'] == 'limit_order':
+            limit = float(order['limit_price'])
+            if (direction > 0 and price > limit) or (direction < 0 and price < limit):
+                return False
+            fill_price, fee_rate = limit, self.maker_fee
+        else:
+            slippage = (self.slippage_bps + self.impact_bps_per_unit * order['size']) / 10000
+            fill_price, fee_rate = price * (1 + direction * slippage), self.taker_fee
+
+        fee = fill_price * order['size'] * order['contract_value'] * fee_rate
+        symbol = order['product_symbol']
+        ledger = self.ledgers.setdefault(symbol, PositionLedger(symbol, order['contract_value']))
+        ledger.apply_fill(order['side'], order['size'], fill_price, fee)
+        self.fees_paid += fee
+        order.update({'state': 'closed', 'unfilled_size': 0, 'average_fill_price': fill_price,
+                      'fee': fee, 'paid_commission': fee, 'filled_at': time.time()})
+        self.filled_orders.append(order)
+        logger.info(f"Paper fill: {order['side']} {order['size']} {order['product_symbol']} @ {fill_price:.4f}")
+        return True
+
+    # Account queries (simulated)
+
+    def get_positions(self) -> List[Dict]:
+        """Open paper positions in the /v2/positions/margined shape"""
+        with self.lock:
+            positions = [ledger.to_position() for ledger in self.ledgers.values()]
+        return [p for p in positions if p]
+
+    def get_orders(self, product_symbol: str = None, state: str = 'open') -> List[Dict]:
+        with self.lock:
+            orders = self.open_orders if state == 'open' else self.filled_orders
+            return [dict(o) for o in orders if not product_symbol or o['product_symbol'] == product_symbol]
+
+    def get_account_summary(self) -> Dict:
+        """Aggregate paper PnL across all symbols"""
+        with self.lock:
+            realized = sum(ledger.realized_pnl for ledger in self.ledgers.values())
+            unrealized = sum(ledger.unrealized_pnl for ledger in self.ledgers.values())
+            return {
+                'realized_pnl': realized,
+                'unrealized_pnl': unrealized,
+                'total_pnl': realized + unrealized,
+                'fees_paid': self.fees_paid,
+                'open_orders': len(self.open_orders),
+                'filled_orders': len(self.filled_orders),
+            }
@@ -0,0 +1,152 @@
+"""
+Portfolio-level risk engine.
+
+One PortfolioRiskEngine is shared by every bot in the process. Positions,
+mark prices, contract values, daily PnL and per-symbol limits are kept as
+NumPy arrays indexed by symbol, so portfolio exposure (gross, net and per
+symbol) and the pre-trade checks for a batch of candidate orders are
+computed in one vectorized pass instead of a loop over symbols. Bots push
+their ledger state with update() as prices and fills arrive (O(1)), and
+ask check_orders() before anything is sent to the exchange.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioRiskEngine:
+    """Shared exposure and loss limits across all traded symbols"""
+
+    def __init__(self, account_balance: float = 10000.0, max_gross_exposure: float = 3.0,
+                 max_net_exposure: float = 2.0, max_symbol_exposure: float = 1.0,
+                 max_daily_loss: float = 0.05):
+        # Exposure limits are multiples of account_balance, max_daily_loss a fraction of it
+        self.account_balance = account_balance
+        self.max_gross_exposure = max_gross_exposure
+        self.max_net_exposure = max_net_exposure
+        self.max_symbol_exposure = max_symbol_exposure
+        self.max_daily_loss = max_daily_loss
+
+        self.lock = threading.Lock()
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.positions = np.zeros(0)
+        self.prices = np.zeros(0)
+        self.contract_values = np.zeros(0)
+        self.daily_pnl = np.zeros(0)
+        self.max_sizes = np.zeros(0)
+
+    def register(self, symbol: str, max_position_size: float = 10, contract_value: float = 1.0) -> int:
+        """Add a symbol (or update its limits) and return its array index"""
+        with self.lock:
+            i = self.index.get(symbol)
+            if i is None:
+                i = len(self.symbols)
+                self.symbols.append(symbol)
+                self.index[symbol] = i
+                self.positions = np.append(self.positions, 0.0)
+                self.prices = np.append(self.prices, 0.0)
+                self.contract_values = np.append(self.contract_values, 1.0)
+                self.daily_pnl = np.append(self.daily_pnl, 0.0)
+                self.max_sizes = np.append(self.max_sizes, 0.0)
+            self.max_sizes[i] = max_position_size
+            self.contract_values[i] = contract_value
+            return i
+
+    def update(self, symbol: str, size: float, price: float, daily_pnl: float):
+        """Record a symbol's current position, mark price and PnL for the day"""
+        i = self.index.get(symbol)
+        if i is None:
+            i = self.register(symbol)
+        with self.lock:
+            self.positions[i] = size
+            if price:
+                self.prices[i] = price
+            self.daily_pnl[i] = daily_pnl
+
+    def _exposure(self) -> Tuple[np.ndarray, float, float]:
+        """Signed notional per symbol, gross and net notional (lock held)"""
+        notional = self.positions * self.prices * self.contract_values
+        return notional, float(np.abs(notional).sum()), float(notional.sum())
+
+    def check_orders(self, symbols: Sequence[str], sides: Sequence[str], sizes: Sequence[float],
+                     prices: Optional[Sequence[float]] = None) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """Pre-trade check of candidate orders against every limit in one pass
+
+        Each order is evaluated against the current book on its own. Orders
+        that only reduce an existing position are always approved. Returns a
+        boolean approval array and a rejection reason (or None) per order.
+        """
+        with self.lock:
+            idx = np.array([self.index[symbol] for symbol in symbols], dtype=np.intp)
+            direction = np.where(np.asarray(sides) == 'buy', 1.0, -1.0)
+            delta = direction * np.asarray(sizes, dtype=float)
+            price = self.prices[idx] if prices is None else np.asarray(prices, dtype=float)
+            contract_value = self.contract_values[idx]
+
+            notional, gross, net = self._exposure()
+            current = self.positions[idx]
+            new_position = current + delta
+            new_notional = new_position * price * contract_value
+
+            # Swap each order's symbol notional for its post-trade value
+            new_gross = gross - np.abs(notional[idx]) + np.abs(new_notional)
+            new_net = net - notional[idx] + new_notional
+            limit_scale = self.account_balance
+
+            checks = (
+                ('max position size', np.abs(new_position) <= self.max_sizes[idx]),
+                ('symbol exposure limit', np.abs(new_notional) <= self.max_symbol_exposure * limit_scale),
+                ('gross exposure limit', new_gross <= self.max_gross_exposure * limit_scale),
+                ('net exposure limit', np.abs(new_net) <= self.max_net_exposure * limit_scale),
+                ('daily loss limit', np.full(len(idx), self.daily_pnl.sum() > -self.max_daily_loss * limit_scale)),
+            )
+
+        reducing = np.abs(new_position) <= np.abs(current)
+        approved = reducing.copy()
+        passed = np.ones(len(idx), dtype=bool)
+        for _, ok in checks:
+            passed &= ok
+        approved |= passed
+
+        reasons: List[Optional[str]] = [None] * len(idx)
+        for i in np.flatnonzero(~approved):
+            reasons[i] = next(name for name, ok in checks if not ok[i])
+            logger.warning(f"[{symbols[i]}] Order rejected by portfolio risk: {reasons[i]}")
+        return approved, reasons
+
+    def check_order(self, symbol: str, side: str, size: float, price: Optional[float] = None) -> bool:
+        """Single-order convenience wrapper around check_orders"""
+        approved, _ = self.check_orders([symbol], [side], [size], None if price is None else [price])
+        return bool(approved[0])
+
+    def status(self) -> Dict:
+        """Portfolio exposure, daily PnL and per-symbol breakdown"""
+        with self.lock:
+            notional, gross, net = self._exposure()
+            return {
+                'account_balance': self.account_balance,
+                'gross_exposure': gross,
+                'net_exposure': net,
+                'daily_pnl': float(self.daily_pnl.sum()),
+                'limits': {
+                    'max_gross_exposure': self.max_gross_exposure * self.account_balance,
+                    'max_net_exposure': self.max_net_exposure * self.account_balance,
+                    'max_symbol_exposure': self.max_symbol_exposure * self.account_balance,
+                    'max_daily_loss': self.max_daily_loss * self.account_balance
+                },
+                'symbols': {
+                    symbol: {
+                        'position': float(self.positions[i]),
+                        'price': float(self.prices[i]),
+                        'notional': float(notional[i]),
+                        'daily_pnl': float(self.daily_pnl[i]),
+                        'max_position_size': float(self.max_sizes[i])
+                    } for symbol, i in self.index.items()
+                }
+            }
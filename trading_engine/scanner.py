@@ -0,0 +1,213 @@
+"""
+Universe scanner.
+
+UniverseScanner ranks every product on the exchange so the engine can trade
+the symbols with the best setups instead of one fixed TRADING_SYMBOL. Each
+scan costs one bulk /v2/tickers call; candle history comes from the local
+CandleStore, and only a bounded number of stale series are topped up per
+scan so the API budget stays flat however many products are listed. The
+live price is appended to the cached closes and all products are scored at
+once as a (products x bars) array:
+
+- momentum: return over `momentum_bars`
+- volatility: std of log returns over the window
+- crossover distance: |SMA short - SMA long| in units of expected move
+  (price x volatility), small when a crossover is near
+- volume: 24h turnover from the ticker
+
+Each metric becomes a percentile rank across the universe, and the ranks
+are combined by weight into one score.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from trading_engine.candle_store import CandleStore
+from trading_engine.events import STOP, TradingEvents
+from trading_engine.market_data import MarketDataHub
+
+logger = logging.getLogger(__name__)
+
+
+def percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Rank of each value in [0, 1] (1 = largest); NaN stays NaN"""
+    ranks = np.full(values.shape, np.nan)
+    valid = ~np.isnan(values)
+    count = int(valid.sum())
+    if count == 0:
+        return ranks
+    order = np.argsort(values[valid], kind='stable')
+    valid_ranks = np.empty(count)
+    valid_ranks[order] = np.arange(count) / max(count - 1, 1)
+    ranks[valid] = valid_ranks
+    return ranks
+
+
+def rolling_mean_last(prices: np.ndarray, period: int) -> np.ndarray:
+    """Mean of the last `period` columns of every row (NaN if any is missing)"""
+    if prices.shape[1] < period:
+        return np.full(prices.shape[0], np.nan)
+    return prices[:, -period:].mean(axis=1)
+
+
+class UniverseScanner:
+    """Rank all products by momentum, MA crossover distance, volatility and volume"""
+
+    def __init__(self, market_data: MarketDataHub, candle_store: CandleStore, resolution: str = '1h',
+                 bars: int = 50, short_period: int = 9, long_period: int = 21, momentum_bars: int = 24,
+                 refresh_interval: float = 5.0, max_candle_fetches: int = 10,
+                 contract_types: Optional[List[str]] = None, min_turnover: float = 0.0,
+                 weights: Optional[Dict[str, float]] = None,
+                 status_callback: Optional[Callable[[Dict], None]] = None):
+        self.market_data = market_data
+        self.candle_store = candle_store
+        self.resolution = resolution
+        self.bars = bars
+        self.short_period = short_period
+        self.long_period = long_period
+        self.momentum_bars = momentum_bars
+        self.refresh_interval = refresh_interval
+        self.max_candle_fetches = max_candle_fetches
+        self.contract_types = contract_types or ['perpetual_futures']
+        self.min_turnover = min_turnover
+        self.weights = weights or {'momentum': 1.0, 'crossover': 1.0, 'volume': 0.5, 'volatility': 0.25}
+        self.status_callback = status_callback
+
+        self.rankings: List[Dict] = []
+        self.last_scan = None
+        self.scan_ms = 0.0
+        self.candle_cursor = 0
+
+        self.running = False
+        self.thread = None
+        self.events = TradingEvents()
+
+    def _universe(self) -> List[Dict]:
+        """Tickers of tradable products from the latest bulk snapshot"""
+        tickers = []
+        for snapshot in self.market_data.refresh_all().values():
+            ticker = snapshot.ticker
+            if self.contract_types and ticker.get('contract_type') not in self.contract_types:
+                continue
+            if snapshot.price <= 0:
+                continue
+            tickers.append(ticker)
+        return sorted(tickers, key=lambda t: t['symbol'])
+
+    def _top_up_candles(self, symbols: List[str]):
+        """Refresh a bounded, rotating slice of stale candle series"""
+        fetched = 0
+        for offset in range(len(symbols)):
+            if fetched >= self.max_candle_fetches:
+                break
+            symbol = symbols[(self.candle_cursor + offset) % len(symbols)]
+            if self.candle_store.is_stale(symbol, self.resolution):
+                self.candle_store.refresh(symbol, self.resolution, self.bars)
+                fetched += 1
+        self.candle_cursor = (self.candle_cursor + max(fetched, 1)) % max(len(symbols), 1)
+
+    def scan(self) -> List[Dict]:
+        """Score every product once and return them best first"""
+        started = time.perf_counter()
+        tickers = self._universe()
+        if not tickers:
+            return self.rankings
+        symbols = [t['symbol'] for t in tickers]
+        self._top_up_candles(symbols)
+
+        live = np.array([float(t['close']) for t in tickers])
+        turnover = np.array([float(t.get('turnover_usd') or 0) or float(t.get('volume') or 0) * price
+                             for t, price in zip(tickers, live)])
+        prices = np.hstack([self.candle_store.matrix(symbols, self.resolution, self.bars), live[:, None]])
+
+        eligible = turnover >= self.min_turnover
+        prices[~eligible] = np.nan
+        momentum_bars = min(self.momentum_bars, prices.shape[1] - 1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.diff(np.log(prices), axis=1)
+            valid = ~np.isnan(returns)
+            count = valid.sum(axis=1)
+            mean = np.where(valid, returns, 0).sum(axis=1) / count
+            volatility = np.sqrt(np.where(valid, (returns - mean[:, None]) ** 2, 0).sum(axis=1) / count)
+            momentum = prices[:, -1] / prices[:, -1 - momentum_bars] - 1
+            sma_short = rolling_mean_last(prices, self.short_period)
+            sma_long = rolling_mean_last(prices, self.long_period)
+            spread = (sma_short - sma_long) / live
+            crossover_distance = np.abs(spread) / volatility
+
+        ranks = {
+            'momentum': percentile_ranks(np.abs(momentum)),
+            'crossover': 1 - percentile_ranks(crossover_distance),
+            'volume': percentile_ranks(np.where(eligible, np.log1p(turnover), np.nan)),
+            'volatility': percentile_ranks(volatility),
+        }
+        total_weight = sum(self.weights.values()) or 1.0
+        score = sum(self.weights.get(name, 0.0) * np.nan_to_num(rank) for name, rank in ranks.items()) / total_weight
+        score[~eligible] = np.nan
+
+        def value(array, row):
+            return None if np.isnan(array[row]) else float(array[row])
+
+        order = np.argsort(-np.nan_to_num(score, nan=-1.0), kind='stable')
+        self.rankings = [{
+            'symbol': symbols[row],
+            'score': value(score, row),
+            'price': float(live[row]),
+            'momentum': value(momentum, row),
+            'direction': 'long' if momentum[row] > 0 else 'short' if momentum[row] < 0 else None,
+            'ma_spread': value(spread, row),
+            'crossover_distance': value(crossover_distance, row),
+            'volatility': value(volatility, row),
+            'turnover_usd': float(turnover[row]),
+        } for row in order if eligible[row]]
+        self.last_scan = time.time()
+        self.scan_ms = (time.perf_counter() - started) * 1000
+        return self.rankings
+
+    def top(self, count: int) -> List[str]:
+        """Symbols of the `count` best-ranked products"""
+        return [entry['symbol'] for entry in self.rankings[:count]]
+
+    def start(self):
+        """Rescan every refresh_interval seconds on a background thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.events.stop()
+
+    def run(self):
+        logger.info("Starting universe scanner")
+        try:
+            while self.running:
+                try:
+                    self.scan()
+                    if self.status_callback:
+                        self.status_callback(self.status(limit=20))
+                except Exception as e:
+                    logger.error(f"Error in universe scan: {e}")
+                events = self.events.wait(time.monotonic() + self.refresh_interval)
+                if any(kind == STOP for kind, _ in events):
+                    break
+        finally:
+            self.running = False
+            logger.info("Universe scanner stopped")
+
+    def status(self, limit: int = 50) -> Dict:
+        return {
+            'running': self.running,
+            'last_scan': self.last_scan,
+            'scan_ms': round(self.scan_ms, 2),
+            'products': len(self.rankings),
+            'rankings': self.rankings[:limit]
+        }
@@ -0,0 +1,169 @@
+"""
+Crash-safe journal of trading bot state.
+
+Every price observation and every change of cooldown/risk state is appended
+to a journal file as one checksummed line. Periodically the full state of
+all registered bots is written as a compact snapshot (atomically, via a
+temporary file and rename) and the journal is truncated. On startup the
+snapshot is loaded and the journal replayed up to the first torn or corrupt
+line, so a restarted process resumes with its price buffers, signal
+cooldowns and daily risk counters intact instead of refetching history.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = 'state.journal'
+SNAPSHOT_FILE = 'state.snapshot'
+MAX_PRICE_POINTS = 200
+
+
+def encode_line(payload: Dict) -> str:
+    """Serialize a record as '<crc32 hex> <json>\\n'"""
+    body = json.dumps(payload, separators=(',', ':'))
+    return f"{zlib.crc32(body.encode('utf-8')):08x} {body}\n"
+
+
+def decode_line(line: str) -> Optional[Dict]:
+    """Parse a journal line, returning None if it is torn or fails its checksum"""
+    if not line.endswith('\n') or len(line) < 10:
+        return None
+    checksum, _, body = line[:-1].partition(' ')
+    try:
+        if int(checksum, 16) != zlib.crc32(body.encode('utf-8')):
+            return None
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def apply_record(states: Dict[str, Dict], record: Dict):
+    """Replay one journal record onto per-symbol state dictionaries"""
+    state = states.setdefault(record['symbol'], {'symbol': record['symbol'], 'price_data': [], 'timestamps': []})
+    if record['type'] == 'price':
+        state['price_data'].append(record['price'])
+        state['timestamps'].append(record['ts'])
+        if len(state['price_data']) > MAX_PRICE_POINTS:
+            state['price_data'] = state['price_data'][-MAX_PRICE_POINTS:]
+            state['timestamps'] = state['timestamps'][-MAX_PRICE_POINTS:]
+    elif record['type'] == 'state':
+        state['last_signal_time'] = record['last_signal_time']
+        state['risk'] = record['risk']
+    elif record['type'] == 'full':
+        states[record['symbol']] = record['state']
+
+
+class StateJournal:
+    """Append-only, checksummed journal with periodic compact snapshots"""
+
+    def __init__(self, directory: str, snapshot_every: int = 500, fsync_interval: float = 1.0):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.snapshot_every = snapshot_every
+        self.fsync_interval = fsync_interval
+        self.lock = threading.Lock()
+        self.bots = {}
+        self.sequence = 0
+        self.records_since_snapshot = 0
+        self.last_fsync = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        self.recovered = self.recover()
+        self.file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def recover(self) -> Dict[str, Dict]:
+        """Load the latest snapshot and replay the journal on top of it"""
+        states = {}
+        snapshot_sequence = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = decode_line(f.read())
+            if snapshot:
+                states = snapshot['states']
+                snapshot_sequence = snapshot['sequence']
+            else:
+                logger.warning("State snapshot failed its checksum, ignoring it")
+        self.sequence = snapshot_sequence
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            valid_bytes = 0
+            with open(self.journal_path, 'rb') as f:
+                for raw_line in f:
+                    record = decode_line(raw_line.decode('utf-8', errors='replace'))
+                    if record is None:
+                        # Torn tail from a crash mid-write: everything after it is untrusted
+                        logger.warning("Stopped journal replay at a corrupt record")
+                        break
+                    valid_bytes += len(raw_line)
+                    if record['seq'] <= snapshot_sequence:
+                        continue
+                    apply_record(states, record)
+                    self.sequence = record['seq']
+                    replayed += 1
+            # Drop the corrupt tail so new records are appended after the last good one
+            if valid_bytes < os.path.getsize(self.journal_path):
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+
+        if states:
+            logger.info(f"Recovered state for {len(states)} symbols ({replayed} journal records replayed)")
+        return states
+
+    def register(self, bot):
+        """Include a bot's full state in future snapshots"""
+        with self.lock:
+            self.bots[bot.symbol] = bot
+
+    def append(self, record: Dict):
+        """Append one record; snapshot once enough records have accumulated"""
+        with self.lock:
+            self.sequence += 1
+            record['seq'] = self.sequence
+            self.file.write(encode_line(record))
+            self.file.flush()
+            if time.monotonic() - self.last_fsync >= self.fsync_interval:
+                os.fsync(self.file.fileno())
+                self.last_fsync = time.monotonic()
+            self.records_since_snapshot += 1
+            due = self.records_since_snapshot >= self.snapshot_every
+
+        if due:
+            self.snapshot()
+
+    def record_price(self, symbol: str, price: float, timestamp: int):
+        self.append({'type': 'price', 'symbol': symbol, 'price': price, 'ts': timestamp})
+
+    def record_state(self, symbol: str, last_signal_time: float, risk: Dict):
+        self.append({'type': 'state', 'symbol': symbol, 'last_signal_time': last_signal_time, 'risk': risk})
+
+    def snapshot(self):
+        """Write all registered bots' state atomically and truncate the journal"""
+        with self.lock:
+            states = dict(self.recovered)
+            states.update({symbol: bot.export_state() for symbol, bot in self.bots.items()})
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(encode_line({'sequence': self.sequence, 'created_at': time.time(), 'states': states}))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # Records up to `sequence` are now covered by the snapshot
+            self.file.close()
+            self.file = open(self.journal_path, 'w', encoding='utf-8')
+            self.records_since_snapshot = 0
+
+    def close(self):
+        """Snapshot and close the journal file"""
+        self.snapshot()
+        with self.lock:
+            self.file.close()